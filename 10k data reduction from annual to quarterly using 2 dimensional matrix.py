@@ -1,13 +1,12 @@
-import requests
+import os
 import random
-import json
-import time
-from bs4 import BeautifulSoup
 import re
 from datetime import datetime
-from docx import Document
+
 import pandas as pd
-import matplotlib.pyplot as plt
+import requests
+
+from net_income_yield import net_income as ttm_mod
 
 # Header
 def generate_user_agent():
@@ -41,8 +40,12 @@ def get_sec_net_income(ticker, cik):
                         if 'form' in entry and entry['form'] in ['10-K', '10-Q']:
                             net_income_data.append({
                                 'date': entry['end'],
+                                'start': entry.get('start'),
                                 'value': entry['val'],
-                                'form': entry['form']
+                                'form': entry['form'],
+                                'filed': entry.get('filed'),
+                                'fy': entry.get('fy'),
+                                'fp': entry.get('fp')
                             })
         
         net_income_data.sort(key=lambda x: x['date'])
@@ -55,6 +58,8 @@ def get_sec_net_income(ticker, cik):
 
 # Extract CIK to ticker key-value dictionary from the document
 def extract_dictionary_from_docx(file_path):
+    from docx import Document
+
     doc = Document(file_path)
     extracted_dict = {}
     
@@ -71,7 +76,7 @@ def extract_dictionary_from_docx(file_path):
 # Main Code Execution
 
 # File path
-file_path = "C:/Users/Admin/Documents/textfile.docx"
+file_path = os.environ.get("TICKER_SOURCE", "textfile.docx")
 
 # Extract CIK dictionary
 extracted_data = extract_dictionary_from_docx(file_path)
@@ -99,15 +104,14 @@ if cik:
             print(f"Date: {date}, Form: {form}, Net Income: ${net_income_print:.2f}")
 
             # Append each entry as a dictionary for DataFrame
-            data.append({'Date': date, 'Form': form, 'Net Income': float(net_income_print)})
+            data.append({'Date': date, 'Form': form, 'Net Income': float(net_income_print),
+                         'Start': entry['start'], 'Filed': entry['filed'], 'FY': entry['fy'], 'FP': entry['fp']})
 
-        # Create DataFrame (exlcude redundant 10-q data)
+        # Create DataFrame (quarterly vs year-to-date vs annual by period length, latest filing wins)
         df = pd.DataFrame(data)
-        df_unique_last = df.drop_duplicates(subset=['Date', 'Form'], keep='last')  #Exclude 10-q filing data that isn't quarterly
-        df_filtered = df[~df.duplicated(subset=['Date', 'Form'], keep=False)]      #Exclude all duplicate data
-        final_df = pd.concat([df_unique_last, df_filtered]).drop_duplicates(subset=['Date', 'Form'], keep='last')  #Concatenate data
-        final_df['Date'] = pd.to_datetime(final_df['Date'])     
-        final_df = final_df.sort_values(by='Date', ascending=True)  #Sort by date
+        for col in ('Date', 'Start', 'Filed'):
+            df[col] = pd.to_datetime(df[col])
+        final_df = ttm_mod.normalize_facts(df)
 
         # Convert 10-K Annual Data into Q4 Data
         def convert_10k_to_q4(final_df):
@@ -151,68 +155,11 @@ else:
 print("Done")
 
 
-def reduce_10k_to_quarterly(k2q_df):
-    # Ensure date format and sorting
-    k2q_df = k2q_df.sort_values('Date').reset_index(drop=True)
-    k2q_df['Date'] = pd.to_datetime(k2q_df['Date'])
-
-    # Separate 10-K and 10-Q
-    ten_k = k2q_df[k2q_df['Form'] == '10-K'].copy()
-    ten_q = k2q_df[k2q_df['Form'] == '10-Q'].copy()
-
-    # Container for synthesized Q4 entries
-    synthesized_q4_rows = []
-
-    for _, row in ten_k.iterrows():
-        year = row['Date'].year
-        annual_value = row['Net Income']
-
-        # Find Q1, Q2, Q3 for that year
-        q1 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-03-31')]
-        q2 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-06-30')]
-        q3 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-09-30')]
-
-        if not q1.empty and not q2.empty and not q3.empty:
-            q_total = q1.iloc[0]['Net Income'] + q2.iloc[0]['Net Income'] + q3.iloc[0]['Net Income']
-            q4_value = annual_value - q_total
-
-            synthesized_q4_rows.append({
-                'Date': pd.Timestamp(f'{year}-12-31'),
-                'Form': '10-Q',
-                'Net Income': q4_value
-            })
-
-    # Drop all 10-K rows and any existing Q4 10-Qs that match synthesized dates
-    synthesized_q4_dates = [row['Date'] for row in synthesized_q4_rows]
-    k2q_df = k2q_df[~((k2q_df['Date'].isin(synthesized_q4_dates)) | (k2q_df['Form'] == '10-K'))]
-
-    # Append new Q4 rows
-    k2q_df = pd.concat([k2q_df, pd.DataFrame(synthesized_q4_rows)], ignore_index=True)
-
-    # Final sort
-    k2q_df = k2q_df.sort_values('Date').reset_index(drop=True)
-    return k2q_df
-
-
-
-final_k2q_df = reduce_10k_to_quarterly(final_df)
+final_k2q_df = ttm_mod.reduce_10k_to_quarterly(final_df)
 print(final_k2q_df)
 
 
-def calculate_ttm_net_income(input_df):
-    ttm_df = input_df.sort_values('Date').reset_index(drop=True).copy()
-    ttm_df['TTM Net Income'] = None
-
-    for i in range(3, len(ttm_df)):
-        last_4 = ttm_df.loc[i-3:i]
-        if len(last_4) == 4:
-            ttm = last_4['Net Income'].sum()
-            ttm_df.at[i, 'TTM Net Income'] = ttm
-
-    return ttm_df
-
-
-ttm_df = calculate_ttm_net_income(final_k2q_df)
+ttm_df = ttm_mod.calculate_ttm_net_income(final_k2q_df)
 
 print("\nQuarterly Net Income with TTM:")
 print(ttm_df[['Date', 'Net Income', 'TTM Net Income']])
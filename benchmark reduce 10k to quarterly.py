@@ -0,0 +1,101 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from net_income_yield import net_income as ttm_mod
+
+# -------------------------------
+# Previous row-by-row implementation (reference)
+# -------------------------------
+def reduce_10k_to_quarterly_iterrows(df):
+    df = df.sort_values('Date').reset_index(drop=True)
+    ten_k = df[df['Form'] == '10-K']
+    ten_q = df[df['Form'] == '10-Q']
+    synthesized_q4_rows = []
+
+    for _, row in ten_k.iterrows():
+        year = row['Date'].year
+        annual_val = row['Net Income']
+        q1 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-03-31')]
+        q2 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-06-30')]
+        q3 = ten_q[ten_q['Date'] == pd.Timestamp(f'{year}-09-30')]
+        if not q1.empty and not q2.empty and not q3.empty:
+            total = q1.iloc[0]['Net Income'] + q2.iloc[0]['Net Income'] + q3.iloc[0]['Net Income']
+            q4_val = annual_val - total
+            synthesized_q4_rows.append({
+                'Date': pd.Timestamp(f'{year}-12-31'),
+                'Form': '10-Q',
+                'Net Income': q4_val
+            })
+
+    q4_dates = [row['Date'] for row in synthesized_q4_rows]
+    df = df[~((df['Form'] == '10-K') | (df['Date'].isin(q4_dates)))]
+    df = pd.concat([df, pd.DataFrame(synthesized_q4_rows)], ignore_index=True)
+    return df.sort_values('Date').reset_index(drop=True)
+
+# -------------------------------
+# Synthetic companyfacts-like panel
+# -------------------------------
+def make_panel(companies, years, seed=0):
+    """10-Q rows for Q1-Q3 plus one 10-K per year, with a few missing quarters
+    and repeated 10-Q values (companyfacts repeats prior-year comparatives)."""
+    rng = np.random.default_rng(seed)
+    quarter_ends = ['03-31', '06-30', '09-30']
+    frames = []
+    start_year = 2024 - years
+    for c in range(companies):
+        dates, forms, values = [], [], []
+        for year in range(start_year, start_year + years):
+            for q in quarter_ends:
+                if rng.random() < 0.97:
+                    value = round(rng.normal(1e8, 5e7))
+                    repeats = 2 if rng.random() < 0.3 else 1
+                    dates.extend([f'{year}-{q}'] * repeats)
+                    forms.extend(['10-Q'] * repeats)
+                    values.extend([value] * repeats)
+            dates.append(f'{year}-12-31')
+            forms.append('10-K')
+            values.append(round(rng.normal(4e8, 1e8)))
+        frames.append(pd.DataFrame({
+            'Ticker': f'T{c:05d}',
+            'Date': pd.to_datetime(dates),
+            'Form': forms,
+            'Net Income': np.array(values, dtype=float),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {elapsed:10.3f} s")
+    return result, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark reduce_10k_to_quarterly: iterrows vs vectorized.")
+    parser.add_argument("--companies", type=int, default=4000)
+    parser.add_argument("--years", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    panel = make_panel(args.companies, args.years)
+    print(f"Panel: {args.companies} companies x {args.years} years = {len(panel)} rows\n")
+    groups = [g.drop(columns='Ticker') for _, g in panel.groupby('Ticker', sort=True)]
+
+    old, old_time = timed("iterrows, one call per company", lambda: [reduce_10k_to_quarterly_iterrows(g) for g in groups])
+    new, new_time = timed("vectorized, one call per company", lambda: [ttm_mod.reduce_10k_to_quarterly(g) for g in groups])
+    multi, multi_time = timed("vectorized, one call for the whole panel", ttm_mod.reduce_10k_to_quarterly, panel)
+
+    # Output must match the previous implementation exactly
+    for expected, actual in zip(old, new):
+        pd.testing.assert_frame_equal(expected, actual)
+    for (ticker, actual), expected in zip(multi.groupby('Ticker', sort=True), old):
+        actual = actual.drop(columns='Ticker').reset_index(drop=True)
+        pd.testing.assert_frame_equal(expected, actual, check_like=True)
+    print("\nOutputs identical to the iterrows implementation.")
+    print(f"Speedup per company: {old_time / new_time:6.1f}x")
+    print(f"Speedup whole panel: {old_time / multi_time:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,14 @@
-import importlib.util
-import pandas as pd
 import os
 
-# Dynamically import a Python module from a file path
-def load_module_from_path(path, module_name):
-    spec = importlib.util.spec_from_file_location(module_name, path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-def main():
-    ttm_script_enclave = r"C:\Users\Admin\Downloads\trailing twelve month net income script repeatable.py"
-    submission_script_enclave = r"C:\Users\Admin\Downloads\submission date script repeatable.py"
-    docx_path = r"C:\Users\Admin\Documents\textfile.docx"
+import pandas as pd
 
-    ttm_mod = load_module_from_path(ttm_script_enclave, "ttm_module")
-    sub_mod = load_module_from_path(submission_script_enclave, "submission_module")
+from net_income_yield import net_income as ttm_mod
+from net_income_yield import submissions as sub_mod
+from net_income_yield import ticker_index as index_mod
+from net_income_yield import warehouse as warehouse_mod
 
-    cik_dict = ttm_mod.extract_dictionary_from_docx(docx_path)
+def main():
+    cik_dict = index_mod.load_ticker_index(index_mod.TICKER_SOURCE)
 
     ticker = input("Enter a ticker: ").strip().upper()
     cik = cik_dict.get(ticker)
@@ -32,7 +23,8 @@ def main():
         print("No net income data.")
         return
 
-    net_df = ttm_mod.reduce_10k_to_quarterly(net_df)
+    net_df = ttm_mod.normalize_facts(net_df, keep_ytd=True)
+    net_df = ttm_mod.derive_fiscal_quarters(net_df)
     net_df = ttm_mod.calculate_ttm_net_income(net_df)
 
     filing_df = sub_mod.get_edgar_filing_links(ticker, cik)
@@ -47,14 +39,13 @@ def main():
     print("\nFinal merged data preview:")
     print(merged.tail())
 
-    # Save to master file only
-    master_file = "all_combined_data.csv"
-    if not os.path.exists(master_file):
-        merged.to_csv(master_file, index=False)
-        print(f"✅ Created new master file: {os.path.abspath(master_file)}")
-    else:
-        merged.to_csv(master_file, mode="a", header=False, index=False)
-        print(f"✅ Appended to master file: {os.path.abspath(master_file)}")
+    # Upsert into the results warehouse; re-running a ticker replaces its rows
+    warehouse = warehouse_mod.ResultsWarehouse()
+    try:
+        written = warehouse.upsert(merged)
+    finally:
+        warehouse.close()
+    print(f"✅ Upserted {written} rows into {os.path.abspath(warehouse.path)}")
 
 if __name__ == "__main__":
     main()
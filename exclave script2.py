@@ -1,64 +1,13 @@
-import importlib.util
 import pandas as pd
-import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 
-# --- Load submodules dynamically ---
-def load_module_from_path(enclave, module_name):
-    spec = importlib.util.spec_from_file_location(module_name, enclave)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-# --- Upload to Google Sheets ---
-def upload_to_google_sheet(df, sheet_name="All Combined Data"):
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(
-        r"C:\Users\Admin\Downloads\arctic-plate-459211-v7-befbd43919a2.json",
-        scope
-    )
-    client = gspread.authorize(creds)
-
-    try:
-        sheet = client.open(sheet_name).sheet1
-    except gspread.SpreadsheetNotFound:
-        sheet = client.create(sheet_name).sheet1
-
-    # Safely get all records, enforcing unique headers
-    headers = sheet.row_values(1)
-    if len(headers) != len(set(headers)):
-        print("❌ Duplicate column names found in header. Clearing and starting fresh.")
-        sheet.clear()
-        existing_data = pd.DataFrame(columns=df.columns)
-    else:
-        existing_data = pd.DataFrame(sheet.get_all_records(expected_headers=headers))
-
-    # Combine new data with existing data, avoiding duplicate rows
-    combined_df = pd.concat([existing_data, df], ignore_index=True)
-    combined_df.drop_duplicates(subset=["Ticker", "Date"], keep="last", inplace=True)
-
-    # Replace problematic values and convert all cells to string
-    combined_df = combined_df.replace([float("inf"), float("-inf"), pd.NA, None], "")
-    combined_df = combined_df.fillna("").astype(str)
-
-    sheet.clear()
-    sheet.update([combined_df.columns.tolist()] + combined_df.values.tolist())
-    print(f"✅ Uploaded to Google Sheet: {sheet_name}")
+from net_income_yield import net_income as ttm_mod
+from net_income_yield import submissions as sub_mod
+from net_income_yield import ticker_index as index_mod
+from net_income_yield.sheets import upload_to_google_sheet
 
 # --- Main logic ---
 def main():
-    ttm_script_enclave = r"C:\Users\Admin\Downloads\trailing twelve month net income script repeatable.py"
-    submission_script_enclave = r"C:\Users\Admin\Downloads\submission date script repeatable.py"
-    docx_path = r"C:\Users\Admin\Documents\textfile.docx"
-
-    ttm_mod = load_module_from_path(ttm_script_enclave, "ttm_module")
-    sub_mod = load_module_from_path(submission_script_enclave, "submission_module")
-
-    cik_dict = ttm_mod.extract_dictionary_from_docx(docx_path)
+    cik_dict = index_mod.load_ticker_index(index_mod.TICKER_SOURCE)
     ticker = input("Enter a ticker: ").strip().upper()
     cik = cik_dict.get(ticker)
 
@@ -71,7 +20,8 @@ def main():
         print("No net income data.")
         return
 
-    net_df = ttm_mod.reduce_10k_to_quarterly(net_df)
+    net_df = ttm_mod.normalize_facts(net_df, keep_ytd=True)
+    net_df = ttm_mod.derive_fiscal_quarters(net_df)
     net_df = ttm_mod.calculate_ttm_net_income(net_df)
 
     filing_df = sub_mod.get_edgar_filing_links(ticker, cik)
@@ -80,14 +30,13 @@ def main():
 
     merged = pd.merge(net_df, filing_df[["Date", "Filing Date"]], on="Date", how="left")
     merged["Ticker"] = ticker
-    merged = merged[["Ticker", "Date", "Form", "Net Income", "TTM Net Income", "Filing Date"]]
+    merged = merged[["Ticker", "Date", "Form", "Net Income", "TTM Net Income", "Filing Date", "Fiscal Year", "Fiscal Quarter"]]
     merged = merged.reset_index(drop=True)
 
-    # Replace 'Form' with 'Quarter' labels
+    # Replace 'Form' with fiscal 'Quarter' labels
     merged["Date"] = pd.to_datetime(merged["Date"], errors="coerce")
-    quarter_map = {3: "Q1", 6: "Q2", 9: "Q3", 12: "Q4"}
-    merged["Quarter"] = merged["Date"].dt.month.map(quarter_map)
-    merged.drop("Form", axis=1, inplace=True)
+    merged["Quarter"] = "Q" + merged["Fiscal Quarter"].astype(str)
+    merged.drop(["Form", "Fiscal Quarter"], axis=1, inplace=True)
 
     merged["Date"] = merged["Date"].dt.strftime("%Y-%m-%d")
     merged["Filing Date"] = pd.to_datetime(merged["Filing Date"], errors="coerce").dt.strftime("%Y-%m-%d")
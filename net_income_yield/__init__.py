@@ -0,0 +1,44 @@
+"""SEC net income, shares outstanding and filing-date pipeline.
+
+Submodules are imported on first attribute access so that `import
+net_income_yield` and the console entry points start without loading
+pandas, requests, python-docx or gspread until they are needed.
+"""
+import importlib
+
+__version__ = "0.1.0"
+
+SUBMODULES = (
+    "benchmark",
+    "bulk",
+    "concepts",
+    "facts_store",
+    "fixtures",
+    "http_cache",
+    "metrics",
+    "net_income",
+    "parquet_store",
+    "pipeline",
+    "point_in_time",
+    "replay",
+    "sec_client",
+    "service",
+    "shares",
+    "sheets",
+    "stream",
+    "submissions",
+    "ticker_index",
+    "warehouse",
+    "watermarks",
+    "yields",
+)
+
+__all__ = list(SUBMODULES)
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(SUBMODULES))
@@ -0,0 +1,370 @@
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# pandas and the pipeline modules are imported where they are used
+# so that `--help` and argument errors return without loading them
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+BENCHMARK_DIR = os.environ.get("BENCHMARK_DIR", "benchmark_results")
+# A stage is a regression when it is this many times slower (or larger) than the baseline
+REGRESSION_THRESHOLD = float(os.environ.get("BENCHMARK_REGRESSION_THRESHOLD", 1.25))
+
+# -------------------------------
+# Stages
+# -------------------------------
+# Each stage maps one company's inputs to its output. Stages marked
+# "panel" also accept every company at once in a frame with a Ticker
+# column; the others run once per company at universe scale as well.
+def _stages():
+    from types import SimpleNamespace
+
+    from . import concepts, http_cache, net_income, pipeline, shares, submissions
+
+    prefixes = concepts.concept_prefixes()
+
+    def parse(c):
+        return http_cache.load_json_subtrees(io.BytesIO(c.body), prefixes)
+
+    def end_to_end(c):
+        return combined_frame(c, prefixes)
+
+    return [
+        SimpleNamespace(name="parse_companyfacts", panel=False, run=parse, output="facts"),
+        SimpleNamespace(name="extract_net_income", panel=False,
+                        run=lambda c: net_income.extract_net_income(c.facts), output="net_df"),
+        SimpleNamespace(name="normalize_facts", panel=True, input="net_df",
+                        run=lambda df: net_income.normalize_facts(df, keep_ytd=True), output="normalized"),
+        SimpleNamespace(name="reduce_10k_to_quarterly", panel=True, input="normalized_annual",
+                        run=net_income.reduce_10k_to_quarterly, output=None),
+        SimpleNamespace(name="derive_fiscal_quarters", panel=True, input="normalized",
+                        run=net_income.derive_fiscal_quarters, output="quarters"),
+        SimpleNamespace(name="calculate_ttm_net_income", panel=True, input="quarters",
+                        run=net_income.calculate_ttm_net_income, output="ttm"),
+        SimpleNamespace(name="extract_shares", panel=False,
+                        run=lambda c: shares.extract_shares_outstanding(c.facts), output="shares_df"),
+        SimpleNamespace(name="extract_filing_links", panel=False,
+                        run=lambda c: submissions.extract_filing_links(c.cik, c.submissions, c.pages),
+                        output="filing_df"),
+        SimpleNamespace(name="merge_ticker_frames", panel=False,
+                        run=lambda c: pipeline.merge_ticker_frames(c.ticker, c.ttm, c.filing_df, c.shares_df),
+                        output=None),
+        SimpleNamespace(name="end_to_end", panel=False, run=end_to_end, output=None),
+    ]
+
+def combined_frame(c, prefixes=None):
+    """The pipeline's combined frame of one benchmark company, from its raw documents."""
+    from . import concepts, http_cache, net_income, pipeline, shares, submissions
+
+    facts = http_cache.load_json_subtrees(io.BytesIO(c.body), prefixes or concepts.concept_prefixes())
+    long_df = concepts.extract_concepts(facts)
+    quarters = net_income.derive_fiscal_quarters(
+        net_income.normalize_facts(net_income.net_income_from_concepts(long_df), keep_ytd=True))
+    quarters = net_income.calculate_ttm_net_income(quarters)
+    filing_df = submissions.extract_filing_links(c.cik, c.submissions, c.pages)
+    return pipeline.merge_ticker_frames(c.ticker, quarters, filing_df, shares.shares_from_concepts(long_df))
+
+def make_companies(companies, seed=0, **options):
+    """Synthetic universe as benchmark inputs: serialized companyfacts plus parsed submissions."""
+    from types import SimpleNamespace
+
+    from . import fixtures
+
+    out = []
+    for ticker, cik, company in fixtures.make_universe(companies, seed=seed, **options):
+        body = json.dumps(company["companyfacts"], separators=(",", ":")).encode("utf-8")
+        out.append(SimpleNamespace(ticker=ticker, cik=cik, body=body, submissions=company["submissions"],
+                                   pages=list(company["pages"].values()), first_year=company["first_year"],
+                                   expected=fixtures.expected_quarters(company)))
+    return out
+
+# -------------------------------
+# Correctness checks
+# -------------------------------
+def check_quarters(companies, check_values=True):
+    """Compare each company's derived quarters with the fixtures' true ones.
+
+    Every derived quarter must carry its true fiscal year and quarter (and,
+    with `check_values`, its net income), and every quarter of a year the
+    company filed for must be derived. Returns a list of failure messages.
+    """
+    import pandas as pd
+
+    from . import concepts, http_cache, net_income
+
+    prefixes = concepts.concept_prefixes()
+    failures = []
+    for c in companies:
+        facts = http_cache.load_json_subtrees(io.BytesIO(c.body), prefixes)
+        derived = net_income.derive_fiscal_quarters(
+            net_income.normalize_facts(net_income.extract_net_income(facts), keep_ytd=True))
+        expected = pd.DataFrame(c.expected).assign(Date=lambda df: pd.to_datetime(df["Date"]))
+        joined = derived.merge(expected, on="Date", how="outer", suffixes=("", " Expected"), indicator=True)
+        for row in joined.to_dict("records"):
+            where = f"{c.ticker} {row['Date']:%Y-%m-%d}"
+            if row["_merge"] == "left_only":
+                failures.append(f"{where}: derived quarter that was never reported")
+            elif row["_merge"] == "right_only":
+                if row["Fiscal Year Expected"] >= c.first_year:
+                    failures.append(f"{where}: FY{row['Fiscal Year Expected']} Q{row['Fiscal Quarter Expected']} missing")
+            elif (int(row["Fiscal Year"]), int(row["Fiscal Quarter"])) != (row["Fiscal Year Expected"],
+                                                                          row["Fiscal Quarter Expected"]):
+                failures.append(f"{where}: labelled FY{int(row['Fiscal Year'])} Q{int(row['Fiscal Quarter'])}, "
+                                f"expected FY{row['Fiscal Year Expected']} Q{row['Fiscal Quarter Expected']}")
+            elif check_values and round(row["Net Income"]) != row["Net Income Expected"]:
+                failures.append(f"{where}: net income {row['Net Income']:.0f}, expected {row['Net Income Expected']}")
+    return failures
+
+def check_yields(companies, seed=0):
+    """Every filed quarter with TTM net income must get TTM EPS, Earnings Yield and Market Cap.
+
+    Runs the combined frame of each company through quarterly_yields with
+    synthetic prices; returns a list of failure messages.
+    """
+    import pandas as pd
+
+    from . import fixtures, yields
+
+    days = [row["Date"] for c in companies for row in c.expected]
+    prices = pd.DataFrame(fixtures.make_prices([c.ticker for c in companies], min(days), max(days), seed=seed),
+                          columns=["Ticker", "Date", "Close"])
+    failures = []
+    for c in companies:
+        out = yields.quarterly_yields(combined_frame(c), prices)
+        filed = out[pd.to_datetime(out["Filing Date"], errors="coerce").notna()
+                    & pd.to_numeric(out["TTM Net Income"], errors="coerce").notna()]
+        if filed.empty:
+            failures.append(f"{c.ticker}: no filed quarter with TTM net income")
+        for column in ("TTM EPS", "Earnings Yield", "Market Cap"):
+            missing = int(filed[column].isna().sum())
+            if missing:
+                failures.append(f"{c.ticker}: {column} missing on {missing} of {len(filed)} filed quarters")
+    return failures
+
+# -------------------------------
+# Measurement
+# -------------------------------
+def _rows(result):
+    return len(result) if hasattr(result, "__len__") and not isinstance(result, dict) else 1
+
+def measure(func, repeat=3):
+    """(best wall time of `repeat` runs, result of the last run)."""
+    best, result = float("inf"), None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def peak_memory(func):
+    """Peak bytes allocated by `func` above what was allocated when it started (tracemalloc)."""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+def panel_of(companies, attr):
+    import pandas as pd
+
+    frames = [getattr(c, attr).assign(Ticker=c.ticker) for c in companies if not getattr(c, attr).empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def run_benchmarks(companies, repeat=3, trace_memory=True, log=print):
+    """Time every stage at single-ticker and universe scale.
+
+    Ticker scale reports the median (and p90) over companies of each
+    company's best-of-`repeat` call; universe scale times one call over
+    the whole panel for panel stages and one pass over every company for
+    the others. Peak memory is measured in a separate traced run: the
+    largest company for ticker scale, the full run for universe scale.
+    Returns a list of result dicts.
+    """
+    from . import net_income
+
+    results = []
+    largest = max(range(len(companies)), key=lambda i: len(companies[i].body))
+
+    def record(stage, scale, seconds, rows, calls, peak, p90=None):
+        results.append({"stage": stage, "scale": scale, "seconds": seconds, "p90_seconds": p90,
+                        "calls": calls, "rows": rows, "peak_bytes": peak})
+        p90_text = f" p90 {p90 * 1e3:9.2f} ms" if p90 is not None else " " * 17
+        peak_text = f"{peak / 1e6:9.1f} MB" if peak is not None else " " * 12
+        log(f"{stage:<26} {scale:<9} {seconds * 1e3:11.2f} ms{p90_text} {peak_text} {rows:>10} rows")
+
+    for stage in _stages():
+        def call(c, stage=stage):
+            return stage.run(getattr(c, stage.input)) if stage.panel else stage.run(c)
+
+        # Single ticker: every company on its own; outputs feed the next stages
+        times, rows = [], 0
+        for c in companies:
+            seconds, result = measure(lambda: call(c), repeat)
+            times.append(seconds)
+            rows += _rows(result)
+            if stage.output:
+                setattr(c, stage.output, result)
+                if stage.output == "net_df":
+                    c.normalized_annual = net_income.normalize_facts(result)
+        p90 = statistics.quantiles(times, n=10)[-1] if len(times) > 1 else times[0]
+        peak = peak_memory(lambda: call(companies[largest])) if trace_memory else None
+        record(stage.name, "ticker", statistics.median(times), rows // len(companies), len(companies), peak, p90)
+
+        # Universe: one call over the whole panel, or one pass over every company
+        if stage.panel:
+            panel = panel_of(companies, stage.input)
+            func = lambda: stage.run(panel)
+        else:
+            func = lambda: [call(c) for c in companies]
+        seconds, result = measure(func, repeat=1)
+        rows = _rows(result) if stage.panel else sum(_rows(r) for r in result)
+        peak = peak_memory(func) if trace_memory else None
+        record(stage.name, "universe", seconds, rows, 1 if stage.panel else len(companies), peak)
+    return results
+
+# -------------------------------
+# Saved results and comparison
+# -------------------------------
+def environment():
+    import numpy as np
+    import pandas as pd
+
+    from . import __version__, http_cache
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "version": __version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "json_parser": "ijson" if http_cache._ijson() is not None else "json",
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def save_results(report, path=None, directory=BENCHMARK_DIR):
+    """Write a report to `path`, or to a timestamped file under `directory`."""
+    if path is None:
+        env = report["environment"]
+        stamp = report["started_at"].replace(":", "").replace("-", "")[:15]
+        name = "_".join(p for p in (stamp, env["version"], env["commit"]) if p)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+def compare_results(baseline, current, threshold=REGRESSION_THRESHOLD, log=print):
+    """Print time and memory ratios against `baseline`; return the regressed (stage, scale, metric)s."""
+    if baseline.get("parameters") != current.get("parameters"):
+        log(f"Note: parameters differ from the baseline {baseline.get('parameters')}")
+    before = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    log(f"\n{'stage':<26} {'scale':<9} {'baseline':>12} {'current':>12} {'ratio':>7} {'memory':>7}")
+    for r in current["results"]:
+        b = before.get((r["stage"], r["scale"]))
+        if b is None:
+            log(f"{r['stage']:<26} {r['scale']:<9} {'-':>12} {r['seconds'] * 1e3:10.2f}ms   (new)")
+            continue
+        ratio = r["seconds"] / b["seconds"] if b["seconds"] else float("inf")
+        memory = (r["peak_bytes"] / b["peak_bytes"]) if r.get("peak_bytes") and b.get("peak_bytes") else None
+        flags = []
+        if ratio > threshold:
+            flags.append("slower")
+            regressions.append((r["stage"], r["scale"], "seconds"))
+        if memory is not None and memory > threshold:
+            flags.append("more memory")
+            regressions.append((r["stage"], r["scale"], "peak_bytes"))
+        memory_text = f"{memory:6.2f}x" if memory is not None else f"{'-':>7}"
+        log(f"{r['stage']:<26} {r['scale']:<9} {b['seconds'] * 1e3:10.2f}ms {r['seconds'] * 1e3:10.2f}ms "
+            f"{ratio:6.2f}x {memory_text} {' '.join(flags)}")
+    return regressions
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic companyfacts.")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--years", type=int, default=15)
+    parser.add_argument("--restatement-rate", type=float, default=0.1, help="Share of comparatives that are restated.")
+    parser.add_argument("--fiscal-year-ends", default="12,12,12,9,6,3",
+                        help="Comma-separated fiscal year end months to draw from.")
+    parser.add_argument("--noise-concepts", type=int, default=40, help="Unrelated us-gaap tags per document.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per single-ticker measurement (best is kept).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory runs.")
+    parser.add_argument("-o", "--output", help=f"Results file (default: a timestamped file in {BENCHMARK_DIR}).")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare with a saved results file.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Ratio above which a stage counts as a regression.")
+    parser.add_argument("--check", action="store_true",
+                        help="Instead of timing, check derived quarters against the fixtures' true values "
+                             "(values too when --restatement-rate is 0) and that yields are populated.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    parameters = {
+        "companies": args.companies, "years": args.years, "restatement_rate": args.restatement_rate,
+        "fiscal_year_ends": args.fiscal_year_ends, "noise_concepts": args.noise_concepts, "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    start = time.perf_counter()
+    companies = make_companies(
+        args.companies, seed=args.seed, years=args.years, restatement_rate=args.restatement_rate,
+        fiscal_year_ends=tuple(int(m) for m in args.fiscal_year_ends.split(",")), noise_concepts=args.noise_concepts,
+    )
+    size = sum(len(c.body) for c in companies)
+    print(f"Generated {len(companies)} companies x {args.years} years ({size / 1e6:.1f} MB companyfacts) "
+          f"in {time.perf_counter() - start:.1f} s\n")
+
+    if args.check:
+        failures = check_quarters(companies, check_values=args.restatement_rate == 0)
+        failures += check_yields(companies, seed=args.seed)
+        for failure in failures[:50]:
+            print(f"❌ {failure}")
+        print(f"{len(failures)} failed checks." if failures else f"✅ All checks passed for {len(companies)} companies.")
+        return None, failures
+
+    results = run_benchmarks(companies, repeat=args.repeat, trace_memory=not args.no_memory)
+    report = {"started_at": started_at, "environment": environment(), "parameters": parameters, "results": results}
+
+    if not args.no_save:
+        print(f"\nSaved results to {save_results(report, args.output)}")
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare_results(json.load(f), report, threshold=args.threshold)
+        print(f"\n{len(regressions)} regressions above {args.threshold:.2f}x" if regressions else "\nNo regressions.")
+    return report, regressions
+
+def cli(argv=None):
+    # Console entry point: exit status 1 when --compare found a regression or --check a mismatch
+    _, problems = main(argv)
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    cli()
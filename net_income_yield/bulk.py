@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from . import concepts, http_cache
+
+# -------------------------------
+# Pipeline modules (shared across callers)
+# -------------------------------
+def load_pipeline_modules():
+    from . import net_income, pipeline, shares, submissions
+    return net_income, submissions, shares, pipeline
+
+# -------------------------------
+# Archive members
+# -------------------------------
+# companyfacts.zip and submissions.zip hold one CIK##########.json per company;
+# submissions.zip also holds CIK##########-submissions-###.json history pages.
+MEMBER_PATTERN = re.compile(r"^CIK(\d{10})\.json$")
+
+def list_ciks(archive_path):
+    with zipfile.ZipFile(archive_path) as archive:
+        ciks = []
+        for name in archive.namelist():
+            match = MEMBER_PATTERN.match(os.path.basename(name))
+            if match:
+                ciks.append(match.group(1))
+        return sorted(ciks)
+
+def read_member_json(archive, cik, prefixes=None, name=None):
+    """Parse one member; with `prefixes`, only those subtrees are materialized."""
+    try:
+        with archive.open(name or f"CIK{cik}.json") as member:
+            if prefixes is None:
+                return json.load(member)
+            return http_cache.load_json_subtrees(member, prefixes)
+    except KeyError:
+        return None
+
+# -------------------------------
+# Worker process state
+# -------------------------------
+_worker = {}
+
+def _init_worker(companyfacts_path, submissions_path, fact_store=None):
+    _worker["companyfacts"] = zipfile.ZipFile(companyfacts_path)
+    _worker["submissions"] = zipfile.ZipFile(submissions_path) if submissions_path else None
+    _worker["modules"] = load_pipeline_modules()
+    _worker["fact_store"] = fact_store
+    if fact_store:
+        from . import parquet_store
+        _worker["parquet"] = parquet_store
+
+def process_cik(cik):
+    """Run the net income, shares and filing-date extraction for one CIK.
+
+    Returns (cik, frame, error). A CIK without net income facts returns an
+    empty frame and no error.
+    """
+    ttm_mod, sub_mod, shares_mod, combined_mod = _worker["modules"]
+    try:
+        facts = read_member_json(_worker["companyfacts"], cik, prefixes=concepts.concept_prefixes())
+        if not facts:
+            return cik, pd.DataFrame(), None
+
+        concepts_df = concepts.extract_concepts(facts)
+        net_df = ttm_mod.net_income_from_concepts(concepts_df)
+        if net_df.empty:
+            return cik, pd.DataFrame(), None
+        facts_df = ttm_mod.normalize_facts(net_df, keep_ytd=True)
+        net_df = ttm_mod.derive_fiscal_quarters(facts_df)
+        if net_df.empty:
+            return cik, pd.DataFrame(), None
+        net_df = ttm_mod.calculate_ttm_net_income(net_df)
+
+        submissions = read_member_json(_worker["submissions"], cik) if _worker["submissions"] else None
+        if submissions:
+            # Older filings live in the CIK##########-submissions-###.json history pages
+            names = [f.get("name") for f in submissions.get("filings", {}).get("files", []) if f.get("name")]
+            pages = [read_member_json(_worker["submissions"], cik, name=name) for name in names]
+            filing_df = sub_mod.extract_filing_links(cik, submissions, [p for p in pages if p])
+            tickers = submissions.get("tickers") or []
+        else:
+            filing_df = pd.DataFrame()
+            tickers = []
+
+        shares_df = shares_mod.shares_from_concepts(concepts_df)
+
+        ticker = tickers[0].upper() if tickers else cik
+        if _worker["fact_store"]:
+            _worker["parquet"].append_facts(cik, facts_df, ticker=ticker, root=_worker["fact_store"])
+            _worker["parquet"].append_quarterly(cik, net_df, ticker=ticker, root=_worker["fact_store"])
+        merged = combined_mod.merge_ticker_frames(ticker, net_df, filing_df, shares_df)
+        merged.insert(1, "CIK", cik)
+        return cik, merged, None
+    except Exception as e:
+        return cik, pd.DataFrame(), f"{type(e).__name__}: {e}"
+
+# -------------------------------
+# Bulk ingestion
+# -------------------------------
+def ingest_archives(companyfacts_path, submissions_path=None, ciks=None, workers=None, fact_store=None):
+    """Rebuild the combined data for every CIK in the SEC bulk archives.
+
+    Reads companyfacts.zip (and optionally submissions.zip) from local paths
+    without any HTTP requests, spreading CIKs across worker processes.
+    With `fact_store`, each worker also appends its facts and quarters to
+    that Parquet store.
+    Returns (combined_df, errors_df).
+    """
+    if ciks is None:
+        ciks = list_ciks(companyfacts_path)
+    else:
+        ciks = [str(cik).zfill(10) for cik in ciks]
+
+    frames = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(companyfacts_path, submissions_path, fact_store)) as pool:
+        futures = [pool.submit(process_cik, cik) for cik in ciks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            cik, frame, error = future.result()
+            if error:
+                errors.append({"CIK": cik, "Error": error})
+            elif not frame.empty:
+                frames.append(frame)
+            if done % 500 == 0:
+                print(f"Processed {done}/{len(ciks)} companies...")
+
+    combined_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if not combined_df.empty:
+        combined_df = combined_df.sort_values(["CIK", "Date"]).reset_index(drop=True)
+    errors_df = pd.DataFrame(errors, columns=["CIK", "Error"])
+    return combined_df, errors_df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline rebuild from SEC companyfacts.zip / submissions.zip.")
+    parser.add_argument("companyfacts", help="Path to companyfacts.zip")
+    parser.add_argument("--submissions", help="Path to submissions.zip (adds filing dates and tickers)")
+    parser.add_argument("--cik", action="append", help="Only process this CIK (repeatable)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", default="all_combined_data.csv", help="Combined CSV output path")
+    parser.add_argument("-e", "--errors", help="Write the per-CIK error report to this CSV file")
+    parser.add_argument("--fact-store", metavar="DIR", help="Also append normalized facts and quarters to this Parquet store")
+    args = parser.parse_args(argv)
+
+    combined_df, errors_df = ingest_archives(args.companyfacts, args.submissions, ciks=args.cik, workers=args.workers,
+                                           fact_store=args.fact_store)
+
+    combined_df.to_csv(args.output, index=False)
+    print(f"✅ Saved {len(combined_df)} rows for {combined_df['CIK'].nunique() if not combined_df.empty else 0} companies to {args.output}")
+    if args.errors:
+        errors_df.to_csv(args.errors, index=False)
+    if not errors_df.empty:
+        print(f"❌ {len(errors_df)} companies failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import pandas as pd
+
+# -------------------------------
+# Declarative concept map
+# -------------------------------
+# Each metric lists its XBRL tags in order of preference.
+#   fallback "period":  per reporting period (start, end) the first tag that has a value wins,
+#                       so a filer that switched tags over the years still gets a full history.
+#   fallback "concept": the first tag with any value is used for the whole company, for
+#                       tags that measure different things (cover-page vs weighted average).
+CONCEPTS = {
+    "Net Income": {
+        "unit": "USD",
+        "fallback": "period",
+        "tags": [
+            ("us-gaap", "NetIncomeLoss"),
+            ("us-gaap", "ProfitLoss"),
+            ("us-gaap", "NetIncomeLossAvailableToCommonStockholdersBasic"),
+        ],
+    },
+    "Shares Outstanding": {
+        "unit": "shares",
+        "fallback": "concept",
+        "tags": [
+            ("dei", "EntityCommonStockSharesOutstanding"),
+            ("us-gaap", "WeightedAverageNumberOfSharesOutstandingBasic"),
+        ],
+    },
+}
+
+FORMS = ("10-K", "10-Q")
+
+def concept_prefixes(metrics=None, concepts=CONCEPTS):
+    """Dotted companyfacts paths ("facts.<taxonomy>.<tag>") of the metrics' tags, for streaming parses."""
+    metrics = list(concepts) if metrics is None else list(metrics)
+    return list(dict.fromkeys(f"facts.{taxonomy}.{tag}" for m in metrics for taxonomy, tag in concepts[m]["tags"]))
+LONG_COLUMNS = ["Metric", "Taxonomy", "Tag", "Priority", "Date", "Start", "Value", "Form", "FY", "FP", "Filed", "Accession Number"]
+
+# -------------------------------
+# One-pass extraction
+# -------------------------------
+def extract_concepts(data, metrics=None, forms=FORMS, concepts=CONCEPTS):
+    """All requested metrics of one companyfacts document as a long frame.
+
+    The (taxonomy, tag, unit) subtrees of every metric are visited once and
+    their entries appended to shared column lists, so adding a metric adds
+    neither a download nor another walk over the document. Ordered tag
+    fallbacks are then resolved per metric (see CONCEPTS). Columns: Metric,
+    Taxonomy, Tag, Priority, Date (period end), Start, Value, Form, FY, FP,
+    Filed, Accession Number.
+    """
+    metrics = list(concepts) if metrics is None else list(metrics)
+    facts = (data or {}).get("facts", {})
+    forms = set(forms)
+    columns = {name: [] for name in LONG_COLUMNS}
+
+    for metric in metrics:
+        spec = concepts[metric]
+        for priority, (taxonomy, tag) in enumerate(spec["tags"]):
+            entries = facts.get(taxonomy, {}).get(tag, {}).get("units", {}).get(spec["unit"], [])
+            for entry in entries:
+                if entry.get("form") not in forms:
+                    continue
+                columns["Metric"].append(metric)
+                columns["Taxonomy"].append(taxonomy)
+                columns["Tag"].append(tag)
+                columns["Priority"].append(priority)
+                columns["Date"].append(entry.get("end"))
+                columns["Start"].append(entry.get("start"))
+                columns["Value"].append(entry.get("val"))
+                columns["Form"].append(entry.get("form"))
+                columns["FY"].append(entry.get("fy"))
+                columns["FP"].append(entry.get("fp"))
+                columns["Filed"].append(entry.get("filed"))
+                columns["Accession Number"].append(entry.get("accn"))
+
+    df = pd.DataFrame(columns)
+    if df.empty:
+        return df
+    df["Value"] = pd.to_numeric(df["Value"], errors="coerce").astype("float64")
+    for col in ("Date", "Start", "Filed"):
+        df[col] = pd.to_datetime(df[col])
+    return resolve_fallbacks(df, concepts)
+
+def resolve_fallbacks(df, concepts=CONCEPTS):
+    """Keep, per metric, only the preferred tag's rows as defined by its fallback mode."""
+    # Best priority per metric, and per (metric, start, end) period
+    best_concept = df.groupby("Metric")["Priority"].transform("min")
+    best_period = df.groupby(["Metric", "Start", "Date"], dropna=False)["Priority"].transform("min")
+    by_period = df["Metric"].map({m: spec.get("fallback", "period") == "period" for m, spec in concepts.items()})
+    keep = df["Priority"] == best_period.where(by_period.astype(bool), best_concept)
+    return df[keep].sort_values(["Metric", "Date"], kind="stable").reset_index(drop=True)
+
+def metric_frame(long_df, metric, value_col=None):
+    """Wide frame for one metric: Date, Form, <metric>, Start, FY, FP, Filed, Tag."""
+    value_col = value_col or metric
+    if long_df is None or long_df.empty:
+        return pd.DataFrame()
+    rows = long_df[long_df["Metric"] == metric]
+    if rows.empty:
+        return pd.DataFrame()
+    out = rows[["Date", "Form", "Value", "Start", "FY", "FP", "Filed", "Tag"]].rename(columns={"Value": value_col})
+    return out.sort_values("Date", kind="stable").reset_index(drop=True)
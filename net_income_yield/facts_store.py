@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+from . import concepts, http_cache
+
+# -------------------------------
+# Download one companyfacts document
+# -------------------------------
+def company_facts_url(cik):
+    return http_cache.sec_url(f"api/xbrl/companyfacts/CIK{str(cik).zfill(10)}.json")
+
+def fetch_company_facts(cik, prefixes=None, max_age=None):
+    """companyfacts document reduced to the concept map's tags (or the given `prefixes`).
+
+    The cached body is parsed as a stream, so only those subtrees are ever
+    built; large filers no longer cost hundreds of MB per worker. `max_age`
+    overrides the HTTP cache ttl (see HttpCache.get_path).
+    """
+    prefixes = concepts.concept_prefixes() if prefixes is None else prefixes
+    return http_cache.cached_get_json_subtrees(company_facts_url(cik), prefixes, max_age=max_age)
+
+# -------------------------------
+# In-memory fact store shared by all extractors
+# -------------------------------
+class CompanyFactsStore:
+    """Downloads and parses each companyfacts document once per CIK.
+
+    Parsed documents are kept in a small LRU so the net income, shares
+    outstanding and any later extractors all read the same object. Concurrent
+    requests for the same CIK wait for the first download instead of starting
+    their own.
+    """
+
+    def __init__(self, max_entries=32, fetch=fetch_company_facts):
+        self.max_entries = max_entries
+        self.fetch = fetch
+        self._facts = OrderedDict()
+        self._lock = threading.Lock()
+        self._cik_locks = {}
+
+    def get(self, cik):
+        key = str(cik).zfill(10)
+        with self._lock:
+            if key in self._facts:
+                self._facts.move_to_end(key)
+                return self._facts[key]
+            cik_lock = self._cik_locks.setdefault(key, threading.Lock())
+
+        with cik_lock:
+            with self._lock:
+                if key in self._facts:
+                    self._facts.move_to_end(key)
+                    return self._facts[key]
+
+            try:
+                facts = self.fetch(key)
+                with self._lock:
+                    self._facts[key] = facts
+                    while len(self._facts) > self.max_entries:
+                        self._facts.popitem(last=False)
+            finally:
+                # Dropped on failure too, so unknown or failing CIKs leave no lock behind
+                with self._lock:
+                    self._cik_locks.pop(key, None)
+            return facts
+
+    def clear(self):
+        with self._lock:
+            self._facts.clear()
+
+_default_store = CompanyFactsStore()
+
+def get_company_facts(cik):
+    return _default_store.get(cik)
@@ -0,0 +1,272 @@
+import argparse
+import calendar
+import json
+import os
+import random
+import zipfile
+from datetime import date, timedelta
+
+# -------------------------------
+# Synthetic SEC documents
+# -------------------------------
+# Companyfacts and submissions documents shaped like data.sec.gov's, for
+# benchmarks and offline runs. Each 10-Q reports its quarter, the fiscal
+# year-to-date value and the prior-year comparatives; each 10-K reports
+# three fiscal years. Restated comparatives carry a different value under
+# a later accession number, as real restatements do.
+
+def month_end(year, month):
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return month_end(day.year + month // 12, month % 12 + 1)
+
+def fiscal_year_dates(fiscal_year, fiscal_year_end_month=12):
+    """(start, end) of a fiscal year labelled by the calendar year it ends in."""
+    end = month_end(fiscal_year, fiscal_year_end_month)
+    return add_months(end, -12) + timedelta(days=1), end
+
+def accession(cik, year, seq):
+    return f"{int(cik) % 10 ** 10:010d}-{year % 100:02d}-{seq:06d}"
+
+def make_company(cik, ticker=None, years=10, end_year=2024, fiscal_year_end_month=12, restatement_rate=0.1,
+                 noise_concepts=40, current_reports_per_year=4, page_size=1000, seed=None):
+    """companyfacts, submissions and submissions history pages of one synthetic filer.
+
+    Returns {"companyfacts": dict, "submissions": dict, "pages": {name: dict},
+    "quarters": {fiscal year: [Q1..Q4 net income]}, "first_year": int,
+    "fiscal_year_end_month": int}; the last three are the true values the
+    documents were generated from (see expected_quarters).
+    `noise_concepts` unrelated us-gaap tags pad the document to a realistic
+    size; `current_reports_per_year` 8-Ks are mixed into the submissions.
+    Filings beyond the newest `page_size` move to history pages listed
+    under filings.files, like EDGAR's paginated submissions.
+    """
+    rng = random.Random(seed if seed is not None else int(cik))
+    cik = f"{int(cik):010d}"
+    ticker = ticker or f"SYN{int(cik)}"
+    first_year = end_year - years + 1
+
+    # True quarterly net income per fiscal year, then the values each filing reports
+    level = rng.lognormvariate(18, 1.5)
+    quarters = {}
+    for fy in range(first_year - 2, end_year + 1):
+        level *= rng.uniform(0.9, 1.2)
+        quarters[fy] = [round(level * rng.uniform(0.6, 1.4) * (-1 if rng.random() < 0.05 else 1)) for _ in range(4)]
+
+    def restated(value):
+        return round(value * rng.uniform(0.95, 1.05)) if rng.random() < restatement_rate else value
+
+    net_income, shares, noise, filings = [], [], {}, []
+    seq = 0
+    shares_outstanding = rng.randint(10 ** 7, 5 * 10 ** 9)
+
+    def file(form, period_end, filed):
+        nonlocal seq
+        seq += 1
+        filings.append({"form": form, "accessionNumber": accession(cik, filed.year, seq),
+                        "reportDate": period_end.isoformat(), "filingDate": filed.isoformat()})
+        return filings[-1]["accessionNumber"]
+
+    def fact(accn, fy, fp, form, filed, start, end, value):
+        return {"start": start.isoformat(), "end": end.isoformat(), "val": value, "accn": accn,
+                "fy": fy, "fp": fp, "form": form, "filed": filed.isoformat()}
+
+    for fy in range(first_year, end_year + 1):
+        fy_start, fy_end = fiscal_year_dates(fy, fiscal_year_end_month)
+        prior_start, _ = fiscal_year_dates(fy - 1, fiscal_year_end_month)
+        for q in (1, 2, 3, 4):
+            q_end = add_months(fy_start - timedelta(days=1), 3 * q)
+            q_start = add_months(fy_start - timedelta(days=1), 3 * (q - 1)) + timedelta(days=1)
+            prior_q_end = add_months(prior_start - timedelta(days=1), 3 * q)
+            prior_q_start = add_months(prior_start - timedelta(days=1), 3 * (q - 1)) + timedelta(days=1)
+            form, fp = ("10-K", "FY") if q == 4 else ("10-Q", f"Q{q}")
+            filed = q_end + timedelta(days=rng.randint(60, 75) if q == 4 else rng.randint(30, 45))
+            accn = file(form, q_end, filed)
+
+            if q < 4:
+                # Quarter, year to date, and the prior-year comparatives of both
+                net_income.append(fact(accn, fy, fp, form, filed, q_start, q_end, quarters[fy][q - 1]))
+                net_income.append(fact(accn, fy, fp, form, filed, prior_q_start, prior_q_end,
+                                       restated(quarters[fy - 1][q - 1])))
+                if q > 1:
+                    net_income.append(fact(accn, fy, fp, form, filed, fy_start, q_end, sum(quarters[fy][:q])))
+                    net_income.append(fact(accn, fy, fp, form, filed, prior_start, prior_q_end,
+                                           restated(sum(quarters[fy - 1][:q]))))
+            else:
+                for back in (0, 1, 2):
+                    start, end = fiscal_year_dates(fy - back, fiscal_year_end_month)
+                    value = sum(quarters[fy - back])
+                    net_income.append(fact(accn, fy, fp, form, filed, start, end, restated(value) if back else value))
+
+            shares_outstanding = round(shares_outstanding * rng.uniform(0.97, 1.02))
+            cover_date = filed - timedelta(days=rng.randint(5, 20))
+            shares.append({"end": cover_date.isoformat(), "val": shares_outstanding, "accn": accn, "fy": fy,
+                           "fp": fp, "form": form, "filed": filed.isoformat()})
+            for i in range(noise_concepts):
+                noise.setdefault(f"SyntheticConcept{i:03d}", []).append(
+                    fact(accn, fy, fp, form, filed, q_start, q_end, rng.randint(-10 ** 9, 10 ** 10)))
+
+        for _ in range(current_reports_per_year):
+            day = fy_start + timedelta(days=rng.randint(0, 364))
+            file("8-K", day, day + timedelta(days=rng.randint(0, 4)))
+
+    us_gaap = {"NetIncomeLoss": {"label": "Net Income (Loss)", "units": {"USD": net_income}}}
+    for tag, entries in noise.items():
+        us_gaap[tag] = {"label": tag, "description": f"Synthetic concept {tag}.", "units": {"USD": entries}}
+    companyfacts = {
+        "cik": int(cik),
+        "entityName": f"Synthetic Company {int(cik)}",
+        "facts": {
+            "dei": {"EntityCommonStockSharesOutstanding": {"label": "Entity Common Stock, Shares Outstanding",
+                                                           "units": {"shares": shares}}},
+            "us-gaap": us_gaap,
+        },
+    }
+
+    # Newest first, like EDGAR; the oldest filings spill into history pages
+    filings.sort(key=lambda f: (f["filingDate"], f["accessionNumber"]), reverse=True)
+    chunks = [filings[i:i + page_size] for i in range(0, len(filings), page_size)] or [[]]
+    pages, files = {}, []
+    for n, chunk in enumerate(chunks[1:], start=1):
+        name = f"CIK{cik}-submissions-{n:03d}.json"
+        pages[name] = columnar(chunk)
+        files.append({"name": name, "filingCount": len(chunk),
+                      "filingFrom": chunk[-1]["filingDate"], "filingTo": chunk[0]["filingDate"]})
+    submissions = {
+        "cik": cik,
+        "name": companyfacts["entityName"],
+        "tickers": [ticker],
+        "fiscalYearEnd": f"{fiscal_year_end_month:02d}{calendar.monthrange(2001, fiscal_year_end_month)[1]:02d}",
+        "filings": {"recent": columnar(chunks[0]), "files": files},
+    }
+    return {"companyfacts": companyfacts, "submissions": submissions, "pages": pages, "quarters": quarters,
+            "first_year": first_year, "fiscal_year_end_month": fiscal_year_end_month}
+
+def expected_quarters(company):
+    """True (Date, Fiscal Year, Fiscal Quarter, Net Income) of every quarter of a make_company result.
+
+    Values are those of the original filings, so derived quarters match
+    them exactly only for companies made with restatement_rate=0.
+    """
+    rows = []
+    for fy, values in sorted(company["quarters"].items()):
+        fy_start, _ = fiscal_year_dates(fy, company["fiscal_year_end_month"])
+        for q, value in enumerate(values, start=1):
+            rows.append({"Date": add_months(fy_start - timedelta(days=1), 3 * q), "Fiscal Year": fy,
+                         "Fiscal Quarter": q, "Net Income": value})
+    return rows
+
+def columnar(filings):
+    """EDGAR's column-per-field layout of a list of filing dicts."""
+    fields = ("accessionNumber", "filingDate", "reportDate", "form")
+    return {field: [f[field] for f in filings] for field in fields}
+
+def make_universe(companies, years=10, end_year=2024, fiscal_year_ends=(12, 12, 12, 9, 6, 3), restatement_rate=0.1,
+                  noise_concepts=40, seed=0, **company_options):
+    """Yield (ticker, cik, company) for `companies` synthetic filers.
+
+    Fiscal year end months are drawn from `fiscal_year_ends`, so the
+    default mix is half calendar-year and half non-calendar filers.
+    """
+    rng = random.Random(seed)
+    for n in range(companies):
+        cik = f"{n + 1:010d}"
+        ticker = f"SYN{n:05d}"
+        yield ticker, cik, make_company(
+            cik, ticker=ticker, years=years, end_year=end_year, fiscal_year_end_month=rng.choice(fiscal_year_ends),
+            restatement_rate=restatement_rate, noise_concepts=noise_concepts, seed=rng.randrange(2 ** 32),
+            **company_options,
+        )
+
+def make_prices(tickers, start, end, seed=0):
+    """Yield (ticker, date, close) weekday closes from `start` to `end`, a random walk per ticker."""
+    rng = random.Random(seed)
+    for ticker in tickers:
+        close = rng.uniform(5, 500)
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                close = max(0.5, close * rng.lognormvariate(0, 0.02))
+                yield ticker, day, round(close, 2)
+            day += timedelta(days=1)
+
+# -------------------------------
+# Write a data.sec.gov-shaped tree
+# -------------------------------
+def write_fixtures(root, companies, archives=False, prices=False, **options):
+    """Write a synthetic universe under `root` and return a summary.
+
+    Layout mirrors SEC_DATA_URL paths (api/xbrl/companyfacts/CIK*.json,
+    submissions/CIK*.json and history pages), plus company_tickers.json for
+    the ticker index. Serve `root` over HTTP and point SEC_DATA_URL at it
+    to run the pipeline offline. With `archives`, companyfacts.zip and
+    submissions.zip are written as well for the bulk ingestion; with
+    `prices`, prices.csv (Ticker, Date, Close) for the yield calculations.
+    """
+    facts_dir = os.path.join(root, "api", "xbrl", "companyfacts")
+    submissions_dir = os.path.join(root, "submissions")
+    os.makedirs(facts_dir, exist_ok=True)
+    os.makedirs(submissions_dir, exist_ok=True)
+
+    tickers = {}
+    total_bytes = 0
+    facts_zip = zipfile.ZipFile(os.path.join(root, "companyfacts.zip"), "w", zipfile.ZIP_DEFLATED) if archives else None
+    submissions_zip = zipfile.ZipFile(os.path.join(root, "submissions.zip"), "w", zipfile.ZIP_DEFLATED) if archives else None
+    try:
+        for n, (ticker, cik, company) in enumerate(make_universe(companies, **options)):
+            documents = [(facts_dir, f"CIK{cik}.json", company["companyfacts"], facts_zip),
+                         (submissions_dir, f"CIK{cik}.json", company["submissions"], submissions_zip)]
+            documents += [(submissions_dir, name, page, submissions_zip) for name, page in company["pages"].items()]
+            for directory, name, document, archive in documents:
+                body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+                total_bytes += len(body)
+                with open(os.path.join(directory, name), "wb") as f:
+                    f.write(body)
+                if archive is not None:
+                    archive.writestr(name, body)
+            tickers[str(n)] = {"cik_str": int(cik), "ticker": ticker, "title": company["companyfacts"]["entityName"]}
+    finally:
+        for archive in (facts_zip, submissions_zip):
+            if archive is not None:
+                archive.close()
+
+    with open(os.path.join(root, "company_tickers.json"), "w", encoding="utf-8") as f:
+        json.dump(tickers, f)
+    if prices:
+        end_year = options.get("end_year", 2024)
+        start = date(end_year - options.get("years", 10) - 1, 1, 1)
+        with open(os.path.join(root, "prices.csv"), "w", encoding="utf-8", newline="") as f:
+            f.write("Ticker,Date,Close\n")
+            for ticker, day, close in make_prices([t["ticker"] for t in tickers.values()], start,
+                                                  date(end_year + 1, 12, 31), seed=options.get("seed", 0)):
+                f.write(f"{ticker},{day.isoformat()},{close}\n")
+    return {"companies": len(tickers), "bytes": total_bytes, "root": root}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic companyfacts/submissions documents.")
+    parser.add_argument("root", help="Output directory (SEC_DATA_URL layout).")
+    parser.add_argument("--companies", type=int, default=100)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--restatement-rate", type=float, default=0.1, help="Share of comparatives that are restated.")
+    parser.add_argument("--fiscal-year-ends", default="12,12,12,9,6,3",
+                        help="Comma-separated fiscal year end months to draw from.")
+    parser.add_argument("--noise-concepts", type=int, default=40, help="Unrelated us-gaap tags per document.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--archives", action="store_true", help="Also write companyfacts.zip and submissions.zip.")
+    parser.add_argument("--prices", action="store_true", help="Also write prices.csv with synthetic daily closes.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = write_fixtures(
+        args.root, args.companies, archives=args.archives, prices=args.prices, years=args.years, end_year=args.end_year,
+        fiscal_year_ends=tuple(int(m) for m in args.fiscal_year_ends.split(",")),
+        restatement_rate=args.restatement_rate, noise_concepts=args.noise_concepts, seed=args.seed,
+    )
+    print(f"Wrote {summary['companies']} companies ({summary['bytes'] / 1e6:.1f} MB of JSON) to {summary['root']}")
+
+if __name__ == "__main__":
+    main()
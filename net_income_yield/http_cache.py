@@ -0,0 +1,321 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import metrics, sec_client
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+# Point SEC_DATA_URL at a local stand-in server to run without data.sec.gov.
+SEC_DATA_URL = os.environ.get("SEC_DATA_URL", "https://data.sec.gov").rstrip("/")
+CACHE_DIR = os.environ.get("SEC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".sec_cache"))
+CACHE_TTL = float(os.environ.get("SEC_CACHE_TTL", 12 * 60 * 60))
+CACHE_MAX_BYTES = int(os.environ.get("SEC_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+def sec_url(path):
+    return f"{SEC_DATA_URL}/{path.lstrip('/')}"
+
+# -------------------------------
+# Streaming subtree parse
+# -------------------------------
+def _ijson():
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+def _assign(result, prefix, value):
+    node = result
+    keys = prefix.split(".")
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    node[keys[-1]] = value
+
+def prune_json(document, prefixes):
+    """Keep only the `prefixes` subtrees (dotted key paths) and top-level scalars."""
+    result = {k: v for k, v in document.items() if not isinstance(v, (dict, list))}
+    for prefix in prefixes:
+        node = document
+        for key in prefix.split("."):
+            node = node.get(key) if isinstance(node, dict) else None
+            if node is None:
+                break
+        if node is not None:
+            _assign(result, prefix, node)
+    return result
+
+def load_json_subtrees(f, prefixes):
+    """Parse a JSON file object, materializing only the `prefixes` subtrees.
+
+    Prefixes are dotted key paths such as "facts.us-gaap.NetIncomeLoss".
+    With ijson installed the document is read as a stream of parse events
+    and only the wanted subtrees are built, so memory stays at the size of
+    those subtrees rather than the whole document. Top-level scalars (cik,
+    entityName) are kept as well. Without ijson the whole document is
+    loaded and pruned to the same result.
+    """
+    ijson = _ijson()
+    if ijson is None:
+        return prune_json(json.load(f), prefixes)
+
+    wanted = set(prefixes)
+    result = {}
+    builder = building = None
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == building and event in ("end_map", "end_array"):
+                _assign(result, building, builder.value)
+                builder = building = None
+        elif event in ("start_map", "start_array"):
+            if prefix in wanted:
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                building = prefix
+        elif event not in ("map_key", "end_map", "end_array") and (prefix in wanted or (prefix and "." not in prefix)):
+            _assign(result, prefix, value)
+    return result
+
+# -------------------------------
+# Persistent HTTP cache
+# -------------------------------
+class HttpCache:
+    """URL-keyed disk cache for SEC JSON endpoints.
+
+    Bodies are stored gzip-compressed under `cache_dir`, with an SQLite index
+    holding the ETag / Last-Modified validators. Entries younger than `ttl`
+    seconds are served without any request; older ones are revalidated with
+    If-None-Match / If-Modified-Since so an unchanged document costs a 304.
+    Network requests go through the shared rate-limited SEC client.
+    Least recently used bodies are evicted once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, client=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.client = client or sec_client.get_client()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " url TEXT PRIMARY KEY, path TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+            " fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.commit()
+
+    def _body_path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path, etag, last_modified, fetched_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row and not os.path.exists(row[0]):
+            return None
+        return row
+
+    def _read_body(self, path):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+
+    def _touch(self, url, fetched_at=None):
+        now = time.time()
+        with self._lock:
+            if fetched_at is None:
+                self._db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (now, url))
+            else:
+                self._db.execute("UPDATE entries SET accessed_at = ?, fetched_at = ? WHERE url = ?", (now, fetched_at, url))
+            self._db.commit()
+
+    def _store(self, url, chunks, etag, last_modified):
+        path = self._body_path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        downloaded = 0
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    downloaded += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # A download cut off mid-stream must not leave its partial body behind
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        metrics.increment("http_bytes_downloaded", downloaded)
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (url, path, etag, last_modified, fetched_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, path, etag, last_modified, now, now, size),
+            )
+            self._db.commit()
+        self._evict(keep=url)
+        return path
+
+    def _evict(self, keep=None):
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._db.execute("SELECT url, path, size FROM entries ORDER BY accessed_at").fetchall()
+            for url, path, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if url == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                total -= size
+            self._db.commit()
+
+    def get_path(self, url, headers=None, max_age=None):
+        """Path of the gzip-compressed cached body of `url`, fetched or revalidated as needed.
+
+        A new body is streamed from the response straight into the cache
+        file, so it is never held in memory as a whole. `max_age` overrides
+        the cache ttl for this call (0 always revalidates).
+        """
+        entry, path = self._fresh(url, max_age)
+        if path is not None:
+            return path
+
+        with metrics.stage("http"):
+            response = self.client.get(url, headers=self._request_headers(entry, headers), stream=True)
+            try:
+                return self._handle(url, entry, response)
+            finally:
+                response.close()
+
+    async def get_path_async(self, url, headers=None, max_age=None):
+        """get_path for asyncio code; the request goes through the client's `fetch`."""
+        entry, path = self._fresh(url, max_age)
+        if path is not None:
+            return path
+
+        with metrics.stage("http"):
+            return await self.client.fetch(
+                url, headers=self._request_headers(entry, headers),
+                consume=lambda response: self._handle(url, entry, response),
+            )
+
+    async def get_paths_async(self, urls, headers=None, max_age=None):
+        """get_path_async for many URLs concurrently; a failed URL yields its exception instead of a path."""
+        return await asyncio.gather(
+            *(self.get_path_async(url, headers=headers, max_age=max_age) for url in urls), return_exceptions=True
+        )
+
+    def prefetch(self, urls, headers=None, max_age=None):
+        """Fetch or revalidate `urls` concurrently through the async client.
+
+        Blocking callers use this to warm the cache for a batch, then read
+        the documents with get_path/get_json as usual. Returns the paths, or
+        the exception of each URL that failed, in the order of `urls`.
+        """
+        if not urls:
+            return []
+        return asyncio.run(self.get_paths_async(urls, headers=headers, max_age=max_age))
+
+    def _fresh(self, url, max_age):
+        # (entry, path): path is set when the entry is young enough to serve without a request
+        ttl = self.ttl if max_age is None else max_age
+        entry = self._lookup(url)
+        if entry and time.time() - entry[3] < ttl:
+            self._touch(url)
+            metrics.increment("cache_requests", result="hit")
+            return entry, entry[0]
+        return entry, None
+
+    def _request_headers(self, entry, headers):
+        request_headers = dict(headers or {})
+        if entry:
+            if entry[1]:
+                request_headers["If-None-Match"] = entry[1]
+            if entry[2]:
+                request_headers["If-Modified-Since"] = entry[2]
+        return request_headers
+
+    def _handle(self, url, entry, response):
+        # 304 keeps the cached body; anything else must succeed and is streamed into the cache
+        if response.status_code == 304 and entry:
+            self._touch(url, fetched_at=time.time())
+            metrics.increment("cache_requests", result="revalidated")
+            return entry[0]
+
+        response.raise_for_status()
+        metrics.increment("cache_requests", result="miss")
+        return self._store(
+            url, response.iter_content(DOWNLOAD_CHUNK_BYTES),
+            response.headers.get("ETag"), response.headers.get("Last-Modified"),
+        )
+
+    def get_bytes(self, url, headers=None, max_age=None):
+        """Return the response body for `url`, using the cache where possible."""
+        return self._read_body(self.get_path(url, headers=headers, max_age=max_age))
+
+    def get_json(self, url, headers=None, max_age=None):
+        body = self.get_bytes(url, headers=headers, max_age=max_age)
+        with metrics.stage("parse"):
+            return json.loads(body)
+
+    def get_json_subtrees(self, url, prefixes, headers=None, max_age=None):
+        """Parse only the `prefixes` subtrees of a cached JSON document (see load_json_subtrees)."""
+        path = self.get_path(url, headers=headers, max_age=max_age)
+        with metrics.stage("parse"), gzip.open(path, "rb") as f:
+            return load_json_subtrees(f, prefixes)
+
+    def clear(self):
+        with self._lock:
+            for (path,) in self._db.execute("SELECT path FROM entries").fetchall():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+# -------------------------------
+# Shared default cache
+# -------------------------------
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
+
+def cached_get_json(url, headers=None, max_age=None):
+    return get_cache().get_json(url, headers=headers, max_age=max_age)
+
+def cached_get_json_subtrees(url, prefixes, headers=None, max_age=None):
+    return get_cache().get_json_subtrees(url, prefixes, headers=headers, max_age=max_age)
+
+def prefetch(urls, headers=None, max_age=None):
+    return get_cache().prefetch(urls, headers=headers, max_age=max_age)
+
+def read_cached_json(path):
+    """Parse a body path returned by get_path or prefetch."""
+    with metrics.stage("parse"), gzip.open(path, "rb") as f:
+        return json.load(f)
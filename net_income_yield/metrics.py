@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+# Comma-separated stage names to run under cProfile ("all" for every stage)
+PROFILE_STAGES = os.environ.get("METRICS_PROFILE", "")
+PROFILE_DIR = os.environ.get("METRICS_PROFILE_DIR", "profiles")
+
+# -------------------------------
+# Run metrics
+# -------------------------------
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class RunMetrics:
+    """Stage timings and counters of one run, shared by every thread.
+
+    Wall time is kept per stage and per (ticker, stage). Stages nest: the
+    "http" and "parse" stages run inside "filings" and "companyfacts", so
+    per-stage totals can add up to more than the run time. The current
+    ticker is tracked per thread (see `ticker`), which attributes stages
+    deep in the fetch and parse code to the ticker being built without
+    passing it down. Counters are keyed by name and optional labels, e.g.
+    increment("cache_requests", result="hit").
+
+    Stages named in `profile_stages` ("all" for every one) run under
+    cProfile, one call at a time; calls that overlap a profiled call run
+    unprofiled. Each stage's calls accumulate into one profile, written by
+    write_profiles() as <profile_dir>/<stage>.prof.
+    """
+
+    def __init__(self, profile_stages=(), profile_dir=PROFILE_DIR):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stages = {}
+        self.ticker_stages = {}
+        self.counters = {}
+        self.profile_stages = {s.strip() for s in profile_stages if s.strip()}
+        self.profile_dir = profile_dir
+        self._profilers = {}
+        self._profiled_calls = {}
+        self._profiling = threading.Lock()
+
+    # --- recording ---
+    def current_ticker(self):
+        return getattr(self._local, "ticker", None)
+
+    @contextmanager
+    def ticker(self, ticker):
+        """Attribute the stages run by this thread inside the block to `ticker`."""
+        previous = self.current_ticker()
+        self._local.ticker = ticker
+        try:
+            yield
+        finally:
+            self._local.ticker = previous
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as one call of stage `name` (profiled if configured)."""
+        profiler = self._start_profile(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                self._stop_profile(name, profiler)
+            self.observe(name, seconds)
+
+    def observe(self, name, seconds, ticker=None):
+        ticker = ticker or self.current_ticker()
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            if ticker is not None:
+                key = (ticker, name)
+                self.ticker_stages[key] = self.ticker_stages.get(key, 0.0) + seconds
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # --- cProfile hook ---
+    def _start_profile(self, name):
+        if name not in self.profile_stages and "all" not in self.profile_stages:
+            return None
+        if not self._profiling.acquire(blocking=False):
+            return None
+        import cProfile
+
+        profiler = self._profilers.setdefault(name, cProfile.Profile())
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. python -m cProfile) is already active
+            self._profiling.release()
+            return None
+        return profiler
+
+    def _stop_profile(self, name, profiler):
+        profiler.disable()
+        self._profiled_calls[name] = self._profiled_calls.get(name, 0) + 1
+        self._profiling.release()
+
+    def write_profiles(self, directory=None):
+        """Dump one .prof file per profiled stage (read with pstats or snakeviz); returns their paths."""
+        directory = directory or self.profile_dir
+        paths = {}
+        with self._profiling:
+            for name, profiler in self._profilers.items():
+                os.makedirs(directory, exist_ok=True)
+                paths[name] = os.path.join(directory, f"{name}.prof")
+                profiler.dump_stats(paths[name])
+        return paths
+
+    # --- reports ---
+    def report(self):
+        """Machine-readable run report (a JSON-serializable dict)."""
+        with self._lock:
+            stages = {name: dict(stats, mean_seconds=stats["seconds"] / stats["calls"])
+                      for name, stats in sorted(self.stages.items())}
+            tickers = {}
+            for (ticker, name), seconds in sorted(self.ticker_stages.items()):
+                tickers.setdefault(ticker, {})[name] = seconds
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "seconds": time.perf_counter() - self._started,
+            "stages": stages,
+            "tickers": tickers,
+            "counters": counters,
+            "profiled_calls": dict(self._profiled_calls),
+        }
+
+    def prometheus(self, prefix="niy"):
+        """The report in Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        def labels(pairs):
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in pairs) + "}"
+
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_run_seconds Wall time of the run so far.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {report['seconds']:.6f}",
+        ]
+        for metric, field, kind, text in (
+            ("stage_seconds_total", "seconds", "counter", "Wall time spent in each stage."),
+            ("stage_calls_total", "calls", "counter", "Calls of each stage."),
+            ("stage_max_seconds", "max_seconds", "gauge", "Slowest single call of each stage."),
+        ):
+            lines += [f"# HELP {prefix}_{metric} {text}", f"# TYPE {prefix}_{metric} {kind}"]
+            lines += [f"{prefix}_{metric}{labels([('stage', name)])} {stats[field]}"
+                      for name, stats in report["stages"].items()]
+        if report["tickers"]:
+            lines += [f"# HELP {prefix}_ticker_stage_seconds Wall time per ticker and stage.",
+                      f"# TYPE {prefix}_ticker_stage_seconds gauge"]
+            lines += [f"{prefix}_ticker_stage_seconds{labels([('ticker', ticker), ('stage', name)])} {seconds:.6f}"
+                      for ticker, stages in report["tickers"].items() for name, seconds in stages.items()]
+        for name, series in report["counters"].items():
+            lines += [f"# TYPE {prefix}_{name}_total counter"]
+            lines += [f"{prefix}_{name}_total{labels(sorted(s['labels'].items()))} {s['value']}" for s in series]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path=None, prometheus_path=None):
+        """Write the JSON and/or Prometheus report (and any profiles); returns the report."""
+        report = self.report()
+        if self._profilers:
+            report["profiles"] = self.write_profiles()
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+        return report
+
+# -------------------------------
+# Process-wide default
+# -------------------------------
+# The fetch, parse and write code records into this instance; CLIs call
+# reset_metrics() at start to pick the profiled stages.
+_default_metrics = RunMetrics(PROFILE_STAGES.split(","))
+_default_metrics_lock = threading.Lock()
+
+def get_metrics():
+    return _default_metrics
+
+def reset_metrics(profile_stages=None, profile_dir=PROFILE_DIR):
+    global _default_metrics
+    with _default_metrics_lock:
+        stages = PROFILE_STAGES.split(",") if profile_stages is None else profile_stages
+        _default_metrics = RunMetrics(stages, profile_dir=profile_dir)
+        return _default_metrics
+
+def stage(name):
+    return get_metrics().stage(name)
+
+def ticker(name):
+    return get_metrics().ticker(name)
+
+def increment(name, value=1, **labels):
+    get_metrics().increment(name, value, **labels)
@@ -0,0 +1,384 @@
+import numpy as np
+import pandas as pd
+
+from . import concepts, http_cache, ticker_index
+
+# -------------------------------
+# Fetch Net Income Data from SEC
+# -------------------------------
+def get_sec_net_income(cik, facts=None):
+    """Return 10-K/10-Q NetIncomeLoss rows.
+
+    Pass an already parsed companyfacts document as `facts` to skip the
+    download, e.g. when the same document also feeds the shares extractor.
+    """
+    try:
+        if facts is None:
+            url = http_cache.sec_url(f"api/xbrl/companyfacts/CIK{str(cik).zfill(10)}.json")
+            facts = http_cache.cached_get_json_subtrees(url, concepts.concept_prefixes(["Net Income"]))
+        return extract_net_income(facts)
+    except Exception as e:
+        print(f"Error fetching data: {e}")
+        return pd.DataFrame()
+
+def extract_net_income(data):
+    """Net income facts, falling back to ProfitLoss etc. per period (see CONCEPTS)."""
+    return net_income_from_concepts(concepts.extract_concepts(data, ["Net Income"]))
+
+def net_income_from_concepts(long_df):
+    """Net income rows of an extract_concepts frame (shared with other metrics)."""
+    return concepts.metric_frame(long_df, "Net Income")
+
+# -------------------------------
+# Normalize Facts by Period Length
+# -------------------------------
+# Period classes by length in days (end - start)
+PERIOD_CLASSES = [
+    ('Q', 80, 100),     # discrete quarter
+    ('H1', 170, 200),   # six-month year-to-date
+    ('9M', 260, 290),   # nine-month year-to-date
+    ('FY', 350, 380),   # fiscal year
+]
+
+def normalize_facts(df, value_col='Net Income', keep_ytd=False):
+    """Classify duration facts by period length and keep the latest vintage.
+
+    One vectorized pass replaces the drop_duplicates / duplicated / concat
+    dedupe: each fact is labelled Q, H1, 9M or FY from its start/end dates,
+    and for every (ticker, period end, class) only the most recently filed
+    value survives. Quarters are labelled Form '10-Q' and fiscal years '10-K'
+    so the result feeds reduce_10k_to_quarterly and calculate_ttm directly.
+    Year-to-date rows are dropped unless `keep_ytd` is set. FY is the
+    smallest fy among the vintages, i.e. that of the original filing, and
+    Filed is the first filing that reported the surviving value, so a
+    comparative repeated unchanged does not move it.
+    """
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    days = (df['Date'] - df['Start']).dt.days.to_numpy()
+    conditions = [(days >= low) & (days <= high) for _, low, high in PERIOD_CLASSES]
+    period = np.select(conditions, [name for name, _, _ in PERIOD_CLASSES], default='')
+
+    keep = period != ''
+    if not keep_ytd:
+        keep &= (period == 'Q') | (period == 'FY')
+
+    out = df.loc[keep, keys + ['Date', 'Start', value_col, 'FY', 'FP', 'Filed']]
+    out.insert(len(keys) + 1, 'Form', np.where(period[keep] == 'FY', '10-K', '10-Q'))
+    out['Period'] = period[keep]
+
+    # companyfacts tags each fact with the fy of the filing that reported it, so a
+    # comparative repeated in next year's filings carries next year's fy
+    fy = pd.to_numeric(out['FY'], errors='coerce')
+    out['FY'] = fy.groupby([out[k] for k in keys + ['Date', 'Period']]).transform('min')
+
+    # Latest filed vintage per (ticker, end, class); sort is stable so ties keep file order
+    out = out.sort_values('Filed', kind='stable', na_position='first')
+    first_filed = out.groupby(keys + ['Date', 'Period', value_col], dropna=False)['Filed'].transform('min')
+    out = out.drop_duplicates(subset=keys + ['Date', 'Period'], keep='last')
+    out['Filed'] = first_filed.loc[out.index]
+    return out.sort_values(keys + ['Date'], kind='stable').reset_index(drop=True)
+
+# -------------------------------
+# Convert 10-K to Q4 Estimate
+# -------------------------------
+def reduce_10k_to_quarterly(df):
+    """Replace 10-K rows with synthesized Q4 rows (annual minus Q1..Q3).
+
+    Vectorized: the Q1/Q2/Q3 values for every 10-K are looked up in one
+    indexed pass instead of scanning the 10-Q rows per annual row. Frames
+    with a 'Ticker' column are handled per ticker in the same pass.
+    """
+    df = df.sort_values('Date').reset_index(drop=True)
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    ten_k = df[df['Form'] == '10-K']
+    ten_q = df[df['Form'] == '10-Q']
+
+    # First 10-Q per (ticker, date), the same row the per-date lookup would pick
+    first_q = ten_q.drop_duplicates(subset=keys + ['Date'])
+    q_index = pd.MultiIndex.from_frame(first_q[keys + ['Date']]) if keys else pd.Index(first_q['Date'])
+    q_values = first_q['Net Income'].to_numpy()
+
+    years = ten_k['Date'].dt.year.to_numpy()
+    found = np.ones(len(ten_k), dtype=bool)
+    total = None
+    for month, day in ((3, 31), (6, 30), (9, 30)):
+        dates = pd.to_datetime(pd.DataFrame({'year': years, 'month': month, 'day': day}))
+        if keys:
+            lookup = pd.MultiIndex.from_arrays([ten_k[k].to_numpy() for k in keys] + [dates])
+        else:
+            lookup = pd.Index(dates)
+        pos = q_index.get_indexer(lookup)
+        found &= pos >= 0
+        quarter = q_values[np.where(pos >= 0, pos, 0)] if len(q_values) else np.zeros(len(pos))
+        total = quarter if total is None else total + quarter
+
+    if found.any():
+        q4 = {k: ten_k[k].to_numpy()[found] for k in keys}
+        q4['Date'] = pd.to_datetime(pd.DataFrame({'year': years[found], 'month': 12, 'day': 31}))
+        q4['Form'] = '10-Q'
+        q4['Net Income'] = ten_k['Net Income'].to_numpy()[found] - total[found]
+        synthesized_q4 = pd.DataFrame(q4)
+        q4_keys = synthesized_q4[keys + ['Date']]
+    else:
+        synthesized_q4 = pd.DataFrame()
+        q4_keys = pd.DataFrame(columns=keys + ['Date'])
+
+    # Drop all 10-K rows and any existing rows on a synthesized Q4 date
+    if keys:
+        replaced = pd.MultiIndex.from_frame(df[keys + ['Date']]).isin(pd.MultiIndex.from_frame(q4_keys))
+    else:
+        replaced = df['Date'].isin(q4_keys['Date'])
+    df = df[~((df['Form'] == '10-K') | replaced)]
+    df = pd.concat([df, synthesized_q4], ignore_index=True)
+    return df.sort_values(keys + ['Date'] if keys else 'Date').reset_index(drop=True)
+
+# -------------------------------
+# Fiscal Calendar and YTD De-accumulation
+# -------------------------------
+DAYS_PER_QUARTER = 365.25 / 4
+
+def build_fiscal_calendar(df):
+    """One row per fiscal year: start, end and fiscal year label.
+
+    Fiscal year starts come from the start dates of the six-month, nine-month
+    and annual facts (only year-to-date periods begin on the first day of the
+    fiscal year). The label is the smallest `fy` among those facts, since
+    later filings only repeat a year as a comparative; the end is the annual
+    fact's end date, or one year after the start for a year still in
+    progress. Years that only appear as comparatives (before the first
+    filing) are labelled by counting back from the years that have their
+    own filings. A company without any year-to-date or annual fact (e.g.
+    a single first-quarter 10-Q) gets its years from the fy/fp of its
+    quarters instead. Expects the output of normalize_facts(..., keep_ytd=True).
+    """
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    anchors = df[df['Period'].isin(['H1', '9M', 'FY'])]
+    calendar = anchors.groupby(keys + ['Start'], as_index=False).agg(**{'Fiscal Year': ('FY', 'min')})
+    if keys:
+        unanchored = df[~df['Ticker'].isin(anchors['Ticker'])]
+    else:
+        unanchored = df if anchors.empty else df.iloc[:0]
+    fallback = quarter_fiscal_years(unanchored)
+    if not fallback.empty:
+        calendar = pd.concat([calendar, fallback], ignore_index=True)
+    annual_ends = anchors[anchors['Period'] == 'FY'].groupby(keys + ['Start'], as_index=False)['Date'].max()
+    calendar = calendar.merge(annual_ends, on=keys + ['Start'], how='left')
+    calendar = calendar.rename(columns={'Start': 'Fiscal Year Start', 'Date': 'Fiscal Year End'})
+
+    estimated_end = calendar['Fiscal Year Start'] + pd.DateOffset(years=1) - pd.Timedelta(days=1)
+    calendar['Fiscal Year End'] = calendar['Fiscal Year End'].fillna(estimated_end)
+    label = pd.to_numeric(calendar['Fiscal Year'], errors='coerce')
+    calendar['Fiscal Year'] = label.fillna(calendar['Fiscal Year End'].dt.year).astype('int64')
+    calendar = calendar.sort_values(keys + ['Fiscal Year Start']).reset_index(drop=True)
+
+    # Comparatives only ever carry a later fy, so the smallest label minus the
+    # years elapsed is the company's offset; labels then count up year by year
+    first_start = calendar.groupby(keys)['Fiscal Year Start'].transform('min') if keys else calendar['Fiscal Year Start'].min()
+    elapsed = np.rint((calendar['Fiscal Year Start'] - first_start).dt.days / 365.25).astype('int64')
+    offset = calendar['Fiscal Year'] - elapsed
+    offset = offset.groupby([calendar[k] for k in keys]).transform('min') if keys else offset.min()
+    calendar['Fiscal Year'] = offset + elapsed
+
+    # A first-quarter 10-Q carries no year-to-date fact, so project the year
+    # after the last known one to place a new fiscal year's first quarter
+    last = calendar.groupby(keys).tail(1) if keys else calendar.tail(1)
+    next_start = last['Fiscal Year End'] + pd.Timedelta(days=1)
+    projected = last.assign(**{
+        'Fiscal Year Start': next_start,
+        'Fiscal Year': last['Fiscal Year'] + 1,
+        'Fiscal Year End': next_start + pd.DateOffset(years=1) - pd.Timedelta(days=1),
+    })
+    calendar = pd.concat([calendar, projected], ignore_index=True)
+    return calendar.sort_values(keys + ['Fiscal Year Start']).reset_index(drop=True)
+
+def quarter_fiscal_years(df):
+    """Fiscal year starts implied by discrete Q1-Q3 facts: the start of quarter n less 3(n-1) months.
+
+    Returns Start / Fiscal Year rows like the anchor part of
+    build_fiscal_calendar: one per implied start month (52/53-week years
+    imply days a little apart; the earliest wins), labelled with the
+    smallest fy, as comparatives carry the fy of the later filing.
+    """
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    number = pd.to_numeric(df['FP'].astype(str).str.extract(r'^Q([1-3])$', expand=False), errors='coerce')
+    rows = df[(df['Period'] == 'Q') & number.notna() & df['Start'].notna() & df['FY'].notna()]
+    if rows.empty:
+        return pd.DataFrame(columns=keys + ['Start', 'Fiscal Year'])
+    months = (number[rows.index].astype('int64') - 1) * 3
+    starts = [start - pd.DateOffset(months=m) for start, m in zip(rows['Start'], months)]
+    rows = rows.assign(Start=pd.to_datetime(starts), **{'Fiscal Year': pd.to_numeric(rows['FY'], errors='coerce')})
+    rows['Start Month'] = (rows['Start'] + pd.Timedelta(days=15)).dt.to_period('M')
+    years = rows.groupby(keys + ['Start Month'], as_index=False).agg(Start=('Start', 'min'), **{'Fiscal Year': ('Fiscal Year', 'min')})
+    return years[keys + ['Start', 'Fiscal Year']]
+
+def derive_fiscal_quarters(df, value_col='Net Income', calendar=None):
+    """Discrete fiscal quarters from reported quarters and YTD values.
+
+    Every fact is placed in its fiscal year (as-of join on its start date)
+    and numbered 1-4 by how far its end lies from the fiscal year start.
+    Per fiscal year the reported three-month values and the cumulative
+    (Q1, H1, 9M, FY) values are pivoted side by side, and missing quarters
+    are filled column-wise: Qn = YTDn - YTDn-1, which also yields Q4 as FY
+    minus nine months. Works for any fiscal year end, per ticker. A
+    quarter's Filed is that of the fact it was taken from, or the later of
+    the two year-to-date facts it was derived from.
+    """
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    if calendar is None:
+        calendar = build_fiscal_calendar(df)
+    facts = df[df['Period'].isin(['Q', 'H1', '9M', 'FY']) & df['Start'].notna()]
+    if facts.empty or calendar.empty:
+        return pd.DataFrame({
+            **{k: pd.Series(dtype='object') for k in keys},
+            'Date': pd.Series(dtype='datetime64[ns]'),
+            'Start': pd.Series(dtype='datetime64[ns]'),
+            'Form': pd.Series(dtype='object'),
+            value_col: pd.Series(dtype='float64'),
+            'Fiscal Year': pd.Series(dtype='int64'),
+            'Fiscal Quarter': pd.Series(dtype='int64'),
+            'Filed': pd.Series(dtype='datetime64[ns]'),
+            'Source': pd.Series(dtype='object'),
+        })
+
+    placed = pd.merge_asof(
+        facts.sort_values('Start'), calendar.sort_values('Fiscal Year Start'),
+        left_on='Start', right_on='Fiscal Year Start', by=keys or None, direction='backward'
+    )
+    placed = placed[placed['Fiscal Year Start'].notna() & (placed['Date'] <= placed['Fiscal Year End'])]
+    elapsed = (placed['Date'] - placed['Fiscal Year Start']).dt.days.to_numpy()
+    placed = placed.assign(**{'Fiscal Quarter': np.clip(np.rint(elapsed / DAYS_PER_QUARTER), 1, 4).astype('int64')})
+
+    index = keys + ['Fiscal Year Start']
+    quarters = [1, 2, 3, 4]
+
+    def by_quarter(rows, column, how):
+        table = rows.groupby(index + ['Fiscal Quarter'])[column].agg(how).unstack('Fiscal Quarter')
+        return table.reindex(columns=quarters)
+
+    ytd_rows = placed[placed['Start'] == placed['Fiscal Year Start']]
+    quarter_rows = placed[placed['Period'] == 'Q']
+    cumulative = by_quarter(ytd_rows, value_col, 'last')
+    reported = by_quarter(quarter_rows, value_col, 'last')
+    ends = by_quarter(placed, 'Date', 'max')
+    years = ends.index
+    cumulative = cumulative.reindex(years)
+    reported = reported.reindex(years)
+    cumulative_filed = by_quarter(ytd_rows, 'Filed', 'last').reindex(years).apply(pd.to_datetime)
+    filed = by_quarter(quarter_rows, 'Filed', 'last').reindex(years).apply(pd.to_datetime)
+
+    def later(a, b):
+        return pd.concat([a, b], axis=1).max(axis=1)
+
+    # De-accumulate: fill each quarter from the YTD difference, then carry YTD forward.
+    # Filing dates follow the values: a difference is known once both inputs were filed.
+    discrete = reported.copy()
+    filed[1] = filed[1].where(discrete[1].notna(), cumulative_filed[1])
+    discrete[1] = discrete[1].fillna(cumulative[1])
+    cumulative_filed[1] = cumulative_filed[1].where(cumulative[1].notna(), filed[1])
+    cumulative[1] = cumulative[1].fillna(discrete[1])
+    for q in quarters[1:]:
+        filed[q] = filed[q].where(discrete[q].notna(), later(cumulative_filed[q], cumulative_filed[q - 1]))
+        discrete[q] = discrete[q].fillna(cumulative[q] - cumulative[q - 1])
+        cumulative_filed[q] = cumulative_filed[q].where(cumulative[q].notna(), later(cumulative_filed[q - 1], filed[q]))
+        cumulative[q] = cumulative[q].fillna(cumulative[q - 1] + discrete[q])
+
+    # Back to one row per (fiscal year, quarter)
+    out = years.to_frame(index=False).loc[np.repeat(np.arange(len(years)), len(quarters))].reset_index(drop=True)
+    out['Fiscal Quarter'] = np.tile(quarters, len(years))
+    out[value_col] = discrete.to_numpy(dtype='float64').ravel()
+    out['Date'] = pd.to_datetime(ends.to_numpy().ravel())
+    out['Filed'] = pd.to_datetime(filed.to_numpy().ravel())
+    out['Source'] = np.where(reported.notna().to_numpy().ravel(), 'reported', 'derived')
+    out = out.dropna(subset=[value_col, 'Date'])
+    out = out.merge(calendar[index + ['Fiscal Year']], on=index, how='left')
+
+    # Quarter start: the day after the previous quarter of the same fiscal year
+    out = out.sort_values(keys + ['Date']).reset_index(drop=True)
+    previous_end = out.groupby(index)['Date'].shift(1)
+    out['Start'] = (previous_end + pd.Timedelta(days=1)).where(out['Fiscal Quarter'] > 1, out['Fiscal Year Start'])
+    out['Form'] = '10-Q'
+    return out[keys + ['Date', 'Start', 'Form', value_col, 'Fiscal Year', 'Fiscal Quarter', 'Filed', 'Source']]
+
+# -------------------------------
+# Compute TTM Net Income
+# -------------------------------
+# Consecutive fiscal quarters end 84-98 days apart (including 52/53-week years)
+MIN_QUARTER_GAP_DAYS = 80
+MAX_QUARTER_GAP_DAYS = 100
+
+def calculate_ttm(df, value_col='Net Income', ttm_col=None):
+    """Add a trailing-twelve-month sum of `value_col` as float64.
+
+    Sums each quarter with the three before it (per ticker when a 'Ticker'
+    column is present), but only when all four quarters are consecutive; a
+    missing or duplicated quarter leaves NaN instead of a wrong total.
+    """
+    ttm_col = ttm_col or f'TTM {value_col}'
+    keys = ['Ticker'] if 'Ticker' in df.columns else []
+    df = df.sort_values(keys + ['Date'] if keys else 'Date').reset_index(drop=True).copy()
+
+    values = df[value_col].to_numpy(dtype='float64')
+    dates = pd.to_datetime(df['Date']).to_numpy(dtype='datetime64[D]')
+    n = len(df)
+
+    # step_ok[i]: row i is the quarter right after row i-1 of the same ticker
+    step_ok = np.zeros(n, dtype=bool)
+    if n > 1:
+        gap_days = (dates[1:] - dates[:-1]).astype('int64')
+        step_ok[1:] = (gap_days >= MIN_QUARTER_GAP_DAYS) & (gap_days <= MAX_QUARTER_GAP_DAYS)
+        for k in keys:
+            key_values = df[k].to_numpy()
+            step_ok[1:] &= key_values[1:] == key_values[:-1]
+
+    # Four consecutive quarters end at row i when the last three steps are ok
+    ttm = np.full(n, np.nan)
+    if n > 3:
+        window_ok = step_ok[3:] & step_ok[2:-1] & step_ok[1:-2]
+        total = values[3:] + values[2:-1] + values[1:-2] + values[:-3]
+        ttm[3:] = np.where(window_ok, total, np.nan)
+    df[ttm_col] = ttm
+    return df
+
+def calculate_ttm_net_income(df):
+    return calculate_ttm(df, 'Net Income', 'TTM Net Income')
+
+# -------------------------------
+# Main Program Loop
+# -------------------------------
+def main():
+    cik_dict = ticker_index.load_ticker_index(ticker_index.TICKER_SOURCE)
+
+    while True:
+        ticker = input("\nEnter a ticker (or type 'exit' to quit): ").strip().upper()
+        if ticker == "EXIT":
+            print("Goodbye.")
+            break
+
+        cik = cik_dict.get(ticker)
+        if not cik:
+            print(f"Ticker '{ticker}' not found.")
+            continue
+
+        print(f"\nFetching net income for {ticker} (CIK: {cik})...")
+        df = get_sec_net_income(cik)
+        if df.empty:
+            print("No data found.")
+            continue
+
+        df = normalize_facts(df, keep_ytd=True)
+        df = derive_fiscal_quarters(df)
+        if df.empty:
+            print("No quarterly data could be derived.")
+            continue
+        df = calculate_ttm_net_income(df)
+
+        print("\nQuarterly Net Income with TTM:")
+        print(df[['Date', 'Net Income', 'TTM Net Income']])
+
+        output_file = f"{ticker}_net_income_ttm.csv"
+        df.to_csv(output_file, index=False)
+        print(f"Saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,182 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from . import metrics
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+FACT_STORE_DIR = os.environ.get("FACT_STORE_DIR", "fact_store")
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+    except ImportError as e:
+        raise ImportError("The Parquet fact store needs pyarrow: pip install pyarrow") from e
+    return pa, pc, ds
+
+# -------------------------------
+# Dataset layouts
+# -------------------------------
+# Every dataset is hive-partitioned as <name>/cik=##########/fiscal_year=YYYY/part-*.parquet.
+# Columns: (name, arrow type). "cik" and "fiscal_year" are the partition keys.
+DATASETS = {
+    # Normalized duration facts, long format (one row per metric value)
+    "facts": {
+        "columns": [
+            ("Ticker", "string"), ("Metric", "string"), ("Date", "timestamp"), ("Start", "timestamp"),
+            ("Form", "string"), ("Period", "string"), ("Value", "float64"), ("FY", "int32"),
+            ("FP", "string"), ("Filed", "timestamp"),
+        ],
+        "key": ["cik", "Metric", "Date", "Period"],
+    },
+    # Derived fiscal quarters with TTM
+    "quarterly": {
+        "columns": [
+            ("Ticker", "string"), ("Date", "timestamp"), ("Start", "timestamp"), ("Fiscal Quarter", "int32"),
+            ("Net Income", "float64"), ("TTM Net Income", "float64"), ("Filed", "timestamp"), ("Source", "string"),
+        ],
+        "key": ["cik", "Date"],
+    },
+}
+
+def _schema(name):
+    pa, _, _ = _pyarrow()
+    types = {"string": pa.string(), "timestamp": pa.timestamp("ms"), "float64": pa.float64(), "int32": pa.int32()}
+    fields = [pa.field(column, types[kind]) for column, kind in DATASETS[name]["columns"]]
+    fields += [pa.field("Ingested At", pa.timestamp("ms", tz="UTC")), pa.field("cik", pa.string()), pa.field("fiscal_year", pa.int32())]
+    return pa.schema(fields)
+
+def _partitioning():
+    pa, _, ds = _pyarrow()
+    return ds.partitioning(pa.schema([("cik", pa.string()), ("fiscal_year", pa.int32())]), flavor="hive")
+
+# -------------------------------
+# Append-only writes
+# -------------------------------
+def _to_table(name, df, cik, fiscal_years):
+    pa, _, _ = _pyarrow()
+    schema = _schema(name)
+    frame = pd.DataFrame(index=df.index)
+    for field in schema:
+        if field.name in df.columns:
+            column = df[field.name]
+            if pa.types.is_timestamp(field.type):
+                column = pd.to_datetime(column, errors="coerce")
+            elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                column = pd.to_numeric(column, errors="coerce")
+            frame[field.name] = column
+        else:
+            frame[field.name] = None
+    frame["Ingested At"] = pd.Timestamp(datetime.now(timezone.utc))
+    frame["cik"] = str(cik).zfill(10)
+    frame["fiscal_year"] = fiscal_years
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False, safe=False)
+
+def _new_or_changed(name, table, cik, root):
+    """Rows of `table` whose key is not stored yet or whose latest stored row differs."""
+    pa, pc, _ = _pyarrow()
+    fiscal_years = pc.unique(table["fiscal_year"]).to_pylist()
+    stored = read(name, ciks=[cik], fiscal_years=fiscal_years, root=root)
+    if stored.empty:
+        return table
+
+    # Both sides are decoded through the same schema, so equal rows hash equal
+    columns = [f.name for f in table.schema if f.name != "Ingested At"]
+    stored_rows = set(pd.util.hash_pandas_object(stored[columns], index=False))
+    new_rows = pd.util.hash_pandas_object(table.select(columns).to_pandas(), index=False)
+    return table.filter(pa.array(~new_rows.isin(stored_rows).to_numpy()))
+
+def append(name, df, cik, fiscal_years, root=FACT_STORE_DIR):
+    """Append new and changed rows to a dataset as new files; existing files are never rewritten.
+
+    Rows identical to the latest stored row of their key are dropped, so
+    re-running a company without restatements writes nothing and storage
+    only grows with actual changes.
+    """
+    if df.empty:
+        return 0
+    _, _, ds = _pyarrow()
+    table = _new_or_changed(name, _to_table(name, df, cik, fiscal_years), cik, root)
+    if table.num_rows == 0:
+        return 0
+    ds.write_dataset(
+        table,
+        os.path.join(root, name),
+        format="parquet",
+        partitioning=_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    metrics.increment("rows_written", table.num_rows, sink=f"parquet_{name}")
+    return table.num_rows
+
+def append_facts(cik, facts_df, metric="Net Income", ticker=None, root=FACT_STORE_DIR):
+    """Store normalized facts (normalize_facts output) for one CIK."""
+    facts = facts_df.rename(columns={metric: "Value"}).assign(Metric=metric)
+    if ticker is not None:
+        facts["Ticker"] = ticker
+    fiscal_years = pd.to_numeric(facts["FY"], errors="coerce").fillna(facts["Date"].dt.year)
+    return append("facts", facts, cik, fiscal_years.astype("int32").to_numpy(), root=root)
+
+def append_quarterly(cik, quarterly_df, ticker=None, root=FACT_STORE_DIR):
+    """Store derived quarters with TTM (calculate_ttm_net_income output) for one CIK."""
+    quarterly = quarterly_df if ticker is None else quarterly_df.assign(Ticker=ticker)
+    fiscal_years = pd.to_numeric(quarterly["Fiscal Year"], errors="coerce").fillna(quarterly["Date"].dt.year)
+    return append("quarterly", quarterly, cik, fiscal_years.astype("int32").to_numpy(), root=root)
+
+# -------------------------------
+# Reads with predicate pushdown
+# -------------------------------
+def read(name, ciks=None, tickers=None, fiscal_years=None, start=None, end=None, columns=None,
+         latest_only=True, root=FACT_STORE_DIR):
+    """Load rows from a dataset, filtered before any data is decoded.
+
+    CIK and fiscal-year filters prune whole partition directories; ticker
+    and date filters are pushed down to Parquet row-group statistics. With
+    `latest_only`, repeated appends of the same key keep the newest row.
+    """
+    pa, pc, ds = _pyarrow()
+    path = os.path.join(root, name)
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=[f.name for f in _schema(name)])
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning(), schema=_schema(name))
+
+    conditions = []
+    if ciks is not None:
+        conditions.append(pc.field("cik").isin([str(c).zfill(10) for c in ciks]))
+    if fiscal_years is not None:
+        conditions.append(pc.field("fiscal_year").isin([int(y) for y in fiscal_years]))
+    if tickers is not None:
+        conditions.append(pc.field("Ticker").isin([str(t).upper() for t in tickers]))
+    if start is not None:
+        conditions.append(pc.field("Date") >= pa.scalar(pd.Timestamp(start).to_pydatetime(), pa.timestamp("ms")))
+    if end is not None:
+        conditions.append(pc.field("Date") <= pa.scalar(pd.Timestamp(end).to_pydatetime(), pa.timestamp("ms")))
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    key = DATASETS[name]["key"]
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + (key + ["Ingested At"] if latest_only else [])))
+    df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+
+    if latest_only and not df.empty:
+        df = df.sort_values("Ingested At", kind="stable").drop_duplicates(subset=key, keep="last")
+        df = df.sort_values(["cik", "Date"]).reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+def read_facts(**kwargs):
+    return read("facts", **kwargs)
+
+def read_quarterly(**kwargs):
+    return read("quarterly", **kwargs)
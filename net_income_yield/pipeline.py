@@ -0,0 +1,376 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import SimpleNamespace
+
+from . import metrics
+
+# pandas, requests and the pipeline modules are imported where they are used
+# so that `--help` and argument errors return without loading them
+
+# --- Build the combined frame for one ticker ---
+def build_ticker_frame(ticker, cik, mods, persist=None, watermarks=None):
+    from . import concepts
+
+    with metrics.ticker(ticker), metrics.stage("ticker"):
+        # Cheap submissions check first: skip companies without new 10-K/10-Q filings
+        with metrics.stage("filings"):
+            filing_df = mods.sub.get_edgar_filing_links(ticker, cik)
+        if watermarks is not None and not filing_df.empty and not watermarks.has_new_filings(cik, filing_df):
+            return None
+
+        # One companyfacts download and one pass over it for every metric in the concept map
+        with metrics.stage("companyfacts"):
+            facts = mods.store.get_company_facts(cik)
+        with metrics.stage("extract_concepts"):
+            concepts_df = concepts.extract_concepts(facts)
+
+        with metrics.stage("net_income"):
+            net_df = mods.ttm.net_income_from_concepts(concepts_df)
+            if net_df.empty:
+                raise ValueError("No net income data.")
+
+            facts_df = mods.ttm.normalize_facts(net_df, keep_ytd=True)
+            net_df = mods.ttm.derive_fiscal_quarters(facts_df)
+            if net_df.empty:
+                raise ValueError("No quarterly net income data.")
+            net_df = mods.ttm.calculate_ttm_net_income(net_df)
+
+        # Optional persistence of the normalized facts and derived quarters
+        if persist is not None:
+            with metrics.stage("persist"):
+                persist(ticker, cik, facts_df, net_df)
+
+        # Add Shares Outstanding
+        with metrics.stage("merge"):
+            shares_df = mods.shares.shares_from_concepts(concepts_df)
+            merged = merge_ticker_frames(ticker, net_df, filing_df, shares_df)
+
+        # Committed by the caller once the frame reached every sink
+        if watermarks is not None:
+            watermarks.stage_update(cik, filing_df, ticker=ticker)
+        return merged
+
+# --- Merge net income, filing dates and shares for one ticker ---
+def merge_ticker_frames(ticker, net_df, filing_df, shares_df):
+    import pandas as pd
+
+    if filing_df.empty:
+        filing_df = pd.DataFrame(columns=["Date", "Filing Date"])
+    filing_df = filing_df.rename(columns={"Period End": "Date"})
+    filing_df["Date"] = pd.to_datetime(filing_df["Date"])
+
+    merged = pd.merge(net_df, filing_df[["Date", "Filing Date"]], on="Date", how="left")
+    merged = merge_shares_asof(merged, shares_df)
+
+    # Label quarters (fiscal quarters when available, else by calendar month)
+    merged["Date"] = pd.to_datetime(merged["Date"], errors="coerce")
+    if "Fiscal Quarter" in merged.columns:
+        merged["Quarter"] = "Q" + merged["Fiscal Quarter"].astype("Int64").astype(str)
+    else:
+        quarter_map = {3: "Q1", 6: "Q2", 9: "Q3", 12: "Q4"}
+        merged["Quarter"] = merged["Date"].dt.month.map(quarter_map)
+        merged["Fiscal Year"] = merged["Date"].dt.year
+
+    merged["Ticker"] = ticker
+    merged = merged[["Ticker", "Date", "Net Income", "TTM Net Income", "Filing Date", "Shares Outstanding", "Quarter", "Fiscal Year"]]
+    merged = merged.reset_index(drop=True)
+
+    # Format dates and clean data
+    merged["Date"] = merged["Date"].dt.strftime("%Y-%m-%d")
+    merged["Filing Date"] = pd.to_datetime(merged["Filing Date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    merged = merged.replace([float("inf"), float("-inf")], pd.NA).fillna("")
+    return merged
+
+# --- Shares outstanding as of each quarter ---
+def merge_shares_asof(quarters, shares_df):
+    """Add the Shares Outstanding known when each quarter was filed.
+
+    Cover-page counts are dated a few weeks after the period end, so they
+    are matched as of time rather than on Date: each quarter takes the last
+    count filed on or before its Filing Date (its period end when the
+    filing date is unknown), which is normally the count reported in the
+    same filing. Expects one ticker; rows keep their order.
+    """
+    import pandas as pd
+
+    def as_datetime(values):
+        return pd.to_datetime(values, errors="coerce").astype("datetime64[ns]")
+
+    quarters = quarters.reset_index(drop=True)
+    left = pd.DataFrame({
+        "Row": quarters.index,
+        "As Of": as_datetime(quarters["Filing Date"]).fillna(as_datetime(quarters["Date"])),
+    }).dropna(subset=["As Of"]).sort_values("As Of", kind="stable")
+
+    if shares_df.empty:
+        shares_df = pd.DataFrame(columns=["Date", "Filed", "Shares Outstanding"])
+    filed = shares_df["Filed"] if "Filed" in shares_df.columns else shares_df["Date"]
+    right = pd.DataFrame({
+        "As Of": as_datetime(filed).fillna(as_datetime(shares_df["Date"])),
+        "Cover Date": as_datetime(shares_df["Date"]),
+        "Shares Outstanding": pd.to_numeric(shares_df["Shares Outstanding"], errors="coerce"),
+    }).dropna(subset=["As Of", "Shares Outstanding"])
+    # Among counts filed the same day the latest cover date wins (merge_asof takes the last match)
+    right = right.sort_values(["As Of", "Cover Date"], kind="stable")
+
+    joined = pd.merge_asof(left, right[["As Of", "Shares Outstanding"]], on="As Of", direction="backward")
+    return quarters.assign(**{"Shares Outstanding": joined.set_index("Row")["Shares Outstanding"]})
+
+# --- Batch mode ---
+def read_tickers(tickers=None, ticker_file=None, stream=None):
+    """Collect tickers from argv values, a file and/or a stream, one or more per line."""
+    collected = list(tickers or [])
+    if ticker_file:
+        with open(ticker_file, "r", encoding="utf-8") as f:
+            collected.extend(f.read().split())
+    if stream is not None:
+        collected.extend(stream.read().split())
+
+    seen = set()
+    result = []
+    for ticker in collected:
+        ticker = ticker.strip().upper()
+        if ticker and ticker not in seen:
+            seen.add(ticker)
+            result.append(ticker)
+    return result
+
+def merge_output(path, combined_df, tickers):
+    """Rows of the existing output CSV at `path` with the tickers in combined_df replaced.
+
+    Existing rows are read back as text so unchanged tickers are written
+    out exactly as before. Tickers keep the order of `tickers`; tickers
+    only in the existing file follow in their file order.
+    """
+    import os
+
+    import pandas as pd
+
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return combined_df
+    existing = pd.read_csv(path, dtype=str, keep_default_na=False)
+    if "Ticker" not in existing.columns:
+        raise ValueError(f"{path} has no Ticker column; refusing to overwrite it with an incremental run.")
+    if not combined_df.empty:
+        existing = existing[~existing["Ticker"].isin(set(combined_df["Ticker"]))]
+    merged = pd.concat([existing, combined_df], ignore_index=True)
+
+    position = {ticker: i for i, ticker in enumerate(tickers)}
+    order = merged["Ticker"].map(position).fillna(len(position))
+    return merged.iloc[order.argsort(kind="stable")].reset_index(drop=True)
+
+# Tickers whose SEC documents are prefetched together (see run_batch)
+PREFETCH_CHUNK = 50
+
+def prefetch_documents(tickers, cik_dict, companyfacts=True):
+    """Fetch or revalidate the tickers' SEC documents concurrently through the async client.
+
+    The builds then read them from the HTTP cache. Failures are left for
+    the builds to hit again and report per ticker.
+    """
+    from . import facts_store, http_cache, submissions
+
+    ciks = [cik_dict[t] for t in tickers if cik_dict.get(t)]
+    urls = [submissions.submissions_url(cik) for cik in ciks]
+    if companyfacts:
+        urls += [facts_store.company_facts_url(cik) for cik in ciks]
+    with metrics.stage("prefetch"):
+        http_cache.prefetch(urls)
+
+def run_batch(tickers, cik_dict, mods, max_workers=4, persist=None, watermarks=None, prefetch=None):
+    """Run the combined pipeline for every ticker on a bounded thread pool.
+
+    Returns (combined_df, errors_df). A failing ticker is recorded in
+    errors_df with its error message and does not stop the batch. With
+    `watermarks`, tickers without new filings are skipped and left out of
+    combined_df, and the watermarks of the built tickers are staged for
+    the caller to commit after writing combined_df. `prefetch` is called
+    with each chunk of PREFETCH_CHUNK tickers before the chunk is queued,
+    so its downloads overlap the builds of the previous chunk. Prints the
+    succeeded, skipped and failed counts at the end.
+    """
+    import pandas as pd
+
+    frames = {}
+    errors = []
+    skipped = []
+    succeeded = 0
+
+    def run_one(ticker):
+        cik = cik_dict.get(ticker)
+        if not cik:
+            raise KeyError(f"CIK not found for {ticker}")
+        return build_ticker_frame(ticker, cik, mods, persist=persist, watermarks=watermarks)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for start in range(0, len(tickers), PREFETCH_CHUNK):
+            chunk = tickers[start:start + PREFETCH_CHUNK]
+            if prefetch is not None:
+                prefetch(chunk)
+            futures.update({pool.submit(run_one, ticker): ticker for ticker in chunk})
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                frame = future.result()
+                if frame is None:
+                    skipped.append(ticker)
+                    metrics.increment("tickers", result="skipped")
+                    print(f"⏭️ {ticker}: no new filings")
+                    continue
+                frames[ticker] = frame
+                succeeded += 1
+                metrics.increment("tickers", result="ok")
+                print(f"✅ {ticker}: {len(frame)} rows")
+            except Exception as e:
+                message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                metrics.increment("tickers", result="failed")
+                errors.append({"Ticker": ticker, "Error Type": type(e).__name__, "Error": message})
+                print(f"❌ {ticker}: {message}")
+
+    # Keep the input order so repeated runs produce the same output
+    ordered = [frames[t] for t in tickers if t in frames]
+    combined_df = pd.concat(ordered, ignore_index=True) if ordered else pd.DataFrame()
+    errors_df = pd.DataFrame(errors, columns=["Ticker", "Error Type", "Error"])
+    print(f"\nProcessed {len(futures)} tickers: {succeeded} succeeded, "
+          f"{len(skipped)} skipped without new filings, {len(errors)} failed.")
+    return combined_df, errors_df
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Combined net income / filing date / shares pipeline.")
+    parser.add_argument("tickers", nargs="*", help="Tickers to process. Use '-' to read tickers from stdin.")
+    parser.add_argument("-f", "--file", help="File with tickers separated by whitespace or newlines.")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of tickers processed concurrently.")
+    parser.add_argument("-o", "--output", help="Write the combined data to this CSV file.")
+    parser.add_argument("-e", "--errors", help="Write the per-ticker error report to this CSV file.")
+    parser.add_argument("--no-upload", action="store_true", help="Skip the Google Sheets upload.")
+    parser.add_argument("--fact-store", metavar="DIR", help="Also append normalized facts and quarters to this Parquet store.")
+    parser.add_argument("--incremental", action="store_true", help="Only reprocess tickers with new 10-K/10-Q filings since the last run.")
+    parser.add_argument("--watermarks", metavar="PATH", help="Filing watermark database used by --incremental.")
+    parser.add_argument("--prices", metavar="PATH", help="Price history CSV/Parquet; adds TTM EPS, Price, Earnings Yield and Market Cap.")
+    parser.add_argument("--tickers-source", metavar="PATH", help="Ticker/CIK .docx or .json index (default: TICKER_SOURCE).")
+    parser.add_argument("--metrics", metavar="PATH", help="Write the run report (stage timings, bytes, cache, retries, rows) as JSON.")
+    parser.add_argument("--metrics-prom", metavar="PATH", help="Write the run report in Prometheus text format.")
+    parser.add_argument("--profile", metavar="STAGE", action="append",
+                        help="Run this stage under cProfile (repeatable, 'all' for every stage); see METRICS_PROFILE_DIR.")
+    return parser.parse_args(argv)
+
+# --- Main logic ---
+def main(argv=None):
+    args = parse_args(argv)
+    run_metrics = metrics.reset_metrics(args.profile)
+    try:
+        return run(args)
+    finally:
+        if args.metrics or args.metrics_prom or run_metrics.profile_stages:
+            report = run_metrics.write_report(args.metrics, args.metrics_prom)
+            for stage, path in report.get("profiles", {}).items():
+                print(f"Saved {stage} profile to {path}")
+
+def run(args):
+    import requests
+    from . import facts_store, net_income, shares, submissions, ticker_index
+    from .sheets import upload_to_google_sheet
+
+    mods = SimpleNamespace(ttm=net_income, sub=submissions, shares=shares, store=facts_store)
+
+    persist = None
+    if args.fact_store:
+        from . import parquet_store as parquet_mod
+
+        def persist(ticker, cik, facts_df, quarterly_df):
+            parquet_mod.append_facts(cik, facts_df, ticker=ticker, root=args.fact_store)
+            parquet_mod.append_quarterly(cik, quarterly_df, ticker=ticker, root=args.fact_store)
+
+    watermarks = None
+    if args.incremental:
+        from . import watermarks as watermarks_mod
+        watermarks = watermarks_mod.WatermarkStore(args.watermarks or watermarks_mod.WATERMARK_DB)
+
+    add_yields = None
+    if args.prices:
+        from . import yields as yield_mod
+        prices = yield_mod.read_table(args.prices)
+
+        def add_yields(df):
+            return yield_mod.quarterly_yields(df, prices) if not df.empty else df
+
+    cik_dict = ticker_index.load_ticker_index(args.tickers_source or ticker_index.TICKER_SOURCE)
+
+    use_stdin = "-" in args.tickers
+    tickers = read_tickers(
+        [t for t in args.tickers if t != "-"],
+        ticker_file=args.file,
+        stream=sys.stdin if use_stdin else None,
+    )
+
+    # Batch mode: any tickers given on the command line, in a file or on stdin
+    if tickers or args.file or use_stdin:
+        # An incremental run only needs the companyfacts of tickers with new filings
+        def prefetch(chunk):
+            prefetch_documents(chunk, cik_dict, companyfacts=watermarks is None)
+
+        combined_df, errors_df = run_batch(tickers, cik_dict, mods, max_workers=args.workers, persist=persist,
+                                           watermarks=watermarks, prefetch=prefetch)
+        if add_yields:
+            combined_df = add_yields(combined_df)
+
+        if args.output:
+            with metrics.stage("write_csv"):
+                # An incremental run only rebuilds changed tickers; keep the others' rows
+                output_df = merge_output(args.output, combined_df, tickers) if watermarks else combined_df
+                output_df.to_csv(args.output, index=False)
+            metrics.increment("rows_written", len(combined_df), sink="csv")
+            print(f"Saved combined data to {args.output}")
+        if args.errors:
+            errors_df.to_csv(args.errors, index=False)
+            print(f"Saved error report to {args.errors}")
+        elif not errors_df.empty:
+            print(errors_df.to_string(index=False))
+
+        uploaded = True
+        if not combined_df.empty and not args.no_upload:
+            uploaded = upload_to_google_sheet(combined_df)
+        if watermarks is not None:
+            if uploaded:
+                print(f"Advanced {watermarks.commit_staged()} filing watermarks.")
+            else:
+                print("Filing watermarks not advanced; the next --incremental run retries these tickers.")
+        return combined_df, errors_df
+
+    ticker = input("Enter a ticker: ").strip().upper()
+    cik = cik_dict.get(ticker)
+
+    if not cik:
+        print(f"CIK not found for {ticker}")
+        return
+
+    try:
+        merged = build_ticker_frame(ticker, cik, mods, persist=persist, watermarks=watermarks)
+    except (ValueError, requests.exceptions.RequestException) as e:
+        print(e)
+        return
+
+    if merged is None:
+        print(f"No new filings for {ticker} since the last run.")
+        return
+
+    if add_yields:
+        merged = add_yields(merged)
+
+    print("\nFinal merged data preview:")
+    print(merged.tail())
+
+    uploaded = True
+    if not args.no_upload:
+        uploaded = upload_to_google_sheet(merged)
+    if watermarks is not None and uploaded:
+        watermarks.commit_staged()
+
+def cli(argv=None):
+    # Console entry point: main() returns frames for callers, which sys.exit() would print
+    main(argv)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import concepts
+
+# -------------------------------
+# Pipeline modules (shared across callers)
+# -------------------------------
+def load_pipeline_modules():
+    from . import net_income, shares
+    return net_income, shares
+
+# -------------------------------
+# Vintages: derived quarters as known after each filing
+# -------------------------------
+VINTAGE_COLUMNS = ["Ticker", "Known From", "Date", "Fiscal Year", "Fiscal Quarter", "Net Income", "TTM Net Income"]
+
+def build_vintages(net_df, ticker, ttm_mod=None):
+    """Every restatement vintage of the derived quarters of one company.
+
+    `net_df` is the raw output of extract_net_income, which still holds
+    every filed value. For each distinct filed date the normal pipeline
+    (normalize, derive fiscal quarters, TTM) is re-run on the facts filed
+    up to that day, so de-accumulated quarters and TTM sums are exactly
+    what could have been computed then. Only quarters that are new or whose
+    values changed are kept, each tagged with the day it became known.
+    """
+    if ttm_mod is None:
+        ttm_mod, _ = load_pipeline_modules()
+    if net_df is None or net_df.empty:
+        return pd.DataFrame(columns=VINTAGE_COLUMNS)
+
+    net_df = net_df[net_df["Filed"].notna()]
+    changes = []
+    previous = pd.DataFrame(columns=["Date", "Net Income", "TTM Net Income"])
+    for known_from in np.sort(net_df["Filed"].unique()):
+        facts = ttm_mod.normalize_facts(net_df[net_df["Filed"] <= known_from], keep_ytd=True)
+        quarters = ttm_mod.derive_fiscal_quarters(facts)
+        if quarters.empty:
+            continue
+        quarters = ttm_mod.calculate_ttm_net_income(quarters)
+
+        compared = quarters.merge(previous, on="Date", how="left", suffixes=("", " Before"), indicator=True)
+        changed = compared["_merge"] == "left_only"
+        for col in ("Net Income", "TTM Net Income"):
+            now, before = compared[col], compared[f"{col} Before"]
+            changed |= ~((now == before) | (now.isna() & before.isna()))
+        if changed.any():
+            rows = compared.loc[changed, ["Date", "Fiscal Year", "Fiscal Quarter", "Net Income", "TTM Net Income"]]
+            changes.append(rows.assign(**{"Known From": pd.Timestamp(known_from)}))
+        previous = quarters[["Date", "Net Income", "TTM Net Income"]]
+
+    if not changes:
+        return pd.DataFrame(columns=VINTAGE_COLUMNS)
+    vintages = pd.concat(changes, ignore_index=True)
+    vintages.insert(0, "Ticker", ticker.upper())
+    return vintages[VINTAGE_COLUMNS]
+
+def shares_vintages(shares_df, ticker):
+    """Shares outstanding facts with the day each became known."""
+    if shares_df is None or shares_df.empty or "Filed" not in shares_df.columns:
+        return pd.DataFrame(columns=["Ticker", "Known From", "Date", "Shares Outstanding"])
+    out = shares_df[shares_df["Filed"].notna()].rename(columns={"Filed": "Known From"})
+    out = out.assign(Ticker=ticker.upper())
+    return out[["Ticker", "Known From", "Date", "Shares Outstanding"]].reset_index(drop=True)
+
+def build_company(ticker, facts, ttm_mod=None, shares_mod=None):
+    """(vintages, shares) for one parsed companyfacts document."""
+    if ttm_mod is None or shares_mod is None:
+        ttm_mod, shares_mod = load_pipeline_modules()
+    concepts_df = concepts.extract_concepts(facts)
+    vintages = build_vintages(ttm_mod.net_income_from_concepts(concepts_df), ticker, ttm_mod=ttm_mod)
+    shares = shares_vintages(shares_mod.shares_from_concepts(concepts_df), ticker)
+    return vintages, shares
+
+# -------------------------------
+# Vectorized as-of lookups
+# -------------------------------
+# Sort keys pack (ticker code, day number) into one int64 so a single
+# searchsorted answers an as-of query for any number of tickers at once.
+# Day numbers count from DAY_EPOCH rather than 1970, because older
+# companyfacts hold pre-1970 periods; keys only sort correctly while
+# 0 <= day < DAY_SPAN.
+DAY_EPOCH = np.datetime64("1800-01-01", "D")
+DAY_SPAN = 1_000_000
+# (code * DAY_SPAN + period) * DAY_SPAN + known must fit in an int64
+MAX_TICKERS = (np.iinfo("int64").max // DAY_SPAN) // DAY_SPAN - 1
+
+def _days(values):
+    days = pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[D]")
+    numbers = (days - DAY_EPOCH).astype("int64")
+    if len(days) and (np.isnat(days).any() or numbers.min() < 0 or numbers.max() >= DAY_SPAN):
+        raise ValueError(f"Dates must be set and fall between {DAY_EPOCH} and {DAY_EPOCH + (DAY_SPAN - 1)}.")
+    return numbers
+
+def _asof(sorted_keys, keys):
+    """Position of the last sorted key <= each key (-1 if none).
+
+    Queries are searched in sorted order, which keeps the binary searches
+    cache friendly; results are scattered back to the query order.
+    """
+    order = np.argsort(keys, kind="stable")
+    pos = np.empty(len(keys), dtype="int64")
+    pos[order] = np.searchsorted(sorted_keys, keys[order], side="right") - 1
+    return pos
+
+class PointInTimeIndex:
+    """Answers "what was known about ticker X on date D" without look-ahead.
+
+    Built from the change rows of build_vintages (and optionally the shares
+    vintages). Rows are kept as sorted int64 key arrays:
+
+    - by (ticker, known from) with a running maximum of the period end, which
+      gives the latest quarter known by any date;
+    - by (ticker, period end, known from), which gives the value of that
+      quarter as known on the date, i.e. before or after a restatement.
+
+    Both lookups are searchsorted calls over the whole query batch.
+    """
+
+    def __init__(self, vintages, shares=None):
+        shares = shares if shares is not None else pd.DataFrame(columns=["Ticker", "Known From", "Date", "Shares Outstanding"])
+        tickers = pd.concat([vintages["Ticker"], shares["Ticker"]]).astype(str).str.upper()
+        self.tickers = pd.Index(tickers.unique()).sort_values()
+        if len(self.tickers) > MAX_TICKERS:
+            raise ValueError(f"At most {MAX_TICKERS} tickers fit in one index.")
+
+        v = vintages.reset_index(drop=True)
+        code = self.tickers.get_indexer(v["Ticker"].astype(str).str.upper()).astype("int64")
+        known = _days(v["Known From"])
+        period = _days(v["Date"])
+
+        # (ticker, known from) order with the latest period end known so far
+        by_known = np.lexsort((period, known, code))
+        self._known_keys = code[by_known] * DAY_SPAN + known[by_known]
+        self._latest_period = np.maximum.accumulate(code[by_known] * DAY_SPAN + period[by_known])
+
+        # (ticker, period end, known from) order for the value lookups
+        by_period = np.lexsort((known, period, code))
+        self._period_keys = (code[by_period] * DAY_SPAN + period[by_period]) * DAY_SPAN + known[by_period]
+        self._values = v.loc[by_period, ["Date", "Known From", "Fiscal Year", "Fiscal Quarter", "Net Income", "TTM Net Income"]].reset_index(drop=True)
+
+        s = shares.reset_index(drop=True)
+        s_code = self.tickers.get_indexer(s["Ticker"].astype(str).str.upper()).astype("int64")
+        s_known = _days(s["Known From"])
+        by_filed = np.lexsort((_days(s["Date"]), s_known, s_code))
+        self._shares_keys = s_code[by_filed] * DAY_SPAN + s_known[by_filed]
+        self._shares = s.loc[by_filed, ["Date", "Shares Outstanding"]].reset_index(drop=True)
+
+    def _codes(self, tickers):
+        # Normalize the distinct tickers only, then broadcast their codes
+        codes, uniques = pd.factorize(pd.Series(tickers))
+        lookup = self.tickers.get_indexer(pd.Index(uniques).astype(str).str.upper())
+        return np.append(lookup, -1).astype("int64")[codes]
+
+    def _value_rows(self, code, period, on):
+        """Row in self._values holding (ticker, period) as known on `on`, or -1."""
+        keys = (code * DAY_SPAN + period) * DAY_SPAN + on
+        pos = _asof(self._period_keys, keys)
+        safe = np.clip(pos, 0, None)
+        ok = (code >= 0) & (pos >= 0) & (len(self._period_keys) > 0)
+        if len(self._period_keys):
+            ok &= self._period_keys[safe] // DAY_SPAN == code * DAY_SPAN + period
+        return np.where(ok, pos, -1)
+
+    def _frame(self, tickers, dates, rows):
+        found = rows >= 0
+        picked = self._values.take(np.where(found, rows, 0)) if len(self._values) else \
+            self._values.reindex(range(len(rows)))
+        out = pd.DataFrame({
+            "Ticker": pd.Series(tickers).astype(str).str.upper().to_numpy(),
+            "As Of": pd.to_datetime(pd.Series(dates)).to_numpy(),
+        })
+        for col in self._values.columns:
+            out["Period End" if col == "Date" else col] = picked[col].reset_index(drop=True).where(found)
+        return out
+
+    def latest(self, tickers, dates):
+        """Latest quarter and its TTM as known on each date (one row per query)."""
+        code = self._codes(tickers)
+        on = _days(dates)
+        pos = _asof(self._known_keys, code * DAY_SPAN + on)
+        safe = np.clip(pos, 0, None)
+        ok = (code >= 0) & (pos >= 0)
+        if len(self._known_keys):
+            ok &= self._known_keys[safe] // DAY_SPAN == code
+            period = self._latest_period[safe] - code * DAY_SPAN
+        else:
+            ok &= False
+            period = np.zeros(len(code), dtype="int64")
+        rows = np.where(ok, self._value_rows(code, period, on), -1)
+        return self.add_shares(self._frame(tickers, dates, rows))
+
+    def quarter(self, tickers, period_ends, dates):
+        """Value of specific quarters as known on each date (NaN if not yet filed)."""
+        rows = self._value_rows(self._codes(tickers), _days(period_ends), _days(dates))
+        return self.add_shares(self._frame(tickers, dates, rows))
+
+    def add_shares(self, out):
+        """Latest shares outstanding filed on or before each query's As Of date."""
+        code = self._codes(out["Ticker"])
+        keys = code * DAY_SPAN + _days(out["As Of"])
+        pos = _asof(self._shares_keys, keys)
+        safe = np.clip(pos, 0, None)
+        ok = (code >= 0) & (pos >= 0)
+        if len(self._shares_keys):
+            ok &= self._shares_keys[safe] // DAY_SPAN == code
+            picked = self._shares.iloc[safe].reset_index(drop=True)
+            out["Shares Outstanding"] = picked["Shares Outstanding"].where(ok).to_numpy()
+            out["Shares Date"] = picked["Date"].where(ok).to_numpy()
+        else:
+            out["Shares Outstanding"] = np.nan
+            out["Shares Date"] = pd.NaT
+        return out
+
+    def history(self, ticker, period_end):
+        """Every vintage of one quarter, oldest first."""
+        code = self._codes([ticker])[0]
+        base = (code * DAY_SPAN + _days([period_end])[0]) * DAY_SPAN
+        lo, hi = np.searchsorted(self._period_keys, [base, base + DAY_SPAN])
+        return self._values.iloc[lo:hi].reset_index(drop=True)
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Point-in-time TTM net income and shares outstanding.")
+    parser.add_argument("tickers", nargs="+", help="Tickers to look up.")
+    parser.add_argument("--on", action="append", required=True, help="As-of date (repeatable).")
+    parser.add_argument("--tickers-source", help="Ticker/CIK source file for the ticker index (default: TICKER_SOURCE).")
+    parser.add_argument("-o", "--output", help="Write the vintage table to this CSV file.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    ttm_mod, shares_mod = load_pipeline_modules()
+    from . import facts_store as store_mod
+    from . import ticker_index as index_mod
+    cik_dict = index_mod.load_ticker_index(args.tickers_source or index_mod.TICKER_SOURCE)
+
+    vintage_frames, share_frames = [], []
+    for ticker in (t.upper() for t in args.tickers):
+        cik = cik_dict.get(ticker)
+        if not cik:
+            print(f"CIK not found for {ticker}")
+            continue
+        vintages, shares = build_company(ticker, store_mod.get_company_facts(cik), ttm_mod, shares_mod)
+        vintage_frames.append(vintages)
+        share_frames.append(shares)
+    if not vintage_frames:
+        return None
+
+    vintages = pd.concat(vintage_frames, ignore_index=True)
+    index = PointInTimeIndex(vintages, pd.concat(share_frames, ignore_index=True))
+    queries = pd.MultiIndex.from_product([sorted(set(vintages["Ticker"])), args.on]).to_frame(index=False)
+    result = index.latest(queries[0], queries[1])
+    print(result.to_string(index=False))
+    if args.output:
+        vintages.to_csv(args.output, index=False)
+        print(f"Saved {len(vintages)} vintage rows to {args.output}")
+    return result
+
+def cli(argv=None):
+    # Console entry point: main() returns frames for callers, which sys.exit() would print
+    main(argv)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
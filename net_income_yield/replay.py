@@ -0,0 +1,374 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+# requests and the pipeline modules are imported where they are used
+# so that `--help` and argument errors return without loading them
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+REPLAY_HOST = os.environ.get("REPLAY_HOST", "127.0.0.1")
+REPLAY_PORT = int(os.environ.get("REPLAY_PORT", 8765))
+# Where recordings are fetched from (the real SEC data API by default)
+SEC_UPSTREAM_URL = os.environ.get("SEC_UPSTREAM_URL", "https://data.sec.gov").rstrip("/")
+
+# -------------------------------
+# Recorded archive
+# -------------------------------
+# An archive is a directory laid out like SEC_DATA_URL paths:
+# api/xbrl/companyfacts/CIK##########.json, submissions/CIK##########.json
+# and the submissions history pages, plus company_tickers.json for the
+# ticker index. fixtures.write_fixtures writes the same layout.
+def archive_path(root, path):
+    """Local file of a URL path inside `root`; LookupError for paths outside it."""
+    parts = [p for p in unquote(urlsplit(path).path).split("/") if p]
+    if not parts or any(p in (".", "..") or "\\" in p for p in parts):
+        raise LookupError(f"Invalid path {path}")
+    return os.path.join(root, *parts)
+
+def save_document(root, path, body):
+    target = archive_path(root, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, target)
+    return target
+
+def record_path(root, path, upstream=SEC_UPSTREAM_URL, client=None):
+    """Fetch `path` from `upstream` through the shared SEC client and save it under `root`.
+
+    Returns the body. Raises requests.HTTPError for error responses, which
+    are not recorded (replay answers 404 for anything missing).
+    """
+    from . import sec_client
+
+    client = client or sec_client.get_client()
+    response = client.get(f"{upstream}/{path.lstrip('/')}")
+    try:
+        response.raise_for_status()
+        body = response.content
+    finally:
+        response.close()
+    save_document(root, path, body)
+    return body
+
+def record_company(root, cik, upstream=SEC_UPSTREAM_URL, client=None):
+    """Record the companyfacts, submissions and submissions history pages of one CIK; returns bytes saved."""
+    cik = str(cik).zfill(10)
+    total = len(record_path(root, f"api/xbrl/companyfacts/CIK{cik}.json", upstream, client))
+    body = record_path(root, f"submissions/CIK{cik}.json", upstream, client)
+    total += len(body)
+    for page in json.loads(body).get("filings", {}).get("files", []):
+        total += len(record_path(root, f"submissions/{page['name']}", upstream, client))
+    return total
+
+def write_ticker_index(root, cik_dict):
+    """Add `cik_dict` (ticker -> CIK) to root/company_tickers.json, SEC's ticker index layout."""
+    path = os.path.join(root, "company_tickers.json")
+    entries = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            entries = {e["ticker"]: e for e in json.load(f).values()}
+    for ticker, cik in cik_dict.items():
+        entries[ticker] = {"cik_str": int(cik), "ticker": ticker, "title": entries.get(ticker, {}).get("title", ticker)}
+    os.makedirs(root, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({str(n): e for n, e in enumerate(entries.values())}, f)
+    return path
+
+def record(root, cik_dict, upstream=SEC_UPSTREAM_URL, workers=4, on_error=None):
+    """Record every company of `cik_dict` (ticker -> CIK) under `root`.
+
+    Requests go through the shared rate-limited SEC client, so recording
+    stays within SEC fair-access limits at any worker count. Failures are
+    passed to `on_error(ticker, exc)` and do not stop the run.
+    Returns (tickers_recorded, bytes_saved, tickers_failed).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    recorded, total, failed = {}, 0, 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(record_company, root, cik, upstream): (ticker, cik) for ticker, cik in cik_dict.items()}
+        for future in as_completed(futures):
+            ticker, cik = futures[future]
+            try:
+                total += future.result()
+            except Exception as e:
+                failed += 1
+                if on_error is not None:
+                    on_error(ticker, e)
+                continue
+            recorded[ticker] = cik
+    if recorded:
+        write_ticker_index(root, recorded)
+    return len(recorded), total, failed
+
+# -------------------------------
+# Injected latency and failures
+# -------------------------------
+class Faults:
+    """Latency, rate limiting and errors injected by the stand-in server.
+
+    Every response waits `latency` seconds plus up to `jitter` more.
+    Requests beyond `rate_limit` per second get 429 with Retry-After, as
+    a throttling server would; on top of that a `throttle_rate` share of
+    requests gets a random 429 and an `error_rate` share a 500 or 503.
+    `seed` makes the random choices repeatable.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=None, throttle_rate=0.0, error_rate=0.0,
+                 retry_after=1, seed=None):
+        from .sec_client import TokenBucket
+
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + extra
+
+    def failure(self):
+        """None to serve the request, else the (status, headers) to answer with."""
+        throttled = {"Retry-After": str(self.retry_after)}
+        if self.bucket is not None and not self.bucket.try_acquire():
+            return 429, throttled
+        with self._lock:
+            roll = self._rng.random()
+            pick = self._rng.random()
+        if roll < self.throttle_rate:
+            return 429, throttled
+        if roll < self.throttle_rate + self.error_rate:
+            return (500 if pick < 0.5 else 503), {}
+        return None
+
+# -------------------------------
+# Stand-in server
+# -------------------------------
+class ReplayStats:
+    """Request, status and byte counts of a replay server (GET /_stats)."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.statuses = Counter()
+        self.bytes_sent = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def add(self, status, size=0):
+        with self._lock:
+            self.statuses[status] += 1
+            self.bytes_sent += size
+
+    def add_recorded(self):
+        with self._lock:
+            self.recorded += 1
+
+    def info(self):
+        with self._lock:
+            requests = sum(self.statuses.values())
+            elapsed = time.time() - self.started
+            return {
+                "requests": requests,
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "bytes_sent": self.bytes_sent,
+                "recorded": self.recorded,
+                "seconds": round(elapsed, 3),
+                "requests_per_second": round(requests / elapsed, 2) if elapsed else None,
+            }
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """GET <SEC path> from the archive, GET /_stats; HEAD as GET without the body."""
+
+    server_version = "SecReplay/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.server.stats.add(status, len(body))
+
+    def _local_file(self):
+        """Path of the requested document, recording it first when the server has an upstream."""
+        path = archive_path(self.server.root, self.path)
+        if os.path.isfile(path) or self.server.upstream is None:
+            return path
+        with self.server.record_lock(path):
+            if not os.path.isfile(path):
+                record_path(self.server.root, urlsplit(self.path).path, self.server.upstream)
+                self.server.stats.add_recorded()
+        return path
+
+    def do_GET(self):
+        import requests
+
+        if urlsplit(self.path).path == "/_stats":
+            return self._send_json(200, self.server.stats.info())
+
+        faults = self.server.faults
+        delay = faults.delay()
+        if delay:
+            time.sleep(delay)
+        failure = faults.failure()
+        if failure is not None:
+            status, headers = failure
+            return self._send_json(status, {"error": "Injected failure"}, headers)
+
+        try:
+            path = self._local_file()
+        except LookupError as e:
+            return self._send_json(404, {"error": str(e)})
+        except requests.exceptions.HTTPError as e:
+            return self._send_json(e.response.status_code, {"error": f"Upstream: {e}"})
+        except requests.exceptions.RequestException as e:
+            return self._send_json(502, {"error": f"Upstream request failed: {e}"})
+        if not os.path.isfile(path):
+            return self._send_json(404, {"error": f"Not recorded: {urlsplit(self.path).path}"})
+
+        # Validators from the file itself, so HttpCache revalidation gets 304s
+        st = os.stat(path)
+        etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return self.server.stats.add(304)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(st.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+        self.end_headers()
+        if self.command != "HEAD":
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+        self.server.stats.add(200, st.st_size)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root, faults=None, upstream=None, host=REPLAY_HOST, port=REPLAY_PORT, quiet=False):
+        super().__init__((host, port), ReplayHandler)
+        self.root = root
+        self.faults = faults or Faults()
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.quiet = quiet
+        self.stats = ReplayStats()
+        self._record_locks = {}
+        self._record_locks_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_port}"
+
+    def record_lock(self, path):
+        # One lock per document so concurrent misses fetch it from upstream once
+        with self._record_locks_lock:
+            return self._record_locks.setdefault(path, threading.Lock())
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Record SEC companyfacts/submissions to a local archive and serve them as a stand-in "
+                    "for data.sec.gov (point SEC_DATA_URL at the server).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="Fetch companies from the SEC into an archive directory.")
+    rec.add_argument("root", help="Archive directory.")
+    rec.add_argument("tickers", nargs="*", help="Tickers to record.")
+    rec.add_argument("-f", "--file", help="File with tickers separated by whitespace or newlines.")
+    rec.add_argument("-w", "--workers", type=int, default=4, help="Companies recorded concurrently.")
+    rec.add_argument("--upstream", default=SEC_UPSTREAM_URL, help="Server to record from.")
+    rec.add_argument("--tickers-source", metavar="PATH", help="Ticker/CIK .docx or .json index (default: TICKER_SOURCE).")
+
+    serve = commands.add_parser("serve", help="Serve an archive (fixtures.write_fixtures output works too).")
+    serve.add_argument("root", help="Archive directory.")
+    serve.add_argument("--host", default=REPLAY_HOST, help="Interface to listen on.")
+    serve.add_argument("--port", type=int, default=REPLAY_PORT, help="Port to listen on.")
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    serve.add_argument("--jitter", type=float, default=0.0, help="Up to this many more seconds, at random.")
+    serve.add_argument("--rate-limit", type=float, help="Requests per second before answering 429.")
+    serve.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with a random 429.")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500/503.")
+    serve.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s.")
+    serve.add_argument("--seed", type=int, help="Seed for the random latency and failures.")
+    serve.add_argument("--record-from", metavar="URL",
+                       help=f"Fetch and record documents missing from the archive (e.g. {SEC_UPSTREAM_URL}).")
+    serve.add_argument("-q", "--quiet", action="store_true", help="Do not log requests.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "record":
+        from . import ticker_index
+        from .stream import iter_tickers
+
+        known = ticker_index.load_ticker_index(args.tickers_source or ticker_index.TICKER_SOURCE)
+        cik_dict = {}
+        for ticker in iter_tickers(args.tickers, ticker_file=args.file):
+            if ticker in known:
+                cik_dict[ticker] = known[ticker]
+            else:
+                print(f"❌ {ticker}: CIK not found")
+        recorded, total, failed = record(args.root, cik_dict, upstream=args.upstream.rstrip("/"), workers=args.workers,
+                                         on_error=lambda ticker, e: print(f"❌ {ticker}: {e}"))
+        print(f"Recorded {recorded} companies ({total / 1e6:.1f} MB) to {args.root}; {failed} failed.")
+        return recorded, total, failed
+
+    faults = Faults(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                    throttle_rate=args.throttle_rate, error_rate=args.error_rate, retry_after=args.retry_after,
+                    seed=args.seed)
+    server = ReplayServer(args.root, faults=faults, upstream=args.record_from, host=args.host, port=args.port,
+                          quiet=args.quiet)
+    print(f"Serving {args.root} on {server.url} (GET /_stats for counts)")
+    print(f"  export SEC_DATA_URL={server.url}")
+    print(f"  export TICKER_SOURCE={os.path.join(args.root, 'company_tickers.json')}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.info()))
+
+def cli(argv=None):
+    # Console entry point: main() returns counts for callers, which sys.exit() would print
+    main(argv)
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+# SEC fair access: declare who you are and stay under 10 requests/second.
+SEC_USER_AGENT = os.environ.get("SEC_USER_AGENT", "Net-Income-Yield admin@example.com")
+SEC_RATE_LIMIT = float(os.environ.get("SEC_RATE_LIMIT", 8))
+SEC_MAX_CONNECTIONS = int(os.environ.get("SEC_MAX_CONNECTIONS", 10))
+SEC_MAX_RETRIES = int(os.environ.get("SEC_MAX_RETRIES", 5))
+SEC_TIMEOUT = float(os.environ.get("SEC_TIMEOUT", 30))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# -------------------------------
+# Token bucket rate limiter
+# -------------------------------
+class TokenBucket:
+    """Thread-safe token bucket usable from threads and coroutines.
+
+    `rate` tokens are added per second up to `capacity`; each request takes
+    one. Callers that find the bucket empty reserve a future token and wait
+    for it, so waiting callers are served in order.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self):
+        """Take one token if one is available now; never waits."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+# -------------------------------
+# Shared SEC client
+# -------------------------------
+class SecClient:
+    """Pooled, rate-limited HTTP client for SEC endpoints.
+
+    All requests share one keep-alive connection pool, one token bucket and a
+    fixed declared User-Agent. 429 and 5xx responses (and connection errors)
+    are retried with exponential backoff plus jitter, honouring Retry-After.
+    `get` serves synchronous callers; `fetch` and `fetch_all` serve asyncio
+    code and run the blocking I/O in worker threads. At most
+    `max_connections` requests are open at once, counting streamed
+    responses until they are closed.
+    """
+
+    def __init__(self, rate=SEC_RATE_LIMIT, max_connections=SEC_MAX_CONNECTIONS, max_retries=SEC_MAX_RETRIES,
+                 user_agent=SEC_USER_AGENT, timeout=SEC_TIMEOUT, backoff=0.5, max_backoff=30.0):
+        self.limiter = TokenBucket(rate)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept-Encoding": "gzip, deflate",
+        })
+        self._connections = threading.BoundedSemaphore(max_connections)
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(self.max_backoff, float(retry_after))
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _send(self, url, headers, stream=False):
+        self._connections.acquire()
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+        except BaseException:
+            self._connections.release()
+            raise
+        if not stream:
+            self._connections.release()
+            return response
+
+        # A streamed body still occupies its connection: keep the permit until the response is closed
+        close = response.close
+        released = threading.Lock()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if released.acquire(blocking=False):
+                    self._connections.release()
+
+        response.close = close_and_release
+        return response
+
+    def _should_retry(self, attempt, response=None, error=None):
+        if error is None:
+            metrics.increment("http_responses", status=response.status_code)
+        else:
+            metrics.increment("http_errors", error=type(error).__name__)
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            retry = isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        else:
+            retry = response.status_code in RETRY_STATUSES
+        if retry:
+            metrics.increment("http_retries", reason=type(error).__name__ if error is not None else response.status_code)
+        return retry
+
+    def get(self, url, headers=None, stream=False):
+        """Send a GET request, blocking. Returns the final requests.Response.
+
+        With `stream`, the body is left unread for iter_content; the caller
+        must close the response.
+        """
+        attempt = 0
+        while True:
+            with metrics.stage("rate_limit_wait"):
+                self.limiter.acquire()
+            try:
+                response = self._send(url, headers, stream=stream)
+            except requests.exceptions.RequestException as e:
+                if not self._should_retry(attempt, error=e):
+                    raise
+                time.sleep(self._retry_delay(attempt))
+            else:
+                if not self._should_retry(attempt, response=response):
+                    return response
+                response.close()
+                time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def _attempt(self, url, headers, attempt, consume):
+        # One try of `fetch`, run in a worker thread: (done, response or consume's result).
+        # Like `get`, only the request is retried; errors raised by `consume` propagate.
+        try:
+            response = self._send(url, headers, stream=consume is not None)
+        except requests.exceptions.RequestException as e:
+            if not self._should_retry(attempt, error=e):
+                raise
+            return False, None
+        if self._should_retry(attempt, response=response):
+            response.close()
+            return False, response
+        if consume is None:
+            return True, response
+        try:
+            return True, consume(response)
+        finally:
+            response.close()
+
+    async def fetch(self, url, headers=None, consume=None):
+        """Asynchronous GET. Returns the final requests.Response.
+
+        With `consume`, the body is streamed and `consume(response)` runs in
+        the worker thread that sent the request, before the connection is
+        released; its result is returned instead. Reading a streamed body on
+        another thread could wait behind requests blocked on a connection.
+        """
+        attempt = 0
+        while True:
+            with metrics.stage("rate_limit_wait"):
+                await self.limiter.acquire_async()
+            done, result = await asyncio.to_thread(self._attempt, url, headers, attempt, consume)
+            if done:
+                return result
+            await asyncio.sleep(self._retry_delay(attempt, result))
+            attempt += 1
+
+    async def fetch_all(self, urls, headers=None, consume=None):
+        """Fetch many URLs concurrently; results keep the order of `urls`."""
+        return await asyncio.gather(*(self.fetch(url, headers=headers, consume=consume) for url in urls))
+
+    def close(self):
+        self.session.close()
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_client():
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = SecClient()
+        return _default_client
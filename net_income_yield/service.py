@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import unquote, urlsplit
+
+# pandas and the pipeline modules are imported where they are used
+# so that `--help` and argument errors return without loading them
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", 8080))
+# Upper bound on the derived frames (and their encoded responses) kept in memory
+SERVICE_CACHE_BYTES = int(os.environ.get("SERVICE_CACHE_BYTES", 256 * 1024 ** 2))
+# How long a cached ticker is served before its submissions are checked for new filings
+FILING_CHECK_SECONDS = float(os.environ.get("FILING_CHECK_SECONDS", 15 * 60))
+# Build locks are striped over this many locks, so tickers never seen again hold no memory
+BUILD_LOCK_STRIPES = int(os.environ.get("BUILD_LOCK_STRIPES", 64))
+
+# -------------------------------
+# Endpoints
+# -------------------------------
+YIELD_COLUMNS = [("TTM EPS", "float"), ("Price", "float"), ("Earnings Yield", "float"), ("Market Cap", "float")]
+
+def endpoint_columns(metric):
+    """Column list of each endpoint, in the stream module's (name, kind) form."""
+    from .stream import METRIC_COLUMNS
+
+    quarterly = METRIC_COLUMNS["ttm"]
+    return {
+        "quarterly": quarterly,
+        "ttm": [c for c in quarterly if c[0] in ("Ticker", "Date", "Fiscal Year", "Fiscal Quarter", "TTM Net Income")],
+        "shares": METRIC_COLUMNS["shares"],
+        "combined": METRIC_COLUMNS["combined"],
+        "yield": METRIC_COLUMNS["combined"] + YIELD_COLUMNS,
+    }[metric]
+
+ENDPOINTS = ("quarterly", "ttm", "shares", "combined", "yield")
+
+# -------------------------------
+# Derived per-ticker series
+# -------------------------------
+def build_series(ticker, cik, prices=None, max_age=None):
+    """Every endpoint's frame for one ticker, plus its latest 10-K/10-Q filing.
+
+    One companyfacts and one submissions document feed all endpoints.
+    `prices` (a yields.prepare_prices frame for this ticker) enables the
+    yield endpoint. `max_age` is passed to the HTTP cache, so a rebuild
+    after a new filing revalidates the documents instead of reusing them.
+    """
+    from . import concepts, facts_store, net_income, pipeline, shares, submissions, watermarks
+    from .stream import METRIC_COLUMNS, conform
+
+    filing_df = submissions.get_edgar_filing_links(ticker, cik, max_age=max_age)
+    facts = facts_store.fetch_company_facts(cik, max_age=max_age)
+    concepts_df = concepts.extract_concepts(facts)
+
+    net_df = net_income.net_income_from_concepts(concepts_df)
+    if net_df.empty:
+        raise LookupError(f"No net income data for {ticker}.")
+    net_df = net_income.derive_fiscal_quarters(net_income.normalize_facts(net_df, keep_ytd=True))
+    if net_df.empty:
+        raise LookupError(f"No quarterly net income data for {ticker}.")
+    net_df = net_income.calculate_ttm_net_income(net_df)
+    shares_df = shares.shares_from_concepts(concepts_df)
+    merged = pipeline.merge_ticker_frames(ticker, net_df, filing_df, shares_df)
+
+    quarterly = conform(net_df, ticker, METRIC_COLUMNS["ttm"])
+    frames = {
+        "quarterly": quarterly,
+        "ttm": quarterly.loc[quarterly["TTM Net Income"].notna(), [c for c, _ in endpoint_columns("ttm")]],
+        "shares": conform(shares_df, ticker, METRIC_COLUMNS["shares"]),
+        "combined": conform(merged, ticker, METRIC_COLUMNS["combined"]),
+    }
+    if prices is not None:
+        from . import yields
+        frames["yield"] = conform(yields.quarterly_yields(frames["combined"], prices), ticker, endpoint_columns("yield"))
+    return SimpleNamespace(frames=frames, latest_filing=watermarks.latest_filing(filing_df))
+
+# -------------------------------
+# Size-bounded LRU of derived series
+# -------------------------------
+class SeriesCache:
+    """Derived per-ticker frames kept in a byte-bounded LRU.
+
+    A ticker is built on its first request (concurrent first requests wait
+    for one build; tickers sharing a lock stripe build one at a time) and
+    served from memory afterwards, with each endpoint's JSON encoded once.
+    After `check_seconds` the next request re-reads the ticker's
+    submissions through the HTTP cache; if its newest 10-K/10-Q differs
+    from the one the frames were built from, the entry is rebuilt from
+    revalidated documents. Least recently used tickers are dropped once the
+    frames and encoded bodies exceed `max_bytes`.
+    """
+
+    def __init__(self, cik_dict, prices=None, max_bytes=SERVICE_CACHE_BYTES, check_seconds=FILING_CHECK_SECONDS,
+                 build=build_series):
+        self.cik_dict = cik_dict
+        self.prices = prices
+        self.max_bytes = max_bytes
+        self.check_seconds = check_seconds
+        self.build = build
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks = [threading.Lock() for _ in range(max(1, BUILD_LOCK_STRIPES))]
+        self.stats = {"hits": 0, "misses": 0, "rebuilds": 0, "checks": 0, "evictions": 0}
+
+    def _prices_for(self, ticker):
+        if self.prices is None:
+            return None
+        rows = self.prices["index"].get(ticker)
+        return self.prices["frame"].iloc[rows if rows is not None else []]
+
+    def _entry_bytes(self, entry):
+        frames = sum(int(df.memory_usage(deep=True).sum()) for df in entry["series"].frames.values())
+        return frames + sum(len(body) for body in entry["bodies"].values())
+
+    def _put(self, ticker, entry):
+        with self._lock:
+            old = self._entries.pop(ticker, None)
+            if old is not None:
+                self._bytes -= old["bytes"]
+            entry["bytes"] = self._entry_bytes(entry)
+            self._entries[ticker] = entry
+            self._bytes += entry["bytes"]
+            self._evict()
+
+    def _evict(self):
+        # Called with self._lock held; the most recently used entry always stays
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, dropped = self._entries.popitem(last=False)
+            self._bytes -= dropped["bytes"]
+            self.stats["evictions"] += 1
+
+    def _get_entry(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None and time.time() - entry["checked_at"] < self.check_seconds:
+                self._entries.move_to_end(ticker)
+                self.stats["hits"] += 1
+                return entry, True
+            build_lock = self._build_locks[hash(ticker) % len(self._build_locks)]
+
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(ticker)
+                if entry is not None and time.time() - entry["checked_at"] < self.check_seconds:
+                    self._entries.move_to_end(ticker)
+                    self.stats["hits"] += 1
+                    return entry, True
+
+            cik = self.cik_dict.get(ticker)
+            if not cik:
+                raise KeyError(f"CIK not found for {ticker}")
+
+            if entry is not None:
+                # Stale entry: only rebuild when the company filed since it was built
+                from . import submissions, watermarks
+                with self._lock:
+                    self.stats["checks"] += 1
+                filing_df = submissions.get_edgar_filing_links(ticker, cik, max_age=self.check_seconds)
+                latest = watermarks.latest_filing(filing_df)
+                if latest is None or latest == entry["series"].latest_filing:
+                    with self._lock:
+                        entry["checked_at"] = time.time()
+                        if self._entries.get(ticker) is entry:
+                            self._entries.move_to_end(ticker)
+                        self.stats["hits"] += 1
+                    return entry, True
+                with self._lock:
+                    self.stats["rebuilds"] += 1
+                series = self.build(ticker, cik, prices=self._prices_for(ticker), max_age=0)
+            else:
+                with self._lock:
+                    self.stats["misses"] += 1
+                series = self.build(ticker, cik, prices=self._prices_for(ticker))
+
+            entry = {"series": series, "bodies": {}, "checked_at": time.time()}
+            self._put(ticker, entry)
+            return entry, False
+
+    def get(self, ticker, metric):
+        """(JSON body, served_from_cache) for one endpoint of one ticker."""
+        from .stream import frame_json
+
+        ticker = ticker.upper()
+        entry, cached = self._get_entry(ticker)
+        body = entry["bodies"].get(metric)
+        if body is None:
+            frame = entry["series"].frames.get(metric)
+            if frame is None:
+                raise LookupError(f"No {metric} data; start the service with --prices to enable it.")
+            body = frame_json(frame, endpoint_columns(metric)).encode("utf-8")
+            with self._lock:
+                if metric not in entry["bodies"]:
+                    entry["bodies"][metric] = body
+                    entry["bytes"] += len(body)
+                    if self._entries.get(ticker) is entry:
+                        self._bytes += len(body)
+                        self._evict()
+        return body, cached
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(ticker.upper(), None)
+            if entry is not None:
+                self._bytes -= entry["bytes"]
+
+    def info(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+def index_prices(prices):
+    """Prepared price history with the row positions of every ticker, for per-ticker slices."""
+    from . import yields
+
+    prices = yields.prepare_prices(prices).reset_index(drop=True)
+    return {"frame": prices, "index": prices.groupby("Ticker", observed=True).indices}
+
+# -------------------------------
+# HTTP service
+# -------------------------------
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /<endpoint>/<ticker>, GET /health, GET /cache, GET /metrics, POST /invalidate[/<ticker>]."""
+
+    server_version = "NetIncomeYield/1.0"
+
+    def _send(self, status, body, cached=None, content_type="application/json; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if cached is not None:
+            self.send_header("X-Cache", "hit" if cached else "miss")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode("utf-8"))
+
+    def _parts(self):
+        return [unquote(p) for p in urlsplit(self.path).path.split("/") if p]
+
+    def do_GET(self):
+        import requests
+
+        parts = self._parts()
+        cache = self.server.series_cache
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok"})
+        if parts == ["cache"]:
+            return self._send_json(200, cache.info())
+        if parts == ["metrics"]:
+            from . import metrics
+            return self._send(200, metrics.get_metrics().prometheus().encode("utf-8"),
+                              content_type="text/plain; version=0.0.4; charset=utf-8")
+        if len(parts) != 2 or parts[0] not in ENDPOINTS:
+            return self._send_json(404, {"error": f"Unknown path {self.path}", "endpoints": list(ENDPOINTS)})
+
+        metric, ticker = parts
+        try:
+            body, cached = cache.get(ticker, metric)
+        except KeyError as e:
+            return self._send_json(404, {"error": e.args[0] if e.args else str(e)})
+        except LookupError as e:
+            return self._send_json(404, {"error": str(e)})
+        except requests.exceptions.RequestException as e:
+            return self._send_json(502, {"error": f"SEC request failed: {e}"})
+        except Exception as e:
+            return self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200, body, cached=cached)
+
+    def do_POST(self):
+        parts = self._parts()
+        if not parts or parts[0] != "invalidate" or len(parts) > 2:
+            return self._send_json(404, {"error": f"Unknown path {self.path}"})
+        ticker = parts[1] if len(parts) == 2 else None
+        self.server.series_cache.invalidate(ticker)
+        self._send_json(200, {"invalidated": ticker.upper() if ticker else "all"})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+def make_server(series_cache, host=SERVICE_HOST, port=SERVICE_PORT, quiet=False):
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.series_cache = series_cache
+    server.quiet = quiet
+    return server
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP query service for net income, TTM, shares and yields.")
+    parser.add_argument("--host", default=SERVICE_HOST, help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port to listen on.")
+    parser.add_argument("--prices", metavar="PATH", help="Price history CSV/Parquet; enables /yield/<ticker>.")
+    parser.add_argument("--cache-bytes", type=int, default=SERVICE_CACHE_BYTES, help="Memory bound of the derived-frame LRU.")
+    parser.add_argument("--check-seconds", type=float, default=FILING_CHECK_SECONDS,
+                        help="Seconds a cached ticker is served before checking for new filings.")
+    parser.add_argument("--tickers-source", metavar="PATH", help="Ticker/CIK .docx or .json index (default: TICKER_SOURCE).")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not log requests.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    from . import ticker_index
+
+    cik_dict = ticker_index.load_ticker_index(args.tickers_source or ticker_index.TICKER_SOURCE)
+    prices = None
+    if args.prices:
+        from . import yields
+        prices = index_prices(yields.read_table(args.prices))
+
+    series_cache = SeriesCache(cik_dict, prices=prices, max_bytes=args.cache_bytes, check_seconds=args.check_seconds)
+    server = make_server(series_cache, host=args.host, port=args.port, quiet=args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_port} "
+          f"({', '.join(f'/{e}/<ticker>' for e in ENDPOINTS)}, /cache, /metrics, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from . import concepts, http_cache, ticker_index
+
+# -------------------------------
+# Fetch Shares Outstanding Data
+# -------------------------------
+def get_shares_outstanding(cik, facts=None):
+    """Return 10-K/10-Q dei:EntityCommonStockSharesOutstanding rows.
+
+    Pass an already parsed companyfacts document as `facts` to skip the
+    download, e.g. when the same document also feeds the net income extractor.
+    """
+    try:
+        if facts is None:
+            url = http_cache.sec_url(f"api/xbrl/companyfacts/CIK{str(cik).zfill(10)}.json")
+            facts = http_cache.cached_get_json_subtrees(url, concepts.concept_prefixes(["Shares Outstanding"]))
+        return extract_shares_outstanding(facts)
+    except Exception as e:
+        print(f"Error fetching shares outstanding: {e}")
+        return pd.DataFrame()
+
+def extract_shares_outstanding(data):
+    """Cover-page shares outstanding, or weighted average basic shares when a filer has none."""
+    return shares_from_concepts(concepts.extract_concepts(data, ["Shares Outstanding"]))
+
+def shares_from_concepts(long_df):
+    """Shares outstanding rows of an extract_concepts frame (shared with other metrics)."""
+    df = concepts.metric_frame(long_df, "Shares Outstanding")
+    if df.empty:
+        return df
+    df = df.dropna(subset=['Shares Outstanding'])
+    df['Shares Outstanding'] = df['Shares Outstanding'].astype('int64')
+    return df[['Date', 'Form', 'Shares Outstanding', 'Filed', 'Tag']].reset_index(drop=True)
+
+# -------------------------------
+# Main Program Loop
+# -------------------------------
+def main():
+    cik_dict = ticker_index.load_ticker_index(ticker_index.TICKER_SOURCE)
+
+    while True:
+        ticker = input("\nEnter a ticker (or type 'exit' to quit): ").strip().upper()
+        if ticker == "EXIT":
+            print("Goodbye.")
+            break
+
+        cik = cik_dict.get(ticker)
+        if not cik:
+            print(f"Ticker '{ticker}' not found.")
+            continue
+
+        print(f"\nFetching shares outstanding for {ticker} (CIK: {cik})...")
+        df = get_shares_outstanding(cik)
+        if df.empty:
+            print("No data found.")
+            continue
+
+        print("\nQuarterly Shares Outstanding:")
+        print(df)
+
+if __name__ == "__main__":
+    main()
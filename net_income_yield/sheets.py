@@ -0,0 +1,249 @@
+import os
+import threading
+
+from . import metrics
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+GOOGLE_CREDENTIALS = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON", "service_account.json")
+DEFAULT_SHEET_NAME = os.environ.get("GOOGLE_SHEET_NAME", "All Combined Data")
+
+# -------------------------------
+# A1 notation helpers
+# -------------------------------
+def column_letter(col):
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def a1_range(row, first_col, last_col):
+    return f"{column_letter(first_col)}{row}:{column_letter(last_col)}{row}"
+
+def to_sheet_strings(df):
+    """Same cell cleaning as the full-sheet upload: inf/NA become "" and every cell a string."""
+    import pandas as pd
+
+    df = df.replace([float("inf"), float("-inf"), pd.NA, None], "")
+    return df.fillna("").astype(str)
+
+# -------------------------------
+# Incremental upsert sink
+# -------------------------------
+class SheetHeaderError(ValueError):
+    """The sheet's header row cannot be used as a column index (e.g. duplicate names)."""
+
+class SheetUpsertSink:
+    """Upserts rows into a worksheet keyed by (Ticker, Date).
+
+    The sheet is read once; after that a key -> row-number index and the
+    current cell values are kept in memory. Each upsert compares incoming
+    rows with those values and sends only changed cells, as one
+    batch_update of contiguous ranges, plus one append_rows call for new
+    keys. Existing rows are never cleared, so readers never see an empty
+    sheet. Keep one sink per worksheet for the life of the process (see
+    get_sheet_sink) so later upserts reuse the index instead of re-reading
+    the sheet. Works with a gspread Worksheet or the in-memory FakeWorksheet.
+    """
+
+    def __init__(self, worksheet, key_columns=("Ticker", "Date")):
+        self.worksheet = worksheet
+        self.key_columns = list(key_columns)
+        self.header = None
+        self.rows = {}
+        self.last_row = 0
+        self._lock = threading.Lock()
+
+    def load(self):
+        values = self.worksheet.get_all_values()
+        self.header = list(values[0]) if values else []
+        self.rows = {}
+        self.last_row = len(values)
+        if self.header and len(self.header) != len(set(self.header)):
+            raise SheetHeaderError("Duplicate column names found in sheet header.")
+        if not self.header:
+            return
+        key_positions = [self.header.index(k) for k in self.key_columns if k in self.header]
+        if len(key_positions) != len(self.key_columns):
+            return
+        for row_number, row in enumerate(values[1:], start=2):
+            row = list(row) + [""] * (len(self.header) - len(row))
+            self.rows[tuple(row[p] for p in key_positions)] = (row_number, row)
+
+    def _ensure_header(self, columns):
+        if self.header is None:
+            self.load()
+        missing = [c for c in columns if c not in self.header]
+        if not self.header or missing:
+            self.header = (self.header or []) + missing
+            self.worksheet.batch_update(
+                [{"range": a1_range(1, 1, len(self.header)), "values": [self.header]}],
+                value_input_option="RAW",
+            )
+            for row_number, row in self.rows.values():
+                row.extend([""] * (len(self.header) - len(row)))
+            self.last_row = max(self.last_row, 1)
+
+    def upsert(self, df):
+        """Write `df` into the sheet. Returns (cells_updated, rows_appended)."""
+        if df.empty:
+            return 0, 0
+        with self._lock:
+            try:
+                return self._upsert(df)
+            except Exception:
+                # Re-read the sheet on the next upsert rather than trust a partly applied index
+                self.header = None
+                raise
+
+    def _upsert(self, df):
+        missing_keys = [k for k in self.key_columns if k not in df.columns]
+        if missing_keys:
+            raise KeyError(f"Missing key columns: {missing_keys}")
+        self._ensure_header(list(df.columns))
+
+        # Incoming rows in sheet column order; later duplicates of a key win
+        incoming = to_sheet_strings(df).reindex(columns=self.header, fill_value="")
+        incoming = incoming.drop_duplicates(subset=self.key_columns, keep="last")
+        provided = [c in df.columns for c in self.header]
+        key_positions = [self.header.index(k) for k in self.key_columns]
+
+        updates = []
+        appends = []
+        cells_updated = 0
+        for values in incoming.itertuples(index=False, name=None):
+            values = list(values)
+            key = tuple(values[p] for p in key_positions)
+            if key not in self.rows:
+                appends.append(values)
+                continue
+
+            row_number, current = self.rows[key]
+            changed = [i for i, (new, old) in enumerate(zip(values, current)) if provided[i] and new != old]
+            # Group contiguous changed columns into one range each
+            start = None
+            for j, i in enumerate(changed):
+                if start is None:
+                    start = i
+                if j + 1 == len(changed) or changed[j + 1] != i + 1:
+                    updates.append({
+                        "range": a1_range(row_number, start + 1, i + 1),
+                        "values": [values[start:i + 1]],
+                    })
+                    cells_updated += i + 1 - start
+                    start = None
+            for i in changed:
+                current[i] = values[i]
+
+        if updates:
+            self.worksheet.batch_update(updates, value_input_option="RAW")
+        if appends:
+            self.worksheet.append_rows(appends, value_input_option="RAW")
+            for values in appends:
+                self.last_row += 1
+                self.rows[tuple(values[p] for p in key_positions)] = (self.last_row, values)
+        return cells_updated, len(appends)
+
+# -------------------------------
+# In-memory stand-in for a gspread Worksheet
+# -------------------------------
+class FakeWorksheet:
+    """Implements the Worksheet calls the sink uses, and counts them."""
+
+    def __init__(self, values=None):
+        self.values = [list(row) for row in (values or [])]
+        self.calls = {"get_all_values": 0, "batch_update": 0, "append_rows": 0, "cells_written": 0}
+
+    def get_all_values(self):
+        self.calls["get_all_values"] += 1
+        return [list(row) for row in self.values]
+
+    def row_values(self, row):
+        return list(self.values[row - 1]) if row <= len(self.values) else []
+
+    def _set(self, row, col, value):
+        while len(self.values) < row:
+            self.values.append([])
+        cells = self.values[row - 1]
+        while len(cells) < col:
+            cells.append("")
+        cells[col - 1] = value
+        self.calls["cells_written"] += 1
+
+    def batch_update(self, data, value_input_option="RAW"):
+        self.calls["batch_update"] += 1
+        for item in data:
+            start, _ = item["range"].split(":")
+            letters = "".join(ch for ch in start if ch.isalpha())
+            row = int("".join(ch for ch in start if ch.isdigit()))
+            col = 0
+            for ch in letters:
+                col = col * 26 + ord(ch) - 64
+            for r, row_values in enumerate(item["values"]):
+                for c, value in enumerate(row_values):
+                    self._set(row + r, col + c, value)
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self.calls["append_rows"] += 1
+        for row_values in values:
+            self.values.append([])
+            for c, value in enumerate(row_values):
+                self._set(len(self.values), c + 1, value)
+
+    def clear(self):
+        self.values = []
+
+# -------------------------------
+# Upload to Google Sheets
+# -------------------------------
+def open_worksheet(sheet_name=DEFAULT_SHEET_NAME, credentials=None):
+    # Imported here so batch and bulk workers that never upload do not need gspread
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive"
+    ]
+    creds = ServiceAccountCredentials.from_json_keyfile_name(credentials or GOOGLE_CREDENTIALS, scope)
+    client = gspread.authorize(creds)
+
+    try:
+        return client.open(sheet_name).sheet1
+    except gspread.SpreadsheetNotFound:
+        return client.create(sheet_name).sheet1
+
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+def get_sheet_sink(sheet_name=DEFAULT_SHEET_NAME, credentials=None):
+    """The process-wide SheetUpsertSink of a sheet; the sheet is opened and read once."""
+    key = (sheet_name, credentials or GOOGLE_CREDENTIALS)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = _sinks[key] = SheetUpsertSink(open_worksheet(sheet_name, credentials))
+        return sink
+
+def upload_to_google_sheet(df, sheet_name=DEFAULT_SHEET_NAME, credentials=None, sink=None):
+    """Upsert `df` into the sheet; returns True once the rows were written.
+
+    A header the sink cannot index is reported and returns False, so
+    callers can hold back anything that depends on the write (such as
+    filing watermarks). Any other error propagates.
+    """
+    # Only changed cells and new (Ticker, Date) rows are written; the sheet is never cleared
+    sink = sink or get_sheet_sink(sheet_name, credentials)
+    try:
+        with metrics.stage("sheets_upload"):
+            cells_updated, rows_appended = sink.upsert(df)
+    except SheetHeaderError as e:
+        print(f"❌ {e} Fix the header row and retry.")
+        return False
+    metrics.increment("rows_written", rows_appended, sink="google_sheets")
+    metrics.increment("sheet_cells_updated", cells_updated)
+    print(f"✅ Uploaded to Google Sheet: {sheet_name} ({cells_updated} cells updated, {rows_appended} rows appended)")
+    return True
@@ -0,0 +1,302 @@
+import argparse
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import redirect_stdout
+
+from . import metrics
+
+# pandas, pyarrow and the pipeline modules are imported where they are used
+# so that `--help` and argument errors return without loading them
+
+# -------------------------------
+# Output columns per metric
+# -------------------------------
+# Every record of a metric has the same columns and types, so NDJSON
+# consumers see a stable shape and the Arrow stream has one schema.
+METRIC_COLUMNS = {
+    "combined": [
+        ("Ticker", "string"), ("Date", "date"), ("Net Income", "float"), ("TTM Net Income", "float"),
+        ("Filing Date", "date"), ("Shares Outstanding", "int"), ("Quarter", "string"), ("Fiscal Year", "int"),
+    ],
+    "ttm": [
+        ("Ticker", "string"), ("Date", "date"), ("Fiscal Year", "int"), ("Fiscal Quarter", "int"), ("Form", "string"),
+        ("Net Income", "float"), ("TTM Net Income", "float"), ("Filed", "date"), ("Source", "string"),
+    ],
+    "shares": [
+        ("Ticker", "string"), ("Date", "date"), ("Form", "string"), ("Shares Outstanding", "int"),
+        ("Filed", "date"), ("Tag", "string"),
+    ],
+    "filings": [
+        ("Ticker", "string"), ("Form", "string"), ("Period End", "date"), ("Filing Date", "date"),
+        ("Accession Number", "string"), ("EDGAR Link", "string"),
+    ],
+}
+
+# -------------------------------
+# Per-ticker frames
+# -------------------------------
+def combined_frame(ticker, cik):
+    from types import SimpleNamespace
+    from . import facts_store, net_income, pipeline, shares, submissions
+
+    mods = SimpleNamespace(ttm=net_income, sub=submissions, shares=shares, store=facts_store)
+    return pipeline.build_ticker_frame(ticker, cik, mods)
+
+def ttm_frame(ticker, cik):
+    from . import concepts, facts_store, net_income
+
+    concepts_df = concepts.extract_concepts(facts_store.get_company_facts(cik), ["Net Income"])
+    df = net_income.net_income_from_concepts(concepts_df)
+    if df.empty:
+        raise ValueError("No net income data.")
+    df = net_income.derive_fiscal_quarters(net_income.normalize_facts(df, keep_ytd=True))
+    if df.empty:
+        raise ValueError("No quarterly net income data.")
+    return net_income.calculate_ttm_net_income(df)
+
+def shares_frame(ticker, cik):
+    from . import concepts, facts_store, shares
+
+    concepts_df = concepts.extract_concepts(facts_store.get_company_facts(cik), ["Shares Outstanding"])
+    return shares.shares_from_concepts(concepts_df)
+
+def filings_frame(ticker, cik):
+    from . import submissions
+
+    return submissions.get_edgar_filing_links(ticker, cik)
+
+METRICS = {
+    "combined": combined_frame,
+    "ttm": ttm_frame,
+    "shares": shares_frame,
+    "filings": filings_frame,
+}
+
+def conform(df, ticker, columns):
+    """`df` with exactly `columns`, typed; "" and unparseable values become nulls."""
+    import pandas as pd
+
+    df = df.reset_index(drop=True)
+    out = {}
+    for name, kind in columns:
+        if name == "Ticker":
+            col = pd.Series(ticker, index=df.index, dtype="object")
+        elif name in df.columns:
+            col = df[name]
+        else:
+            col = pd.Series(None, index=df.index, dtype="object")
+
+        if kind == "date":
+            col = pd.to_datetime(col, errors="coerce")
+        elif kind == "float":
+            col = pd.to_numeric(col, errors="coerce").astype("float64")
+        elif kind == "int":
+            col = pd.to_numeric(col, errors="coerce").astype("Int64")
+        else:
+            col = col.astype("object")
+            col = col.where(col.notna() & (col != ""), None)
+        out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+def frame_json(df, columns, lines=False):
+    """JSON records of a conformed frame: dates as YYYY-MM-DD, missing values as null.
+
+    With `lines`, one object per line (NDJSON); otherwise a JSON array.
+    """
+    dates = [name for name, kind in columns if kind == "date" and name in df.columns]
+    df = df.assign(**{name: df[name].dt.strftime("%Y-%m-%d") for name in dates})
+    # to_json escapes "/" (links come out as https:\/\/...); undo it, the JSON stays valid
+    return df.to_json(orient="records", lines=lines, force_ascii=False).replace("\\/", "/")
+
+# -------------------------------
+# Record writers
+# -------------------------------
+class NdjsonWriter:
+    """One JSON object per row; dates as YYYY-MM-DD, missing values as null."""
+
+    def __init__(self, out, columns):
+        self.out = out
+        self.columns = columns
+
+    def write(self, df):
+        if df.empty:
+            return
+        with metrics.stage("write_ndjson"):
+            text = frame_json(df, self.columns, lines=True)
+            self.out.write(text if text.endswith("\n") else text + "\n")
+            self.out.flush()
+        metrics.increment("rows_written", len(df), sink="ndjson")
+
+    def close(self):
+        self.out.flush()
+
+class ArrowStreamWriter:
+    """Arrow IPC stream with one record batch per ticker (needs pyarrow)."""
+
+    TYPES = {"string": "string", "date": "date32", "float": "float64", "int": "int64"}
+
+    def __init__(self, sink, columns):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.sink = sink
+        self.schema = pa.schema([(name, getattr(pa, self.TYPES[kind])()) for name, kind in columns])
+        self.writer = pa.ipc.new_stream(sink, self.schema)
+
+    def write(self, df):
+        if df.empty:
+            return
+        with metrics.stage("write_arrow"):
+            batch = self.pa.RecordBatch.from_pandas(df, schema=self.schema, preserve_index=False)
+            self.writer.write_batch(batch)
+            self.sink.flush()
+        metrics.increment("rows_written", len(df), sink="arrow")
+
+    def close(self):
+        self.writer.close()
+        self.sink.flush()
+
+WRITERS = {"ndjson": NdjsonWriter, "arrow": ArrowStreamWriter}
+
+# -------------------------------
+# Streaming run
+# -------------------------------
+def iter_tickers(tickers=None, ticker_file=None, stream=None):
+    """Tickers from argv values, a file and/or a stream, read lazily and deduplicated."""
+    def sources():
+        yield from tickers or []
+        if ticker_file:
+            with open(ticker_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    yield from line.split()
+        if stream is not None:
+            for line in stream:
+                yield from line.split()
+
+    seen = set()
+    for ticker in sources():
+        ticker = ticker.strip().upper()
+        if ticker and ticker not in seen:
+            seen.add(ticker)
+            yield ticker
+
+def stream_tickers(tickers, cik_dict, writer, metric="combined", max_workers=4, on_error=None):
+    """Build `metric` for each ticker and hand each frame to `writer` as soon as it is done.
+
+    At most 2 * max_workers tickers are in flight and nothing is kept after
+    it is written, so memory stays flat however many tickers are read.
+    Records arrive in completion order. Failures are passed to
+    `on_error(ticker, exc)` and do not stop the run.
+    Returns (tickers_written, rows_written, tickers_failed).
+    """
+    build = METRICS[metric]
+    columns = METRIC_COLUMNS[metric]
+    counts = {"tickers": 0, "rows": 0, "failed": 0}
+
+    def run_one(ticker):
+        cik = cik_dict.get(ticker)
+        if not cik:
+            raise KeyError(f"CIK not found for {ticker}")
+        with metrics.ticker(ticker):
+            return conform(build(ticker, cik), ticker, columns)
+
+    def collect(done):
+        for future in done:
+            ticker = pending.pop(future)
+            try:
+                frame = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                metrics.increment("tickers", result="failed")
+                if on_error is not None:
+                    on_error(ticker, e)
+                continue
+            writer.write(frame)
+            metrics.increment("tickers", result="ok")
+            counts["tickers"] += 1
+            counts["rows"] += len(frame)
+
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            for ticker in tickers:
+                pending[pool.submit(run_one, ticker)] = ticker
+                if len(pending) >= 2 * max_workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return counts["tickers"], counts["rows"], counts["failed"]
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Stream per-ticker results as NDJSON (or Arrow IPC) as each ticker finishes.")
+    parser.add_argument("tickers", nargs="*",
+                        help="Tickers to process. Use '-' (or give none) to read tickers from stdin.")
+    parser.add_argument("-f", "--file", help="File with tickers separated by whitespace or newlines.")
+    parser.add_argument("-m", "--metric", choices=sorted(METRICS), default="combined", help="Rows to emit per ticker.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson", help="Output format.")
+    parser.add_argument("-o", "--output", help="Write records to this file instead of stdout.")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of tickers processed concurrently.")
+    parser.add_argument("--tickers-source", metavar="PATH", help="Ticker/CIK .docx or .json index (default: TICKER_SOURCE).")
+    parser.add_argument("--metrics", metavar="PATH", help="Write the run report (stage timings, bytes, cache, retries, rows) as JSON.")
+    parser.add_argument("--metrics-prom", metavar="PATH", help="Write the run report in Prometheus text format.")
+    parser.add_argument("--profile", metavar="STAGE", action="append",
+                        help="Run this stage under cProfile (repeatable, 'all' for every stage); see METRICS_PROFILE_DIR.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    run_metrics = metrics.reset_metrics(args.profile)
+    use_stdin = "-" in args.tickers or (not args.tickers and not args.file)
+    tickers = iter_tickers([t for t in args.tickers if t != "-"], ticker_file=args.file,
+                           stream=sys.stdin if use_stdin else None)
+
+    binary = args.format == "arrow"
+    if args.output:
+        out = open(args.output, "wb") if binary else open(args.output, "w", encoding="utf-8", newline="\n")
+    else:
+        out = sys.stdout.buffer if binary else sys.stdout
+
+    def report_error(ticker, e):
+        message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+        print(f"❌ {ticker}: {message}", file=sys.stderr)
+
+    # Progress and warnings from the pipeline modules go to stderr so stdout carries only records
+    try:
+        with redirect_stdout(sys.stderr):
+            from . import ticker_index
+            cik_dict = ticker_index.load_ticker_index(args.tickers_source or ticker_index.TICKER_SOURCE)
+            writer = WRITERS[args.format](out, METRIC_COLUMNS[args.metric])
+            written, rows, failed = stream_tickers(tickers, cik_dict, writer, metric=args.metric,
+                                                   max_workers=args.workers, on_error=report_error)
+            writer.close()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly like other filters
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return None
+    finally:
+        if args.output:
+            out.close()
+
+    print(f"Streamed {rows} rows for {written} tickers; {failed} failed.", file=sys.stderr)
+    if args.metrics or args.metrics_prom or run_metrics.profile_stages:
+        report = run_metrics.write_report(args.metrics, args.metrics_prom)
+        for stage, path in report.get("profiles", {}).items():
+            print(f"Saved {stage} profile to {path}", file=sys.stderr)
+    return written, rows, failed
+
+def cli(argv=None):
+    # Console entry point: main() returns counts for callers, which sys.exit() would print
+    main(argv)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import pandas as pd
+import requests
+
+from . import http_cache, ticker_index
+
+# ----------- Retrieve Filing Links from SEC -----------
+def submissions_url(cik):
+    return http_cache.sec_url(f"submissions/CIK{str(cik).zfill(10)}.json")
+
+def get_edgar_filing_links(ticker, cik, max_age=None):
+    """10-K/10-Q filings of one company, including the paginated history.
+
+    `filings.recent` only holds about the last 1,000 filings; older ones are
+    in the documents listed under `filings.files`. Those pages are fetched
+    concurrently through the async client into the HTTP cache (they rarely
+    change, so repeat runs cost a 304 or nothing) and merged with the recent filings. `max_age`
+    overrides the HTTP cache ttl for the main document only.
+    """
+    url = submissions_url(cik)
+
+    try:
+        data = http_cache.cached_get_json(url, max_age=max_age)
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching SEC data for {ticker}: {e}")
+        return pd.DataFrame()
+
+    pages = []
+    names = [f.get("name") for f in data.get("filings", {}).get("files", []) if f.get("name")]
+    if names:
+        page_urls = [http_cache.sec_url(f"submissions/{name}") for name in names]
+        fetched = http_cache.prefetch(page_urls)
+        for name, result in zip(names, fetched):
+            if isinstance(result, requests.exceptions.RequestException):
+                print(f"Error fetching filing history page {name} for {ticker}: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                pages.append(http_cache.read_cached_json(result))
+    return extract_filing_links(cik, data, pages)
+
+# ----------- Extract 10-K / 10-Q Filings from a Submissions Document -----------
+FILING_COLUMNS = ['Form', 'Period End', 'Filing Date', 'Accession Number', 'EDGAR Link']
+
+def filings_frame(cik, filings):
+    """10-K/10-Q rows of one columnar filings block (`filings.recent` or a history page)."""
+    df = pd.DataFrame({
+        'Form': pd.Series(filings.get('form', []), dtype='object'),
+        'Period End': pd.Series(filings.get('reportDate', []), dtype='object'),
+        'Filing Date': pd.Series(filings.get('filingDate', []), dtype='object'),
+        'Accession Number': pd.Series(filings.get('accessionNumber', []), dtype='object'),
+    })
+    keep = df['Form'].isin(['10-K', '10-Q'])
+    for col in ('Period End', 'Filing Date'):
+        keep &= df[col].notna() & (df[col] != '')
+    df = df[keep]
+    links = f"https://www.sec.gov/Archives/edgar/data/{int(cik)}/" + df['Accession Number'].str.replace('-', '', regex=False) + "/index.html"
+    return df.assign(**{'EDGAR Link': links})[FILING_COLUMNS]
+
+def extract_filing_links(cik, data, pages=None):
+    """Recent filings plus any history `pages`, one row per accession number."""
+    blocks = [data.get("filings", {}).get("recent", {})] + list(pages or [])
+    df = pd.concat([filings_frame(cik, block) for block in blocks], ignore_index=True)
+    df = df.drop_duplicates(subset='Accession Number', keep='first')
+    df = df.sort_values('Period End', kind='stable').reset_index(drop=True)
+    return df
+
+# ----------- Main Execution Loop -----------
+def main():
+    cik_dict = ticker_index.load_ticker_index(ticker_index.TICKER_SOURCE)
+
+    while True:
+        ticker = input("\nEnter a ticker symbol (or type 'exit' to quit): ").strip().upper()
+        if ticker == "EXIT":
+            print("Exiting.")
+            break
+
+        cik = cik_dict.get(ticker)
+        if cik:
+            print(f"Fetching EDGAR filings for {ticker} (CIK: {cik})...\n")
+            filings_df = get_edgar_filing_links(ticker, cik)
+
+            if not filings_df.empty:
+                print(filings_df)
+            else:
+                print("No 10-K or 10-Q filings found.")
+        else:
+            print(f"CIK for ticker '{ticker}' not found in the dictionary.")
+
+if __name__ == "__main__":
+    main()
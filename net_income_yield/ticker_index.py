@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+# DOCX key/value document or SEC company_tickers.json
+TICKER_SOURCE = os.environ.get("TICKER_SOURCE", "textfile.docx")
+
+# -------------------------------
+# Parse ticker → CIK sources
+# -------------------------------
+def extract_dictionary_from_docx(file_path):
+    # python-docx is only needed when the index has to be rebuilt
+    from docx import Document
+
+    doc = Document(file_path)
+    extracted_dict = {}
+    for para in doc.paragraphs:
+        match = re.match(r'([a-zA-Z]{1,6})\s{1,13}(\d{1,10})', para.text.strip())
+        if match:
+            key = match.group(1).strip().upper()
+            value = match.group(2).strip()
+            extracted_dict[key] = value
+    return extracted_dict
+
+def extract_dictionary_from_company_tickers(file_path):
+    # SEC company_tickers.json: {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}, ...}
+    with open(file_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.values() if isinstance(data, dict) else data
+    return {str(entry["ticker"]).strip().upper(): str(entry["cik_str"]) for entry in entries}
+
+def read_source(file_path):
+    if file_path.lower().endswith(".json"):
+        return extract_dictionary_from_company_tickers(file_path)
+    return extract_dictionary_from_docx(file_path)
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# -------------------------------
+# Compiled SQLite index
+# -------------------------------
+class TickerIndex:
+    """Ticker → CIK lookups backed by a compiled SQLite table.
+
+    The source (the DOCX key/value document or SEC's company_tickers.json)
+    is only parsed when the index is missing or the source changed: a
+    matching mtime and size skips all work, and a changed mtime with the
+    same SHA-256 only refreshes the stored stamp. Nothing is opened until
+    the first lookup. Tickers are matched case-insensitively.
+    """
+
+    def __init__(self, source_path, index_path=None):
+        self.source_path = source_path
+        self.index_path = index_path or os.path.splitext(source_path)[0] + ".tickers.sqlite3"
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        db = sqlite3.connect(self.index_path, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS tickers (ticker TEXT PRIMARY KEY, cik TEXT NOT NULL) WITHOUT ROWID")
+        db.execute("CREATE TABLE IF NOT EXISTS source (path TEXT, mtime REAL, size INTEGER, sha256 TEXT)")
+        return db
+
+    def _ensure_current(self):
+        if self._db is not None:
+            return self._db
+        db = self._connect()
+        stat = os.stat(self.source_path)
+        stamp = db.execute("SELECT path, mtime, size, sha256 FROM source").fetchone()
+
+        if stamp and stamp[0] == self.source_path and stamp[1] == stat.st_mtime and stamp[2] == stat.st_size:
+            self._db = db
+            return db
+
+        sha256 = file_sha256(self.source_path)
+        if stamp and stamp[0] == self.source_path and stamp[3] == sha256:
+            with db:
+                db.execute("UPDATE source SET mtime = ?, size = ?", (stat.st_mtime, stat.st_size))
+        else:
+            self._rebuild(db, read_source(self.source_path), stat, sha256)
+        self._db = db
+        return db
+
+    def _rebuild(self, db, mapping, stat, sha256):
+        with db:
+            db.execute("DELETE FROM tickers")
+            db.executemany("INSERT OR REPLACE INTO tickers (ticker, cik) VALUES (?, ?)", mapping.items())
+            db.execute("DELETE FROM source")
+            db.execute("INSERT INTO source (path, mtime, size, sha256) VALUES (?, ?, ?, ?)",
+                       (self.source_path, stat.st_mtime, stat.st_size, sha256))
+
+    def get(self, ticker, default=None):
+        with self._lock:
+            db = self._ensure_current()
+            row = db.execute("SELECT cik FROM tickers WHERE ticker = ?", (str(ticker).strip().upper(),)).fetchone()
+        return row[0] if row else default
+
+    def __getitem__(self, ticker):
+        cik = self.get(ticker)
+        if cik is None:
+            raise KeyError(ticker)
+        return cik
+
+    def __contains__(self, ticker):
+        return self.get(ticker) is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._ensure_current().execute("SELECT COUNT(*) FROM tickers").fetchone()[0]
+
+    def items(self):
+        with self._lock:
+            return self._ensure_current().execute("SELECT ticker, cik FROM tickers ORDER BY ticker").fetchall()
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def load_ticker_index(source_path, index_path=None):
+    """Return the shared (lazy) TickerIndex for `source_path`."""
+    key = (os.path.abspath(source_path), index_path)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TickerIndex(source_path, index_path)
+        return _indexes[key]
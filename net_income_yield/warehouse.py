@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+RESULTS_DB = os.environ.get("RESULTS_DB", "combined_results.sqlite3")
+
+# Frame column -> (table column, SQLite type). Ticker and Date form the primary key.
+COLUMNS = {
+    "Ticker": ("ticker", "TEXT NOT NULL"),
+    "Date": ("date", "TEXT NOT NULL"),
+    "Form": ("form", "TEXT"),
+    "Net Income": ("net_income", "REAL"),
+    "TTM Net Income": ("ttm_net_income", "REAL"),
+    "Filing Date": ("filing_date", "TEXT"),
+    "Shares Outstanding": ("shares_outstanding", "INTEGER"),
+    "Quarter": ("quarter", "TEXT"),
+    "Fiscal Year": ("fiscal_year", "INTEGER"),
+}
+DATE_COLUMNS = ["Date", "Filing Date"]
+NUMERIC_COLUMNS = ["Net Income", "TTM Net Income", "Shares Outstanding", "Fiscal Year"]
+
+# -------------------------------
+# Value conversion
+# -------------------------------
+def _to_records(df, columns):
+    """Rows of plain Python values for executemany: ISO dates, None for missing."""
+    out = {}
+    for col in columns:
+        values = df[col]
+        if col in DATE_COLUMNS:
+            values = pd.to_datetime(values, errors="coerce").dt.strftime("%Y-%m-%d")
+        elif col in NUMERIC_COLUMNS:
+            values = pd.to_numeric(values, errors="coerce")
+            values = values.replace([np.inf, -np.inf], np.nan)
+        cast = int if COLUMNS[col][1] == "INTEGER" else (float if col in NUMERIC_COLUMNS else str)
+        out[col] = [None if pd.isna(v) else cast(v) for v in values]
+    return list(zip(*(out[col] for col in columns)))
+
+# -------------------------------
+# Results warehouse
+# -------------------------------
+class ResultsWarehouse:
+    """Combined per-quarter results keyed by (Ticker, Date).
+
+    Replaces the append-only all_combined_data.csv: re-running a ticker
+    updates its rows instead of duplicating them, and readers query by
+    ticker or date through the primary key and a date index rather than
+    parsing the whole history. The database runs in WAL mode so readers
+    are not blocked while a batch is being written.
+    """
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{name} {sql_type}" for name, sql_type in COLUMNS.values())
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS results ({columns}, updated_at TEXT NOT NULL,"
+            " PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_date ON results (date)")
+        self._db.commit()
+
+    def upsert(self, df):
+        """Insert or update rows of `df`; columns it does not carry keep their stored values."""
+        if df is None or df.empty:
+            return 0
+        columns = [c for c in COLUMNS if c in df.columns]
+        if "Ticker" not in columns or "Date" not in columns:
+            raise KeyError("Results need 'Ticker' and 'Date' columns.")
+        names = [COLUMNS[c][0] for c in columns]
+        updated_at = datetime.now(timezone.utc).isoformat()
+        records = [row + (updated_at,) for row in _to_records(df, columns)]
+        assignments = ", ".join(f"{n} = excluded.{n}" for n in names[2:] + ["updated_at"])
+        sql = (
+            f"INSERT INTO results ({', '.join(names)}, updated_at)"
+            f" VALUES ({', '.join('?' * (len(names) + 1))})"
+            f" ON CONFLICT (ticker, date) DO UPDATE SET {assignments}"
+        )
+        with self._lock, self._db:
+            self._db.executemany(sql, records)
+        return len(records)
+
+    def _query(self, where="", params=()):
+        select = ", ".join(f'{name} AS "{col}"' for col, (name, _) in COLUMNS.items())
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {select} FROM results {where}", self._db, params=params)
+        for col in DATE_COLUMNS:
+            df[col] = pd.to_datetime(df[col])
+        for col, (_, sql_type) in COLUMNS.items():
+            if sql_type == "INTEGER":
+                df[col] = df[col].astype("Int64")
+        return df
+
+    def by_ticker(self, ticker):
+        return self._query("WHERE ticker = ? ORDER BY date", (ticker.upper(),))
+
+    def by_date_range(self, start=None, end=None, tickers=None):
+        """Rows with start <= Date <= end (either bound optional), optionally for some tickers."""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+        if tickers:
+            tickers = [t.upper() for t in tickers]
+            clauses.append(f"ticker IN ({', '.join('?' * len(tickers))})")
+            params.extend(tickers)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        return self._query(where + "ORDER BY ticker, date", params)
+
+    def latest_quarter(self):
+        """The most recent row of every ticker."""
+        return self._query(
+            "WHERE (ticker, date) IN (SELECT ticker, MAX(date) FROM results GROUP BY ticker) ORDER BY ticker"
+        )
+
+    def tickers(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT ticker FROM results ORDER BY ticker")]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
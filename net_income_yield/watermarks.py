@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+# -------------------------------
+# Settings (override with environment variables)
+# -------------------------------
+WATERMARK_DB = os.environ.get("FILING_WATERMARK_DB", "filing_watermarks.sqlite3")
+
+# -------------------------------
+# Latest filing in a get_edgar_filing_links frame
+# -------------------------------
+def latest_filing(filing_df):
+    """Return (filing_date, accession_number) of the newest 10-K/10-Q, or None."""
+    if filing_df is None or filing_df.empty:
+        return None
+    filings = filing_df[filing_df['Form'].isin(['10-K', '10-Q'])]
+    if filings.empty:
+        return None
+    newest = filings.sort_values(['Filing Date', 'Accession Number'], kind='stable').iloc[-1]
+    return str(newest['Filing Date']), str(newest['Accession Number'])
+
+# -------------------------------
+# Per-CIK watermark store
+# -------------------------------
+class WatermarkStore:
+    """Latest 10-K/10-Q filing date and accession number seen per CIK.
+
+    The submissions document is cheap to fetch (and usually a 304 through the
+    HTTP cache), so comparing it with the stored watermark tells whether a
+    company needs its companyfacts re-fetched and its quarters re-derived.
+    Watermarks are only advanced after a company was processed successfully:
+    a batch stages them with stage_update() while it builds frames and calls
+    commit_staged() once every sink has written them, so a failed write or
+    upload leaves those companies due for the next run.
+    """
+
+    def __init__(self, path=WATERMARK_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._staged = {}
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watermarks ("
+            " cik TEXT PRIMARY KEY, ticker TEXT, filing_date TEXT NOT NULL,"
+            " accession_number TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, cik):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filing_date, accession_number FROM watermarks WHERE cik = ?", (str(cik).zfill(10),)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def has_new_filings(self, cik, filing_df):
+        latest = latest_filing(filing_df)
+        if latest is None:
+            return False
+        return self.get(cik) != latest
+
+    def update(self, cik, filing_df, ticker=None):
+        latest = latest_filing(filing_df)
+        if latest is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO watermarks (cik, ticker, filing_date, accession_number, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (str(cik).zfill(10), ticker, latest[0], latest[1], datetime.now(timezone.utc).isoformat()),
+            )
+            self._db.commit()
+
+    def stage_update(self, cik, filing_df, ticker=None):
+        """Remember the watermark for commit_staged() without writing it yet."""
+        latest = latest_filing(filing_df)
+        if latest is None:
+            return
+        with self._lock:
+            self._staged[str(cik).zfill(10)] = (ticker, latest)
+
+    def commit_staged(self):
+        """Write every staged watermark in one transaction; returns how many were written."""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            rows = [(cik, ticker, latest[0], latest[1], now) for cik, (ticker, latest) in self._staged.items()]
+            self._db.executemany(
+                "INSERT OR REPLACE INTO watermarks (cik, ticker, filing_date, accession_number, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            self._staged.clear()
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
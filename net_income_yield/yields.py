@@ -0,0 +1,227 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Settings
+# -------------------------------
+# Used as the availability date of a quarter whose Filing Date is unknown (10-Q deadline)
+MISSING_FILING_LAG = pd.Timedelta(days=45)
+# Accepted spellings of the price history columns
+PRICE_COLUMN_ALIASES = {
+    "ticker": "Ticker", "symbol": "Ticker",
+    "date": "Date",
+    "close": "Close", "adj close": "Close", "adj_close": "Close", "price": "Close",
+}
+
+# -------------------------------
+# Input loading
+# -------------------------------
+def read_table(path):
+    """Read a CSV or Parquet file."""
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def as_datetime(values):
+    """pd.to_datetime in nanoseconds; merge_asof needs both keys in one unit, which pandas infers per input."""
+    return pd.to_datetime(values, errors="coerce").astype("datetime64[ns]")
+
+def normalize_tickers(values):
+    """Upper-cased tickers as a Categorical with sorted categories.
+
+    Normalizing the distinct values only and carrying integer codes keeps
+    sorts and as-of joins over tens of millions of price rows cheap.
+    Missing and blank tickers become NaN (code -1).
+    """
+    codes, uniques = pd.factorize(values)
+    names = pd.Index(uniques).astype(str).str.strip().str.upper()
+    categories = pd.Index(names[names != ""].unique()).sort_values()
+    mapping = np.append(categories.get_indexer(names), -1)
+    return pd.Categorical.from_codes(mapping[codes], categories)
+
+def prepare_prices(prices):
+    """Ticker (categorical) / Date / Close, sorted by Date for the as-of joins."""
+    renamed = {}
+    for col in prices.columns:
+        target = PRICE_COLUMN_ALIASES.get(str(col).strip().lower())
+        if target and target not in renamed.values():
+            renamed[col] = target
+    prices = prices.rename(columns=renamed)
+    missing = [c for c in ("Ticker", "Date", "Close") if c not in prices.columns]
+    if missing:
+        raise KeyError(f"Price history is missing columns: {missing}")
+
+    out = pd.DataFrame({
+        "Ticker": normalize_tickers(prices["Ticker"]),
+        "Date": as_datetime(prices["Date"]),
+        "Close": pd.to_numeric(prices["Close"], errors="coerce").astype("float64"),
+    })
+    keep = out["Ticker"].notna().to_numpy() & out["Date"].notna().to_numpy() & (out["Close"].to_numpy() > 0)
+    out = out[keep]
+    order = np.argsort(out["Date"].to_numpy(), kind="stable")
+    return out.take(order).reset_index(drop=True)
+
+def ticker_codes(tickers, categories):
+    """Integer codes of `tickers` in `categories` (-1 when absent), used as merge_asof `by` keys.
+
+    -1 is not a ticker: callers drop those rows before joining, or they
+    would all match each other.
+    """
+    if isinstance(tickers.dtype, pd.CategoricalDtype) and tickers.cat.categories.equals(categories):
+        return tickers.cat.codes.to_numpy(dtype="int64")
+    return categories.get_indexer(tickers.astype(str)).astype("int64")
+
+def prepare_fundamentals(df):
+    """Typed Ticker / Date / Available Date / TTM Net Income / Shares Outstanding / TTM EPS.
+
+    Accepts the combined frame written by pipeline.py, whose cells may be
+    blank strings. Shares outstanding are reported on cover dates that
+    rarely match a period end, so the last known count is carried forward
+    within each ticker. A quarter becomes available on its Filing Date.
+    """
+    out = pd.DataFrame({
+        "Ticker": df["Ticker"].astype(str).str.upper(),
+        "Date": as_datetime(df["Date"]),
+        "TTM Net Income": pd.to_numeric(df["TTM Net Income"], errors="coerce").astype("float64"),
+    }, index=df.index)
+    shares = df["Shares Outstanding"] if "Shares Outstanding" in df.columns else np.nan
+    out["Shares Outstanding"] = pd.to_numeric(pd.Series(shares, index=df.index), errors="coerce").astype("float64")
+    filed = df["Filing Date"] if "Filing Date" in df.columns else pd.NaT
+    out["Available Date"] = as_datetime(pd.Series(filed, index=df.index))
+    out["Available Date"] = out["Available Date"].fillna(out["Date"] + MISSING_FILING_LAG)
+
+    out = out.dropna(subset=["Date"]).sort_values(["Ticker", "Date"], kind="stable")
+    out["Shares Outstanding"] = out.groupby("Ticker", sort=False)["Shares Outstanding"].ffill()
+    shares = out["Shares Outstanding"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eps = out["TTM Net Income"].to_numpy() / np.where(shares > 0, shares, np.nan)
+    out["TTM EPS"] = eps
+    return out
+
+# -------------------------------
+# Yield calculations
+# -------------------------------
+def quarterly_yields(fundamentals, prices, price_tolerance_days=7):
+    """Add Price, TTM EPS, Earnings Yield and Market Cap to every ticker-quarter.
+
+    The price is the last close on or before the period end (within
+    `price_tolerance_days`), found with one as-of join over the whole
+    universe. Rows keep the order of `fundamentals`.
+    """
+    fundamentals = fundamentals.reset_index(drop=True)
+    base = prepare_fundamentals(fundamentals)
+    prices = prepare_prices(prices)
+    categories = prices["Ticker"].cat.categories
+
+    left = pd.DataFrame({
+        "Row": base.index.to_numpy(),
+        "Code": ticker_codes(base["Ticker"], categories),
+        "Date": base["Date"].to_numpy(),
+    })
+    # Tickers without prices keep a NaN Price
+    left = left[left["Code"].to_numpy() >= 0].sort_values("Date", kind="stable")
+    right = pd.DataFrame({
+        "Code": ticker_codes(prices["Ticker"], categories),
+        "Price Date": prices["Date"].to_numpy(),
+        "Price": prices["Close"].to_numpy(),
+    })
+    joined = pd.merge_asof(
+        left, right, left_on="Date", right_on="Price Date", by="Code",
+        direction="backward", tolerance=pd.Timedelta(days=price_tolerance_days),
+    ).set_index("Row")
+
+    out = fundamentals.copy()
+    out["TTM EPS"] = base["TTM EPS"]
+    out["Price"] = joined["Price"]
+    out["Earnings Yield"] = out["TTM EPS"] / out["Price"]
+    out["Market Cap"] = base["Shares Outstanding"] * out["Price"]
+    return out
+
+def daily_yields(fundamentals, prices, max_staleness_days=400):
+    """Daily earnings yield: each close joined to the latest quarter already filed.
+
+    Fundamentals are forward-filled onto price dates by their Available
+    Date, so a quarter only affects prices after it was filed. Quarters
+    older than `max_staleness_days` are not carried forward. Ticker is
+    returned as a categorical column.
+    """
+    base = prepare_fundamentals(fundamentals)
+    base = base.dropna(subset=["TTM EPS"]).sort_values("Available Date", kind="stable")
+    prices = prepare_prices(prices)
+    categories = prices["Ticker"].cat.categories
+
+    left = pd.DataFrame({
+        "Code": ticker_codes(prices["Ticker"], categories),
+        "Date": prices["Date"].to_numpy(),
+    })
+    right = pd.DataFrame({
+        "Code": ticker_codes(base["Ticker"], categories),
+        "Available Date": base["Available Date"].to_numpy(),
+        "Period End": base["Date"].to_numpy(),
+        "TTM EPS": base["TTM EPS"].to_numpy(),
+        "Shares Outstanding": base["Shares Outstanding"].to_numpy(),
+    })
+    right = right[right["Code"].to_numpy() >= 0]
+    joined = pd.merge_asof(
+        left, right, left_on="Date", right_on="Available Date", by="Code",
+        direction="backward", tolerance=pd.Timedelta(days=max_staleness_days),
+    )
+
+    close = prices["Close"].to_numpy()
+    daily = pd.DataFrame({
+        "Ticker": prices["Ticker"].array,
+        "Date": prices["Date"].to_numpy(),
+        "Close": close,
+        "Period End": joined["Period End"].to_numpy(),
+        "TTM EPS": joined["TTM EPS"].to_numpy(),
+        "Shares Outstanding": joined["Shares Outstanding"].to_numpy(),
+    })
+    daily["Earnings Yield"] = daily["TTM EPS"].to_numpy() / close
+    daily["Market Cap"] = daily["Shares Outstanding"].to_numpy() * close
+
+    # Prices are in Date order, so a stable sort on the sorted ticker codes yields Ticker, Date order
+    order = np.argsort(left["Code"].to_numpy(), kind="stable")
+    return daily.take(order).reset_index(drop=True)
+
+# -------------------------------
+# Command line
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute TTM EPS and earnings yield from combined results and prices.")
+    parser.add_argument("fundamentals", help="Combined data CSV/Parquet (Ticker, Date, TTM Net Income, Shares Outstanding, Filing Date).")
+    parser.add_argument("prices", help="Price history CSV/Parquet (Ticker, Date, Close).")
+    parser.add_argument("-o", "--output", help="Write the per-quarter yields to this CSV file.")
+    parser.add_argument("--daily", metavar="PATH", help="Write the daily yield series to this CSV or Parquet file.")
+    parser.add_argument("--tolerance", type=int, default=7, help="Days a quarter-end price may be stale.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    fundamentals = read_table(args.fundamentals)
+    prices = read_table(args.prices)
+
+    quarterly = quarterly_yields(fundamentals, prices, price_tolerance_days=args.tolerance)
+    print(quarterly.tail())
+    if args.output:
+        quarterly.to_csv(args.output, index=False)
+        print(f"Saved quarterly yields to {args.output}")
+
+    if args.daily:
+        daily = daily_yields(fundamentals, prices)
+        if os.path.splitext(args.daily)[1].lower() in (".parquet", ".pq"):
+            daily.to_parquet(args.daily, index=False)
+        else:
+            daily.to_csv(args.daily, index=False)
+        print(f"Saved {len(daily)} daily rows to {args.daily}")
+    return quarterly
+
+def cli(argv=None):
+    # Console entry point: main() returns frames for callers, which sys.exit() would print
+    main(argv)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
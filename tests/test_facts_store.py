@@ -0,0 +1,32 @@
+import pytest
+
+from net_income_yield.facts_store import CompanyFactsStore
+
+
+def test_failed_fetches_leave_no_locks():
+    def fetch(cik):
+        if cik.endswith("9"):
+            raise KeyError(cik)
+        return {"cik": cik}
+
+    store = CompanyFactsStore(max_entries=4, fetch=fetch)
+    for cik in range(50):
+        if cik % 10 == 9:
+            with pytest.raises(KeyError):
+                store.get(cik)
+        else:
+            assert store.get(cik) == {"cik": f"{cik:010d}"}
+    assert store._cik_locks == {}
+    assert len(store._facts) == 4
+
+
+def test_cached_document_is_shared():
+    calls = []
+
+    def fetch(cik):
+        calls.append(cik)
+        return {"cik": cik}
+
+    store = CompanyFactsStore(fetch=fetch)
+    assert store.get(320193) is store.get("0000320193")
+    assert calls == ["0000320193"]
@@ -0,0 +1,125 @@
+import gzip
+import os
+
+import pytest
+import requests
+
+from net_income_yield.http_cache import HttpCache
+
+URL = "https://data.sec.gov/submissions/CIK0000000001.json"
+
+
+class FakeResponse:
+    def __init__(self, status_code, chunks=(), headers=None, fail_after=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._chunks = list(chunks)
+        self._fail_after = fail_after
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i, chunk in enumerate(self._chunks):
+            if self._fail_after is not None and i >= self._fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield chunk
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """Answers from a queue of responses and records the request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def cache(tmp_path, client, ttl=60):
+    return HttpCache(cache_dir=str(tmp_path), ttl=ttl, client=client)
+
+
+def tmp_files(tmp_path):
+    return [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_body_is_stored_compressed_and_served_within_ttl(tmp_path):
+    client = FakeClient(FakeResponse(200, [b'{"a": ', b"1}"], {"ETag": '"v1"'}))
+    http = cache(tmp_path, client)
+    assert http.get_json(URL) == {"a": 1}
+    assert http.get_json(URL) == {"a": 1}
+    assert len(client.requests) == 1
+    with gzip.open(http.get_path(URL), "rb") as f:
+        assert f.read() == b'{"a": 1}'
+
+
+def test_stale_entry_is_revalidated_with_its_validators(tmp_path):
+    client = FakeClient(
+        FakeResponse(200, [b'{"a": 1}'], {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+        FakeResponse(304),
+        FakeResponse(200, [b'{"a": 2}'], {"ETag": '"v2"'}),
+    )
+    http = cache(tmp_path, client, ttl=0)
+    assert http.get_json(URL) == {"a": 1}
+    assert client.requests[0] == {}
+
+    # 304 keeps the cached body
+    assert http.get_json(URL) == {"a": 1}
+    assert client.requests[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    # A changed document replaces it, with its new validator
+    assert http.get_json(URL) == {"a": 2}
+    assert http.get_json(URL, max_age=3600) == {"a": 2}
+    assert http._lookup(URL)[1] == '"v2"'
+    assert len(client.requests) == 3
+
+
+def test_max_age_zero_always_revalidates(tmp_path):
+    client = FakeClient(FakeResponse(200, [b"{}"], {"ETag": '"v1"'}), FakeResponse(304))
+    http = cache(tmp_path, client, ttl=3600)
+    http.get_json(URL)
+    http.get_json(URL, max_age=0)
+    assert client.requests[1] == {"If-None-Match": '"v1"'}
+
+
+def test_partial_download_leaves_no_temp_file(tmp_path):
+    failing = FakeResponse(200, [b'{"a": ', b"1}"], {"ETag": '"v1"'}, fail_after=1)
+    client = FakeClient(failing, FakeResponse(200, [b'{"a": 1}']))
+    http = cache(tmp_path, client)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        http.get_path(URL)
+    assert failing.closed
+    assert tmp_files(tmp_path) == []
+    assert http._lookup(URL) is None
+
+    # The next request downloads the document again
+    assert http.get_json(URL) == {"a": 1}
+
+
+def test_error_status_is_raised_and_not_cached(tmp_path):
+    client = FakeClient(FakeResponse(404), FakeResponse(200, [b"{}"]))
+    http = cache(tmp_path, client)
+    with pytest.raises(requests.exceptions.HTTPError):
+        http.get_path(URL)
+    assert http._lookup(URL) is None
+    assert http.get_json(URL) == {}
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path):
+    body = b'{"pad": "' + b"x" * 5000 + b'"}'
+    client = FakeClient(*(FakeResponse(200, [body]) for _ in range(3)))
+    http = cache(tmp_path, client)
+    http.max_bytes = 2 * len(gzip.compress(body)) + 100
+    urls = [f"{URL}?page={i}" for i in range(3)]
+    for url in urls:
+        http.get_path(url)
+    assert http._lookup(urls[0]) is None
+    assert http._lookup(urls[2]) is not None
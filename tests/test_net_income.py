@@ -0,0 +1,67 @@
+import pandas as pd
+
+from net_income_yield import concepts, fixtures
+from net_income_yield import net_income as ttm_mod
+
+
+def facts(rows):
+    columns = ["Date", "Start", "Net Income", "FY", "FP", "Form", "Filed"]
+    df = pd.DataFrame(rows, columns=columns)
+    for col in ("Date", "Start", "Filed"):
+        df[col] = pd.to_datetime(df[col])
+    return ttm_mod.normalize_facts(df, keep_ytd=True)
+
+
+def test_single_first_quarter_without_anchors():
+    quarters = ttm_mod.derive_fiscal_quarters(facts([
+        ("2024-03-31", "2024-01-01", 10.0, 2024, "Q1", "10-Q", "2024-05-01"),
+        ("2023-03-31", "2023-01-01", 8.0, 2024, "Q1", "10-Q", "2024-05-01"),
+    ]))
+    assert quarters[["Fiscal Year", "Fiscal Quarter", "Net Income"]].values.tolist() == [[2023, 1, 8.0], [2024, 1, 10.0]]
+
+
+def test_single_quarter_of_non_calendar_year():
+    quarters = ttm_mod.derive_fiscal_quarters(facts([
+        ("2023-12-31", "2023-10-01", 5.0, 2024, "Q2", "10-Q", "2024-02-01"),
+    ]))
+    assert quarters[["Fiscal Year", "Fiscal Quarter"]].values.tolist() == [[2024, 2]]
+
+
+def test_filed_is_first_filing_of_the_value():
+    quarters = ttm_mod.derive_fiscal_quarters(facts([
+        ("2018-03-31", "2018-01-01", 10.0, 2018, "Q1", "10-Q", "2018-05-01"),
+        # Unchanged comparative a year later
+        ("2018-03-31", "2018-01-01", 10.0, 2019, "Q1", "10-Q", "2019-05-01"),
+        ("2018-06-30", "2018-01-01", 25.0, 2018, "Q2", "10-Q", "2018-08-01"),
+        ("2018-06-30", "2018-04-01", 15.0, 2018, "Q2", "10-Q", "2018-08-01"),
+        ("2018-09-30", "2018-01-01", 45.0, 2018, "Q3", "10-Q", "2018-11-01"),
+        ("2018-12-31", "2018-01-01", 70.0, 2018, "FY", "10-K", "2019-02-15"),
+    ]))
+    filed = dict(zip(quarters["Fiscal Quarter"], quarters["Filed"].dt.strftime("%Y-%m-%d")))
+    # Q3 and Q4 are derived from year-to-date facts and known once both were filed
+    assert filed == {1: "2018-05-01", 2: "2018-08-01", 3: "2018-11-01", 4: "2019-02-15"}
+    assert quarters["Net Income"].tolist() == [10.0, 15.0, 20.0, 25.0]
+
+
+def test_restated_value_is_dated_by_the_restatement():
+    quarters = ttm_mod.derive_fiscal_quarters(facts([
+        ("2018-03-31", "2018-01-01", 10.0, 2018, "Q1", "10-Q", "2018-05-01"),
+        ("2018-03-31", "2018-01-01", 12.0, 2019, "Q1", "10-Q", "2019-05-01"),
+    ]))
+    assert quarters[["Net Income", "Filed"]].values.tolist() == [[12.0, pd.Timestamp("2019-05-01")]]
+
+
+def test_fixture_quarters_match_expected_labels():
+    for month in (12, 9, 6, 3):
+        company = fixtures.make_company(1, ticker="SYN", years=5, fiscal_year_end_month=month,
+                                        restatement_rate=0, seed=month)
+        net_df = ttm_mod.net_income_from_concepts(concepts.extract_concepts(company["companyfacts"]))
+        quarters = ttm_mod.derive_fiscal_quarters(ttm_mod.normalize_facts(net_df, keep_ytd=True))
+        expected = pd.DataFrame(fixtures.expected_quarters(company))
+        expected["Date"] = pd.to_datetime(expected["Date"])
+        merged = quarters.merge(expected, on="Date", suffixes=("", " Expected"))
+        # Years before the first filing only appear in part, as comparatives
+        assert len(merged) >= (expected["Fiscal Year"] >= company["first_year"]).sum()
+        assert (merged["Fiscal Year"] == merged["Fiscal Year Expected"]).all()
+        assert (merged["Fiscal Quarter"] == merged["Fiscal Quarter Expected"]).all()
+        assert (merged["Filed"] - merged["Date"]).dt.days.max() < 450
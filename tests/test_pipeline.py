@@ -0,0 +1,20 @@
+import pandas as pd
+
+from net_income_yield import pipeline
+
+
+def test_batch_counts_successes_skips_and_failures(monkeypatch, capsys):
+    def build(ticker, cik, mods, persist=None, watermarks=None):
+        if ticker == "SKIP":
+            return None
+        if ticker == "FAIL":
+            raise ValueError("No net income data.")
+        return pd.DataFrame({"Ticker": [ticker], "Net Income": [1.0]})
+
+    monkeypatch.setattr(pipeline, "build_ticker_frame", build)
+    cik_dict = {"AAA": "1", "BBB": "2", "SKIP": "3", "FAIL": "4"}
+    combined_df, errors_df = pipeline.run_batch(["AAA", "SKIP", "BBB", "FAIL", "NONE"], cik_dict, mods=None)
+
+    assert combined_df["Ticker"].tolist() == ["AAA", "BBB"]
+    assert sorted(errors_df["Ticker"]) == ["FAIL", "NONE"]
+    assert "Processed 5 tickers: 2 succeeded, 1 skipped without new filings, 2 failed." in capsys.readouterr().out
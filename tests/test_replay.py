@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import zipfile
+
+import pandas as pd
+import pytest
+import requests
+
+from net_income_yield import facts_store, fixtures, http_cache, pipeline, sec_client
+from net_income_yield.replay import Faults, ReplayServer, archive_path
+
+
+@pytest.fixture
+def archive(tmp_path):
+    root = str(tmp_path / "archive")
+    summary = fixtures.write_fixtures(root, 3, archives=True, years=4, restatement_rate=0, page_size=4)
+    return root, summary
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(root, faults=None):
+        server = ReplayServer(root, faults=faults, port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_fixtures_follow_the_sec_layout(archive):
+    root, summary = archive
+    assert summary["companies"] == 3
+    with open(os.path.join(root, "company_tickers.json"), encoding="utf-8") as f:
+        index = {e["ticker"]: e["cik_str"] for e in json.load(f).values()}
+    assert index == {"SYN00000": 1, "SYN00001": 2, "SYN00002": 3}
+    for cik in index.values():
+        with open(os.path.join(root, "submissions", f"CIK{cik:010d}.json"), encoding="utf-8") as f:
+            submissions = json.load(f)
+        # Every history page listed in the submissions document exists
+        pages = [page["name"] for page in submissions["filings"]["files"]]
+        assert pages
+        assert all(os.path.isfile(os.path.join(root, "submissions", name)) for name in pages)
+        assert os.path.isfile(os.path.join(root, "api", "xbrl", "companyfacts", f"CIK{cik:010d}.json"))
+    with zipfile.ZipFile(os.path.join(root, "companyfacts.zip")) as z:
+        assert sorted(z.namelist()) == [f"CIK{cik:010d}.json" for cik in index.values()]
+
+
+def test_fixtures_are_repeatable():
+    first = fixtures.make_company(7, ticker="SYN", years=3, seed=1)
+    second = fixtures.make_company(7, ticker="SYN", years=3, seed=1)
+    assert first == second
+
+
+def test_archive_paths_stay_inside_the_root(tmp_path):
+    root = str(tmp_path)
+    assert archive_path(root, "/submissions/CIK0000000001.json?x=1") == os.path.join(root, "submissions", "CIK0000000001.json")
+    for path in ("/", "/../etc/passwd", "/submissions/%2e%2e/x", "/a\\b"):
+        with pytest.raises(LookupError):
+            archive_path(root, path)
+
+
+def test_server_answers_from_the_archive(archive, serve):
+    root, _ = archive
+    server = serve(root)
+    url = f"{server.url}/submissions/CIK0000000001.json"
+    response = requests.get(url)
+    assert response.status_code == 200
+    assert response.json()["cik"] == "0000000001"
+
+    # Validators come from the file, so a revalidation gets 304
+    etag = response.headers["ETag"]
+    assert requests.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert requests.get(f"{server.url}/submissions/CIK0000000099.json").status_code == 404
+
+    stats = requests.get(f"{server.url}/_stats").json()
+    assert stats["statuses"]["200"] == 1
+    assert stats["statuses"]["304"] == 1
+    assert stats["statuses"]["404"] == 1
+
+
+def test_injected_failures(archive, serve):
+    root, _ = archive
+    server = serve(root, Faults(error_rate=1.0, seed=0))
+    assert requests.get(f"{server.url}/company_tickers.json").status_code in (500, 503)
+
+    server = serve(root, Faults(rate_limit=1, retry_after=3))
+    statuses = [requests.get(f"{server.url}/company_tickers.json") for _ in range(3)]
+    throttled = [r for r in statuses if r.status_code == 429]
+    assert throttled
+    assert throttled[0].headers["Retry-After"] == "3"
+
+
+def test_client_retries_through_injected_failures(archive, serve):
+    root, _ = archive
+    server = serve(root, Faults(error_rate=0.5, seed=3))
+    client = sec_client.SecClient(rate=1000, backoff=0.01, max_backoff=0.01, max_retries=20)
+    try:
+        for _ in range(5):
+            response = client.get(f"{server.url}/company_tickers.json")
+            assert response.status_code == 200
+    finally:
+        client.close()
+    statuses = server.stats.info()["statuses"]
+    assert statuses.get("500", 0) + statuses.get("503", 0) > 0
+
+
+def test_pipeline_runs_against_the_replay_server(archive, serve, tmp_path, monkeypatch):
+    root, _ = archive
+    server = serve(root)
+    client = sec_client.SecClient(rate=1000)
+    monkeypatch.setattr(http_cache, "SEC_DATA_URL", server.url)
+    monkeypatch.setattr(http_cache, "_default_cache", http_cache.HttpCache(cache_dir=str(tmp_path / "cache"), client=client))
+    monkeypatch.setattr(facts_store, "_default_store", facts_store.CompanyFactsStore())
+
+    output = str(tmp_path / "combined.csv")
+    try:
+        combined_df, errors_df = pipeline.main(["SYN00000", "SYN00001", "SYN00002", "--no-upload", "-o", output,
+                                                "--tickers-source", os.path.join(root, "company_tickers.json")])
+    finally:
+        client.close()
+    assert errors_df.empty
+    assert sorted(combined_df["Ticker"].unique()) == ["SYN00000", "SYN00001", "SYN00002"]
+    assert os.path.isfile(output)
+
+    # Every quarter of the filed years carries the fixture's true value
+    company = fixtures.make_universe(1, years=4, restatement_rate=0, page_size=4)
+    _, _, company = next(company)
+    expected = pd.DataFrame(fixtures.expected_quarters(company))
+    expected = expected[expected["Fiscal Year"] >= company["first_year"]]
+    expected["Date"] = pd.to_datetime(expected["Date"])
+    built = combined_df[combined_df["Ticker"] == "SYN00000"].copy()
+    built["Date"] = pd.to_datetime(built["Date"])
+    merged = expected.merge(built, on="Date", suffixes=(" Expected", ""))
+    assert len(merged) == len(expected)
+    assert (merged["Net Income"] == merged["Net Income Expected"]).all()
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from net_income_yield import submissions
+from net_income_yield.service import SeriesCache
+
+CIKS = {"AAA": "0000000001", "BBB": "0000000002", "CCC": "0000000003"}
+
+
+def build(ticker, cik, prices=None, max_age=None):
+    return SimpleNamespace(frames={"quarterly": pd.DataFrame({"x": range(1000)})}, latest_filing=None)
+
+
+def entry_bytes():
+    return int(build("AAA", None).frames["quarterly"].memory_usage(deep=True).sum())
+
+
+def test_least_recently_used_ticker_is_evicted():
+    cache = SeriesCache(CIKS, max_bytes=int(2.5 * entry_bytes()), build=build)
+    for ticker in ("AAA", "BBB", "AAA", "CCC"):
+        cache._get_entry(ticker)
+    assert list(cache._entries) == ["AAA", "CCC"]
+    assert cache.info()["evictions"] == 1
+    assert cache.info()["hits"] == 1
+
+
+def test_stale_check_hit_marks_the_ticker_as_used(monkeypatch):
+    checked = []
+
+    def no_new_filings(ticker, cik, max_age=None):
+        checked.append(ticker)
+        return pd.DataFrame()
+
+    monkeypatch.setattr(submissions, "get_edgar_filing_links", no_new_filings)
+    # Every request after the first re-checks the submissions
+    cache = SeriesCache(CIKS, max_bytes=int(2.5 * entry_bytes()), check_seconds=0, build=build)
+    for ticker in ("AAA", "BBB"):
+        cache._get_entry(ticker)
+    entry, cached = cache._get_entry("AAA")
+    assert cached and checked == ["AAA"]
+    cache._get_entry("CCC")
+    assert list(cache._entries) == ["AAA", "CCC"]
+    assert cache.info()["rebuilds"] == 0
@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+
+from net_income_yield import sheets
+from net_income_yield.sheets import FakeWorksheet, SheetHeaderError, SheetUpsertSink
+
+
+def frame(rows, columns=("Ticker", "Date", "Net Income")):
+    return pd.DataFrame(rows, columns=list(columns))
+
+
+def test_new_keys_are_appended_below_the_header():
+    sheet = FakeWorksheet()
+    sink = SheetUpsertSink(sheet)
+    assert sink.upsert(frame([["AAA", "2024-03-31", 1], ["BBB", "2024-03-31", 2]])) == (0, 2)
+    assert sheet.values == [
+        ["Ticker", "Date", "Net Income"],
+        ["AAA", "2024-03-31", "1"],
+        ["BBB", "2024-03-31", "2"],
+    ]
+
+
+def test_existing_keys_are_updated_in_place():
+    sheet = FakeWorksheet([
+        ["Ticker", "Date", "Net Income"],
+        ["AAA", "2024-03-31", "1"],
+        ["AAA", "2024-06-30", "2"],
+    ])
+    sink = SheetUpsertSink(sheet)
+    cells, appended = sink.upsert(frame([["AAA", "2024-06-30", 5], ["AAA", "2024-09-30", 3]]))
+    assert (cells, appended) == (1, 1)
+    assert sheet.values == [
+        ["Ticker", "Date", "Net Income"],
+        ["AAA", "2024-03-31", "1"],
+        ["AAA", "2024-06-30", "5"],
+        ["AAA", "2024-09-30", "3"],
+    ]
+    assert sheet.calls["cells_written"] == 1 + 3
+
+
+def test_key_matching_uses_both_key_columns():
+    sheet = FakeWorksheet([["Ticker", "Date", "Net Income"], ["AAA", "2024-03-31", "1"]])
+    sink = SheetUpsertSink(sheet)
+    # Same date, other ticker and same ticker, other date are both new rows
+    assert sink.upsert(frame([["BBB", "2024-03-31", 1], ["AAA", "2024-06-30", 1]])) == (0, 2)
+    # Unchanged rows cost nothing
+    calls = dict(sheet.calls)
+    assert sink.upsert(frame([["AAA", "2024-03-31", 1]])) == (0, 0)
+    assert sheet.calls == calls
+
+
+def test_sheet_is_read_once_across_upserts():
+    sheet = FakeWorksheet()
+    sink = SheetUpsertSink(sheet)
+    for value in range(3):
+        sink.upsert(frame([["AAA", "2024-03-31", value]]))
+    assert sheet.calls["get_all_values"] == 1
+    assert sheet.values[1] == ["AAA", "2024-03-31", "2"]
+
+
+def test_columns_follow_the_sheet_header_order():
+    sheet = FakeWorksheet([["Date", "Net Income", "Ticker"], ["2024-03-31", "1", "AAA"]])
+    sink = SheetUpsertSink(sheet)
+    assert sink.upsert(frame([["AAA", "2024-03-31", 7]])) == (1, 0)
+    assert sheet.values[1] == ["2024-03-31", "7", "AAA"]
+
+
+def test_new_columns_extend_the_header():
+    sheet = FakeWorksheet([["Ticker", "Date", "Net Income"], ["AAA", "2024-03-31", "1"]])
+    sink = SheetUpsertSink(sheet)
+    df = frame([["AAA", "2024-03-31", 1, 9.5]], columns=("Ticker", "Date", "Net Income", "Price"))
+    assert sink.upsert(df) == (1, 0)
+    assert sheet.values == [["Ticker", "Date", "Net Income", "Price"], ["AAA", "2024-03-31", "1", "9.5"]]
+
+
+def test_columns_missing_from_the_frame_are_left_alone():
+    sheet = FakeWorksheet([["Ticker", "Date", "Net Income", "Note"], ["AAA", "2024-03-31", "1", "keep"]])
+    sink = SheetUpsertSink(sheet)
+    assert sink.upsert(frame([["AAA", "2024-03-31", 2]])) == (1, 0)
+    assert sheet.values[1] == ["AAA", "2024-03-31", "2", "keep"]
+
+
+def test_duplicate_header_is_rejected_without_writing():
+    sheet = FakeWorksheet([["Ticker", "Date", "Ticker"], ["AAA", "2024-03-31", "AAA"]])
+    sink = SheetUpsertSink(sheet)
+    with pytest.raises(SheetHeaderError):
+        sink.upsert(frame([["AAA", "2024-03-31", 1]]))
+    assert sheet.calls["batch_update"] == sheet.calls["append_rows"] == 0
+
+    # The header is re-read after it was fixed
+    sheet.values[0] = ["Ticker", "Date", "Net Income"]
+    assert sink.upsert(frame([["AAA", "2024-03-31", 1]])) == (1, 0)
+
+
+def test_frame_without_key_columns_is_rejected():
+    sink = SheetUpsertSink(FakeWorksheet())
+    with pytest.raises(KeyError):
+        sink.upsert(pd.DataFrame({"Ticker": ["AAA"], "Net Income": [1]}))
+
+
+def test_upload_reports_header_errors(capsys):
+    sheet = FakeWorksheet([["Ticker", "Date", "Ticker"]])
+    assert sheets.upload_to_google_sheet(frame([["AAA", "2024-03-31", 1]]), sink=SheetUpsertSink(sheet)) is False
+    assert "Duplicate column names" in capsys.readouterr().out
+    assert sheets.upload_to_google_sheet(frame([["AAA", "2024-03-31", 1]]), sink=SheetUpsertSink(FakeWorksheet())) is True